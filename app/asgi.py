@@ -4,6 +4,11 @@ from channels.routing import ProtocolTypeRouter, URLRouter
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
+django_asgi_app = get_asgi_application()
+
+from .lifespan import LifespanApp  # noqa: E402 - needs the app registry populated
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
+    "lifespan": LifespanApp(),
 })
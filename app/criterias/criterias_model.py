@@ -22,13 +22,15 @@ class Criterias(models.Model):
         default=CONTENT,
     )
     
+    # Indexed by criterias_web_type_idx, whose leading column is web_id
     web_id = models.ForeignKey(
         Website,
         on_delete=models.CASCADE,
         related_name='criterias',
         null=True,
         blank=True,
-        db_column='web_id'
+        db_column='web_id',
+        db_index=False,
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -38,6 +40,9 @@ class Criterias(models.Model):
         db_table = 'criterias'
         verbose_name = 'Criteria'
         verbose_name_plural = 'Criterias'
+        indexes = [
+            models.Index(fields=['web_id', 'type'], name='criterias_web_type_idx'),
+        ]
 
     def __str__(self):
         return f"{self.html_tag} - {self.type}"
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .criterias_model import Criterias
 from ..websites.websites_model import Website
 from ..websites.websites_serializer import WebsiteSerializer
+from ..services.base.extraction_plan import FieldSpec
 
 class CriteriasSerializer(serializers.ModelSerializer):
     website = serializers.SerializerMethodField()
@@ -38,6 +39,17 @@ class CriteriasSerializer(serializers.ModelSerializer):
             return WebsiteSerializer(obj.web_id).data
         return None
 
+    def validate_meta(self, value):
+        """Reject field declarations the extraction engine cannot compile."""
+        if isinstance(value, dict) and 'field' in value:
+            if not isinstance(value.get('order', 0), int):
+                raise serializers.ValidationError("'order' must be an integer.")
+            try:
+                FieldSpec.from_meta(value, '*', [])
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
+        return value
+
     def validate(self, attrs):
         """General validation for the serializer."""
         return super().validate(attrs)
@@ -64,7 +64,7 @@ class CriteriaView(viewsets.ViewSet):
         # Prepare the data for serialization
         data = request.data.copy()
         data['web_id'] = website.id
-        self.logger_service.info(data)
+        self.logger_service.info("Creating criteria: %s", data)
 
         # Initialize the serializer with the data
         serializer = CriteriasSerializer(data=data)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('criterias', '0008_remove_criterias_name_criterias_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='criterias',
+            index=models.Index(fields=['web_id', 'type'], name='criterias_web_type_idx'),
+        ),
+    ]
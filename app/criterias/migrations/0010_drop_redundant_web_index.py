@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websites', '0002_website_crawl_limits'),
+        ('criterias', '0009_criterias_web_type_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='criterias',
+            name='web_id',
+            field=models.ForeignKey(blank=True, db_column='web_id', db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='criterias', to='websites.website'),
+        ),
+    ]
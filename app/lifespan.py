@@ -0,0 +1,22 @@
+from app.services.base.client_session_service import client_session_service
+from app.services.base.logger_service import LoggerService
+
+class LifespanApp:
+    """
+    Handles the ASGI lifespan protocol so shared resources are released on shutdown.
+    """
+    def __init__(self):
+        self.logger = LoggerService(name='LifespanApp')
+
+    async def __call__(self, scope, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                try:
+                    await client_session_service.close()
+                except Exception as e:
+                    self.logger.error(f"Error closing pooled client session: {str(e)}")
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
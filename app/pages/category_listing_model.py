@@ -0,0 +1,24 @@
+from django.db import models
+from ..websites.websites_model import Website
+
+class CategoryListing(models.Model):
+    web = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='category_listings')
+    url = models.URLField(max_length=2000)
+    parent_name = models.CharField(max_length=255, null=True, blank=True)
+    # sha256 of the sorted product URLs found on the listing at the last crawl
+    fingerprint = models.CharField(max_length=64)
+    product_urls = models.JSONField(default=list)
+    last_crawled = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'category_listings'
+        verbose_name = 'Category Listing'
+        verbose_name_plural = 'Category Listings'
+        constraints = [
+            models.UniqueConstraint(fields=['web', 'url'], name='category_listings_web_url_unique'),
+        ]
+
+    def __str__(self):
+        return self.url
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websites', '0002_website_crawl_limits'),
+        ('pages', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryListing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2000)),
+                ('parent_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('product_urls', models.JSONField(default=list)),
+                ('last_crawled', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('web', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_listings', to='websites.website')),
+            ],
+            options={
+                'verbose_name': 'Category Listing',
+                'verbose_name_plural': 'Category Listings',
+                'db_table': 'category_listings',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categorylisting',
+            constraint=models.UniqueConstraint(fields=('web', 'url'), name='category_listings_web_url_unique'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:22
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicates(apps, schema_editor):
+    # Keep the most recent page of each (web, url) so the constraint can be created
+    Page = apps.get_model('pages', 'Page')
+    duplicates = (
+        Page.objects.values('web_id', 'url')
+        .annotate(count=Count('id'), keep_id=Max('id'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        Page.objects.filter(web_id=duplicate['web_id'], url=duplicate['url']).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0002_category_listing'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='page',
+            constraint=models.UniqueConstraint(fields=('web', 'url'), name='pages_web_url_unique'),
+        ),
+    ]
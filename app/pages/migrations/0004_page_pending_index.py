@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:29
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built without locking writes on the pages table
+    atomic = False
+
+    dependencies = [
+        ('pages', '0003_page_web_url_unique'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='page',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('status', 'pending')), fields=['web'], name='pages_web_pending_idx'),
+        ),
+    ]
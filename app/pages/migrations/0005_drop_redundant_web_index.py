@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websites', '0002_website_crawl_limits'),
+        ('pages', '0004_page_pending_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='page',
+            name='web',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='websites.website'),
+        ),
+    ]
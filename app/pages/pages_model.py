@@ -9,7 +9,8 @@ class Page(models.Model):
         ('error', 'Error'),
     ]
 
-    web = models.ForeignKey(Website, on_delete=models.CASCADE)
+    # Indexed by pages_web_url_unique, whose leading column is web_id
+    web = models.ForeignKey(Website, on_delete=models.CASCADE, db_index=False)
     url = models.URLField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     last_scraped = models.DateTimeField(null=True, blank=True)
@@ -22,11 +23,22 @@ class Page(models.Model):
         db_table = 'pages'
         verbose_name = 'Page'  # Singular for clarity
         verbose_name_plural = 'Pages'
+        constraints = [
+            models.UniqueConstraint(fields=['web', 'url'], name='pages_web_url_unique'),
+        ]
+        indexes = [
+            # The scraped data sync reads a website's pending, live pages
+            models.Index(fields=['web'], name='pages_web_pending_idx', condition=models.Q(status='pending', deleted_at__isnull=True)),
+        ]
 
     def soft_delete(self):
         """Perform a soft delete by setting the deleted_at timestamp."""
         self.deleted_at = timezone.now()
         self.save()
+        # A deleted page has no current price; a restored one is written again on its next scrape
+        if hasattr(self, 'latest_price'):
+            self.latest_price.delete()
+        self.scrapeddata_set.update(content_hash=None)
 
     def __str__(self):
         return self.url
@@ -1,10 +1,12 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from django.conf import settings
 from .pages_model import Page
 from .pages_serializer import PageSerializer
 from ..services.base.page_service import PageService
+from ..services.base.copy_ingest_service import INGEST_BACKENDS
 from ..services.base.logger_service import LoggerService
-from ..services.utils import Response, status, error_response, success_response, get_valid_website
+from ..services.utils import Response, status, error_response, success_response, get_valid_website, parse_flag
 
 class PagesListView(viewsets.ViewSet):
     def __init__(self, **kwargs):
@@ -28,8 +30,9 @@ class PagesListView(viewsets.ViewSet):
     @action(detail=False, methods=['post'])
     def post_pages(self, request):
         """
-        :param request: The HTTP request object containing URLs to process.
-        :return: A success response indicating the result of the update/create operation.
+        :param request: The HTTP request object containing URLs to process; 'mark_missing' soft-deletes
+                        the website's pages not in the list and 'ingest' selects the backend ('orm' or 'copy').
+        :return: A success response with the created/updated/unchanged/removed page counts.
         """
         website = get_valid_website(request.data)
         if isinstance(website, Response):
@@ -39,8 +42,16 @@ class PagesListView(viewsets.ViewSet):
         if not self.is_valid_url_list(urls):
             return error_response("A valid list of URLs is required", status.HTTP_400_BAD_REQUEST)
 
-        self.page_service.process_pages_batch(website, urls)
-        return success_response({"message":"Pages successfully updated/created"},status.HTTP_200_OK)
+        ingest = request.data.get('ingest', settings.SCRAPING_INGEST_BACKEND)
+        if ingest not in INGEST_BACKENDS:
+            return error_response(f"'ingest' must be one of {list(INGEST_BACKENDS)}", code=status.HTTP_400_BAD_REQUEST)
+
+        mark_missing = parse_flag(request.data.get('mark_missing', False))
+        if mark_missing is None:
+            return error_response("'mark_missing' must be true or false", code=status.HTTP_400_BAD_REQUEST)
+
+        counts = self.page_service.process_pages_batch(website, urls, mark_missing=mark_missing, backend=ingest)
+        return success_response({"message":"Pages successfully updated/created", **counts},status.HTTP_200_OK)
 
     def is_valid_url_list(self, urls):
         """
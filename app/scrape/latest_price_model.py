@@ -0,0 +1,31 @@
+from django.db import models
+from ..pages.pages_model import Page
+from ..websites.websites_model import Website
+
+class LatestPrice(models.Model):
+    """
+    Current price of every live page, maintained on ingest so reads are a lookup by website
+    rather than a join of pages and scraped data. Soft-deleted pages have no row.
+    """
+    page = models.OneToOneField(Page, on_delete=models.CASCADE, primary_key=True, related_name='latest_price')
+    web = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='latest_prices')
+    url = models.URLField()
+    product_name = models.TextField(null=True, blank=True)
+    # Price and tier table in units of 10 ** -value_exponent of the currency (cents when null)
+    value_minor = models.BigIntegerField(null=True, blank=True)
+    currency = models.CharField(max_length=3, null=True, blank=True)
+    value_exponent = models.PositiveSmallIntegerField(null=True, blank=True)
+    price_table = models.JSONField(default=list)
+    price_changed_at = models.DateTimeField()
+    last_seen_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'latest_prices'
+        verbose_name = 'Latest Price'
+        verbose_name_plural = 'Latest Prices'
+        indexes = [
+            models.Index(fields=['web', 'price_changed_at'], name='latest_prices_web_changed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.url}: {self.value_minor} {self.currency}"
@@ -0,0 +1,28 @@
+from rest_framework import serializers
+from .latest_price_model import LatestPrice
+from ..services.base.price_parser import ParsedPrice
+
+class LatestPriceSerializer(serializers.ModelSerializer):
+    price = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LatestPrice
+        fields = [
+            'page',
+            'url',
+            'product_name',
+            'price',
+            'value_minor',
+            'currency',
+            'value_exponent',
+            'price_table',
+            'price_changed_at',
+            'last_seen_at',
+        ]
+        read_only_fields = fields
+
+    def get_price(self, latest_price):
+        """The current price formatted for display, e.g. '1234.50 €' or '0.045 €'."""
+        if latest_price.value_minor is None or not latest_price.currency:
+            return None
+        return ParsedPrice(latest_price.value_minor, latest_price.currency, latest_price.value_exponent).format()
@@ -0,0 +1,30 @@
+from rest_framework import viewsets
+from .latest_price_serializer import LatestPriceSerializer
+from .price_history_view import parse_moment
+from ..services.base.logger_service import LoggerService
+from ..services.base.latest_price_service import latest_price_service
+from ..services.utils import Response, status, success_response, error_response, get_valid_website
+
+class LatestPriceViewSet(viewsets.ViewSet):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.logger_service = LoggerService(__name__)
+
+    def list(self, request):
+        """
+        :param request: The HTTP request object; 'web_id' selects the website and the optional
+                        'changed_since' (ISO 8601) returns only prices changed since then.
+        :return: A success response with the current price of every live page of the website.
+        """
+        website = get_valid_website(request.query_params)
+        if isinstance(website, Response):
+            return website
+
+        changed_since = None
+        if request.query_params.get('changed_since'):
+            changed_since = parse_moment(request.query_params['changed_since'])
+            if changed_since is None:
+                return error_response("'changed_since' must be an ISO 8601 date or datetime", code=status.HTTP_400_BAD_REQUEST)
+
+        serializer = LatestPriceSerializer(latest_price_service.prices(website, changed_since), many=True)
+        return success_response({'website': website.name, 'prices': serializer.data}, status.HTTP_200_OK)
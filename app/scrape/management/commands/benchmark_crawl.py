@@ -0,0 +1,155 @@
+import asyncio
+import resource
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from asgiref.sync import sync_to_async
+from ...scraped_data_view import ScrapedDataViewSet
+from ....websites.websites_model import Website, KABELBINDER
+from ....criterias.criterias_model import Criterias
+from ....pages.pages_model import Page
+from ....services.base.client_session_service import client_session_service
+from ....services.base.host_scheduler import host_scheduler
+from ....services.base.copy_ingest_service import INGEST_BACKENDS
+from ....services.stub.synthetic_scrape_micro_service import SyntheticScrapeMicroService
+
+NAV_SELECTOR = 'nav-link'
+CONTENT_SELECTORS = 'product-title|product-name|product-price|bulk-prices'
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    :param values: The measured values.
+    :param fraction: The percentile as a fraction (e.g. 0.99).
+    :return: The nearest-rank percentile, or 0 for no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+class Command(BaseCommand):
+    help = (
+        "Runs process_pages and process_scraped_data end to end against a local synthetic "
+        "scraping microservice and reports throughput, client-side request latency and peak RSS. "
+        "Creates a temporary Website (and its pages) which is deleted afterwards; run it "
+        "against a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--products', type=int, default=50, help='Products per category.')
+        parser.add_argument('--price-tiers', type=int, default=5, help='Rows per price table (payload size).')
+        parser.add_argument('--latency', type=float, default=0.05, help='Mean simulated latency in seconds.')
+        parser.add_argument('--latency-jitter', type=float, default=0.5)
+        parser.add_argument('--error-rate', type=float, default=0.0)
+        parser.add_argument('--host-rate', type=float, default=1000.0, help='Politeness rate for the synthetic shop.')
+        parser.add_argument('--host-concurrency', type=int, default=100)
+        parser.add_argument('--skip-data', action='store_true', help='Only benchmark page discovery.')
+        parser.add_argument('--ingest', choices=INGEST_BACKENDS, default=settings.SCRAPING_INGEST_BACKEND,
+                            help='Backend persisting the scraped data.')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark website and pages.')
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run_benchmark(options))
+
+    async def run_benchmark(self, options):
+        stub = SyntheticScrapeMicroService(
+            categories=options['categories'],
+            products_per_category=options['products'],
+            price_tiers=options['price_tiers'],
+            latency=options['latency'],
+            latency_jitter=options['latency_jitter'],
+            error_rate=options['error_rate'],
+        )
+        previous_base_url = settings.SCRAPING_MICROSERVICE_BASE_URL
+        settings.SCRAPING_MICROSERVICE_BASE_URL = await stub.start()
+        website = await sync_to_async(self.create_website)(stub.shop_url, options)
+
+        try:
+            view = ScrapedDataViewSet()
+            view.scraper_service = view._initialize_scraper_service(website)
+            view.ingest_backend = options['ingest']
+            host_scheduler.configure_website(website)
+            latencies = self.instrument(view.scraper_service)
+
+            await self.run_phase(view, website, stub, latencies, 'pages')
+            if not options['skip_data']:
+                await self.run_phase(view, website, stub, latencies, 'scraped_data')
+        finally:
+            await client_session_service.close()
+            await stub.stop()
+            settings.SCRAPING_MICROSERVICE_BASE_URL = previous_base_url
+            if not options['keep']:
+                await website.adelete()
+
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(f"peak RSS: {peak_rss_mb:.1f} MB")
+
+    def instrument(self, scraper_service) -> list:
+        """
+        Times every microservice call as the crawler sees it, so the reported latency includes
+        limiter and politeness waits, retries and response decoding.
+
+        :param scraper_service: The website's scraper service.
+        :return: The list the latencies (in seconds) are appended to.
+        """
+        latencies = []
+        fetch = scraper_service.fetch
+        get_data_many = scraper_service.web_scraper_service.get_data_many
+
+        async def timed_fetch(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                return await fetch(*args, **kwargs)
+            finally:
+                latencies.append(time.monotonic() - started)
+
+        async def timed_get_data_many(*args, **kwargs):
+            # A batched URL's latency is the time until its result arrives
+            started = time.monotonic()
+            async for item in get_data_many(*args, **kwargs):
+                latencies.append(time.monotonic() - started)
+                yield item
+
+        scraper_service.fetch = timed_fetch
+        scraper_service.web_scraper_service.get_data_many = timed_get_data_many
+        return latencies
+
+    async def run_phase(self, view, website, stub, latencies: list, action_type):
+        latencies.clear()
+        stub.request_latencies = []
+        stub.error_count = 0
+        started = time.monotonic()
+        success = await view.process_data(website, action_type)
+        elapsed = time.monotonic() - started
+
+        if action_type == 'pages':
+            count = await Page.objects.filter(web=website).acount()
+        else:
+            count = await Page.objects.filter(web=website, status='scraped').acount()
+
+        self.stdout.write(
+            f"{action_type}: success={success} pages={count} elapsed={elapsed:.2f}s "
+            f"pages/sec={count / elapsed if elapsed else 0:.1f} requests={len(latencies)} "
+            f"server_requests={len(stub.request_latencies)} errors={stub.error_count} p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 0.99) * 1000:.1f}ms"
+        )
+
+    def create_website(self, shop_url: str, options) -> Website:
+        website = Website.objects.create(
+            name=KABELBINDER,
+            base_url=shop_url,
+            crawl_rate=options['host_rate'],
+            crawl_burst=max(1, int(options['host_rate'])),
+            crawl_concurrency=options['host_concurrency'],
+        )
+        Criterias.objects.create(html_tag='a', css_selector=NAV_SELECTOR, type=Criterias.NAV, web_id=website)
+        Criterias.objects.create(
+            html_tag='div',
+            css_selector=SyntheticScrapeMicroService.PAGER_CLASS,
+            type=Criterias.NAV,
+            web_id=website,
+            meta={'role': 'pagination', 'page_param': 'p'},
+        )
+        Criterias.objects.create(html_tag='div', css_selector=CONTENT_SELECTORS, type=Criterias.CONTENT, web_id=website)
+        return website
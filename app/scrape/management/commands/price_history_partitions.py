@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ....services.base.price_history_service import price_history_service, month_start, add_months
+
+class Command(BaseCommand):
+    help = (
+        "Creates the monthly price history partitions for the current and upcoming months and "
+        "drops the partitions older than the retention period. Meant to run daily (e.g. cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=settings.PRICE_HISTORY_PARTITIONS_AHEAD,
+                            help='Upcoming months to create besides the current one.')
+        parser.add_argument('--retain-months', type=int, default=settings.PRICE_HISTORY_RETENTION_MONTHS,
+                            help='Months of history kept, including the current one (0 keeps everything).')
+
+    def handle(self, *args, **options):
+        if not price_history_service.partitioned:
+            self.stdout.write("Price history is not partitioned on this database; nothing to do.")
+            return
+
+        current = month_start(timezone.now())
+        created = price_history_service.ensure_partitions(current, options['ahead'] + 1)
+        self.stdout.write(f"partitions ready: {', '.join(created)}")
+
+        if options['retain_months'] > 0:
+            dropped = price_history_service.drop_partitions(add_months(current, 1 - options['retain_months']))
+            self.stdout.write(f"partitions dropped: {', '.join(dropped) or 'none'}")
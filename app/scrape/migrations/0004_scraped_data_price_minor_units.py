@@ -0,0 +1,115 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:14
+
+import re
+
+from django.db import migrations, models
+
+
+# Rows scraped before prices were parsed at ingest hold the old cleaned format: footnote asterisks
+# removed and every decimal comma turned into a point ('1.234,50 €*' became '1.234.50 €'), so the
+# last point is the decimal separator and any earlier ones were grouping. Rows cleaned since
+# ('1234.50 €') read the same way.
+#
+# The parser below is a frozen copy, deliberately not imported from services.base.price_parser:
+# the live parser reads today's display format and its currency table may grow, while this
+# migration must keep computing what it computed when it first ran.
+CURRENCY_SYMBOLS = {
+    '€': 'EUR',
+    'EUR': 'EUR',
+    '$': 'USD',
+    'USD': 'USD',
+    '£': 'GBP',
+    'GBP': 'GBP',
+    'CHF': 'CHF',
+    'zł': 'PLN',
+    'PLN': 'PLN',
+    'Kč': 'CZK',
+    'CZK': 'CZK',
+    'SEK': 'SEK',
+    '¥': 'JPY',
+    'JPY': 'JPY',
+}
+CURRENCY_EXPONENTS = {'JPY': 0}
+# Every legacy row comes from the kabelbinder.de scraper
+DEFAULT_CURRENCY = 'EUR'
+
+_CURRENCY = re.compile('|'.join(re.escape(symbol) for symbol in sorted(CURRENCY_SYMBOLS, key=len, reverse=True)))
+_AMOUNT = re.compile(r"(-?)\s*(\d[\d.'\u00a0\u202f ]*)")
+_GROUPING = re.compile(r"['\u00a0\u202f ]")
+
+
+def parse_legacy_price(text):
+    """
+    :param text: A stored field_value such as '1.234.50 €' or '0.045 €'.
+    :return: (amount, exponent, currency) with the amount in units of 10 ** -exponent, at least
+             the currency's minor unit and finer when the text has more decimals, or None if the
+             text holds no amount.
+    """
+    if not text:
+        return None
+    amount = _AMOUNT.search(text)
+    if not amount:
+        return None
+
+    currency_match = _CURRENCY.search(text)
+    currency = CURRENCY_SYMBOLS[currency_match.group()] if currency_match else DEFAULT_CURRENCY
+    minor_exponent = CURRENCY_EXPONENTS.get(currency, 2)
+
+    digits = _GROUPING.sub('', amount.group(2)).rstrip('.')
+    units, separator, fraction = digits.rpartition('.')
+    if not separator or not minor_exponent:
+        # Currencies without a minor unit only had grouping points
+        units, fraction = digits, ''
+    units = units.replace('.', '')
+
+    # Trailing zeros past the minor unit carry no precision
+    fraction = fraction[:minor_exponent] + fraction[minor_exponent:].rstrip('0')
+    exponent = max(minor_exponent, len(fraction))
+    value = int(units or '0') * 10 ** exponent + int(fraction.ljust(exponent, '0') or '0')
+    return (-value if amount.group(1) else value), exponent, currency
+
+
+def backfill_prices(apps, schema_editor):
+    # value_exponent stays null for amounts in the currency's minor unit and is set for sub-cent ones
+    ScrapedData = apps.get_model('scrape', 'ScrapedData')
+    batch = []
+    for scraped_data in ScrapedData.objects.filter(value_minor__isnull=True).only('id', 'field_value').iterator(chunk_size=2000):
+        price = parse_legacy_price(scraped_data.field_value)
+        if price is None:
+            continue
+        amount, exponent, currency = price
+        scraped_data.value_minor = amount
+        scraped_data.value_exponent = exponent if exponent > CURRENCY_EXPONENTS.get(currency, 2) else None
+        scraped_data.currency = currency
+        batch.append(scraped_data)
+        if len(batch) >= 2000:
+            ScrapedData.objects.bulk_update(batch, ['value_minor', 'value_exponent', 'currency'])
+            batch = []
+    if batch:
+        ScrapedData.objects.bulk_update(batch, ['value_minor', 'value_exponent', 'currency'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape', '0003_alter_scrapeddata_field_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapeddata',
+            name='currency',
+            field=models.CharField(blank=True, max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapeddata',
+            name='value_minor',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapeddata',
+            name='value_exponent',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+    ]
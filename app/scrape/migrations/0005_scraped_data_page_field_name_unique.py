@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:21
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicates(apps, schema_editor):
+    # Keep the most recent row of each (page, field_name) so the constraint can be created
+    ScrapedData = apps.get_model('scrape', 'ScrapedData')
+    duplicates = (
+        ScrapedData.objects.values('page_id', 'field_name')
+        .annotate(count=Count('id'), keep_id=Max('id'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        ScrapedData.objects.filter(page_id=duplicate['page_id'], field_name=duplicate['field_name']).exclude(
+            id=duplicate['keep_id']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape', '0004_scraped_data_price_minor_units'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='scrapeddata',
+            constraint=models.UniqueConstraint(fields=('page', 'field_name'), name='scraped_data_page_field_name_unique'),
+        ),
+    ]
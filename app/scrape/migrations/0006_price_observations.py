@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:24
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Range partitioned by month: the primary key must include the partition key, and rows of a
+# month without its partition yet (see PriceHistoryService.ensure_partition) go to the default one.
+CREATE_PRICE_OBSERVATIONS = """
+CREATE TABLE price_observations (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    page_id bigint NOT NULL REFERENCES pages (id) DEFERRABLE INITIALLY DEFERRED,
+    observed_at timestamp with time zone NOT NULL,
+    product_name text NULL,
+    value_minor bigint NULL,
+    currency varchar(3) NULL,
+    value_exponent smallint NULL CHECK (value_exponent >= 0),
+    price_table jsonb NOT NULL,
+    PRIMARY KEY (id, observed_at)
+) PARTITION BY RANGE (observed_at);
+CREATE TABLE price_observations_default PARTITION OF price_observations DEFAULT;
+CREATE INDEX price_obs_observed_at_brin ON price_observations USING brin (observed_at);
+CREATE INDEX price_obs_page_observed_idx ON price_observations (page_id, observed_at);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0003_page_web_url_unique'),
+        ('scrape', '0005_scraped_data_page_field_name_unique'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_PRICE_OBSERVATIONS, 'DROP TABLE price_observations;'),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='PriceObservation',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('observed_at', models.DateTimeField()),
+                        ('product_name', models.TextField(blank=True, null=True)),
+                        ('value_minor', models.BigIntegerField(blank=True, null=True)),
+                        ('currency', models.CharField(blank=True, max_length=3, null=True)),
+                        ('value_exponent', models.PositiveSmallIntegerField(blank=True, null=True)),
+                        ('price_table', models.JSONField(default=list)),
+                        ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_observations', to='pages.page')),
+                    ],
+                    options={
+                        'verbose_name': 'Price Observation',
+                        'verbose_name_plural': 'Price Observations',
+                        'db_table': 'price_observations',
+                        'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['observed_at'], name='price_obs_observed_at_brin'), models.Index(fields=['page', 'observed_at'], name='price_obs_page_observed_idx')],
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+import json
+
+
+def backfill_latest_prices(apps, schema_editor):
+    # The most recently updated scraped data of every live page becomes its latest price
+    ScrapedData = apps.get_model('scrape', 'ScrapedData')
+    LatestPrice = apps.get_model('scrape', 'LatestPrice')
+    rows = (
+        ScrapedData.objects.filter(deleted_at__isnull=True, page__deleted_at__isnull=True)
+        .select_related('page')
+        .order_by('page_id', 'updated_at', 'id')
+    )
+    batch, current = [], None
+    for scraped_data in rows.iterator(chunk_size=2000):
+        if current is not None and current.page_id != scraped_data.page_id:
+            batch.append(current)
+        current = scraped_data
+        if len(batch) >= 2000:
+            LatestPrice.objects.bulk_create([latest_price(LatestPrice, row) for row in batch])
+            batch = []
+    if current is not None:
+        batch.append(current)
+    LatestPrice.objects.bulk_create([latest_price(LatestPrice, row) for row in batch])
+
+
+def latest_price(LatestPrice, scraped_data):
+    try:
+        meta = json.loads(scraped_data.field_value_meta or '{}')
+    except ValueError:
+        meta = {}
+    return LatestPrice(
+        page_id=scraped_data.page_id,
+        web_id=scraped_data.page.web_id,
+        url=scraped_data.page.url,
+        product_name=scraped_data.field_name,
+        value_minor=scraped_data.value_minor,
+        currency=scraped_data.currency,
+        value_exponent=scraped_data.value_exponent,
+        price_table=meta.get('prices_minor') or [],
+        price_changed_at=scraped_data.updated_at,
+        last_seen_at=scraped_data.page.last_scraped or scraped_data.updated_at,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0004_page_pending_index'),
+        ('websites', '0002_website_crawl_limits'),
+        ('scrape', '0007_scraped_data_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestPrice',
+            fields=[
+                ('page', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='latest_price', serialize=False, to='pages.page')),
+                ('url', models.URLField()),
+                ('product_name', models.TextField(blank=True, null=True)),
+                ('value_minor', models.BigIntegerField(blank=True, null=True)),
+                ('currency', models.CharField(blank=True, max_length=3, null=True)),
+                ('value_exponent', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('price_table', models.JSONField(default=list)),
+                ('price_changed_at', models.DateTimeField()),
+                ('last_seen_at', models.DateTimeField()),
+                ('web', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_prices', to='websites.website')),
+            ],
+            options={
+                'verbose_name': 'Latest Price',
+                'verbose_name_plural': 'Latest Prices',
+                'db_table': 'latest_prices',
+                'indexes': [models.Index(fields=['web', 'price_changed_at'], name='latest_prices_web_changed_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_latest_prices, migrations.RunPython.noop),
+    ]
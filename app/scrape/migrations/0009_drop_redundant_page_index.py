@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0005_drop_redundant_web_index'),
+        ('scrape', '0008_latest_prices'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapeddata',
+            name='page',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='pages.page'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from rest_framework import viewsets
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .price_observation_serializer import PriceObservationSerializer
+from ..pages.pages_model import Page
+from ..services.base.logger_service import LoggerService
+from ..services.base.price_history_service import price_history_service
+from ..services.utils import status, success_response, error_response
+
+def parse_moment(value: str):
+    """
+    :param value: An ISO 8601 date ('2026-10-01') or datetime.
+    :return: The aware datetime (midnight UTC for a date), or None if the value is not valid.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            date = parse_date(value)
+            moment = datetime(date.year, date.month, date.day) if date else None
+    except ValueError:
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+class PriceHistoryViewSet(viewsets.ViewSet):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.logger_service = LoggerService(__name__)
+
+    def retrieve(self, request, page_id: int):
+        """
+        :param request: The HTTP request object; 'start' and 'end' query parameters bound the range
+                        (the last PRICE_HISTORY_DEFAULT_DAYS days by default, end exclusive).
+        :param page_id: The page whose price history is returned.
+        :return: A success response with the page's price changes in the range, oldest first, and
+                 the price in effect at its start.
+        """
+        page = Page.objects.filter(id=page_id).first()
+        if page is None:
+            return error_response("Page not found", code=status.HTTP_404_NOT_FOUND)
+
+        end = timezone.now()
+        if request.query_params.get('end'):
+            end = parse_moment(request.query_params['end'])
+        start = end - timedelta(days=settings.PRICE_HISTORY_DEFAULT_DAYS) if end else None
+        if request.query_params.get('start'):
+            start = parse_moment(request.query_params['start'])
+
+        if start is None or end is None:
+            return error_response("'start' and 'end' must be ISO 8601 dates or datetimes", code=status.HTTP_400_BAD_REQUEST)
+        if start >= end:
+            return error_response("'start' must be before 'end'", code=status.HTTP_400_BAD_REQUEST)
+
+        observations = price_history_service.history(page, start, end)
+        serializer = PriceObservationSerializer(observations, many=True)
+        # Observations are price changes; the one before the range gives the price at its start
+        previous = price_history_service.price_at(page, start)
+        return success_response({
+            'page': page.url,
+            'start': start,
+            'end': end,
+            'price_at_start': PriceObservationSerializer(previous).data if previous else None,
+            'observations': serializer.data,
+        }, status.HTTP_200_OK)
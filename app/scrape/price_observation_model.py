@@ -0,0 +1,31 @@
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import models
+from ..pages.pages_model import Page
+
+class PriceObservation(models.Model):
+    """
+    Append-only record of a page's price at each scrape. In PostgreSQL the table is range
+    partitioned by month on observed_at (see PriceHistoryService), so the primary key in the
+    database is (id, observed_at).
+    """
+    id = models.BigAutoField(primary_key=True)
+    page = models.ForeignKey(Page, on_delete=models.CASCADE, related_name='price_observations')
+    observed_at = models.DateTimeField()
+    product_name = models.TextField(null=True, blank=True)
+    # Price and tier table in units of 10 ** -value_exponent of the currency (cents when null)
+    value_minor = models.BigIntegerField(null=True, blank=True)
+    currency = models.CharField(max_length=3, null=True, blank=True)
+    value_exponent = models.PositiveSmallIntegerField(null=True, blank=True)
+    price_table = models.JSONField(default=list)
+
+    class Meta:
+        db_table = 'price_observations'
+        verbose_name = 'Price Observation'
+        verbose_name_plural = 'Price Observations'
+        indexes = [
+            BrinIndex(fields=['observed_at'], name='price_obs_observed_at_brin'),
+            models.Index(fields=['page', 'observed_at'], name='price_obs_page_observed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.page_id} @ {self.observed_at}: {self.value_minor} {self.currency}"
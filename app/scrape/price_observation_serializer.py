@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from .price_observation_model import PriceObservation
+from ..services.base.price_parser import ParsedPrice
+
+class PriceObservationSerializer(serializers.ModelSerializer):
+    price = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PriceObservation
+        fields = [
+            'observed_at',
+            'product_name',
+            'price',
+            'value_minor',
+            'currency',
+            'value_exponent',
+            'price_table',
+        ]
+        read_only_fields = fields
+
+    def get_price(self, observation):
+        """The observed price formatted for display, e.g. '1234.50 €' or '0.045 €'."""
+        if observation.value_minor is None or not observation.currency:
+            return None
+        return ParsedPrice(observation.value_minor, observation.currency, observation.value_exponent).format()
@@ -3,10 +3,19 @@ from django.utils import timezone
 from ..pages.pages_model import Page
 
 class ScrapedData(models.Model):
-    page = models.ForeignKey(Page, on_delete=models.CASCADE)
+    # Indexed by scraped_data_page_field_name_unique, whose leading column is page_id
+    page = models.ForeignKey(Page, on_delete=models.CASCADE, db_index=False)
     field_name = models.TextField()
     field_value = models.TextField()
     field_value_meta = models.TextField() # json values
+    # field_value parsed at ingest, in units of 10 ** -value_exponent of the currency
+    value_minor = models.BigIntegerField(null=True, blank=True)
+    currency = models.CharField(max_length=3, null=True, blank=True)
+    # Decimals of value_minor and the tiers' prices_minor: the currency's minor unit (cents)
+    # when null, more for sub-cent prices
+    value_exponent = models.PositiveSmallIntegerField(null=True, blank=True)
+    # sha256 of field_value and field_value_meta; an unchanged scrape is not rewritten
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
@@ -20,6 +29,9 @@ class ScrapedData(models.Model):
         db_table = 'scraped_data'
         verbose_name = 'Scraped Data'
         verbose_name_plural = 'Scraped Data'
+        constraints = [
+            models.UniqueConstraint(fields=['page', 'field_name'], name='scraped_data_page_field_name_unique'),
+        ]
 
     def __str__(self):
         return f"{self.field_name}: {self.field_value}"
@@ -9,6 +9,9 @@ class ScrapedDataSerializer(serializers.ModelSerializer):
             'field_name', 
             'field_value', 
             'field_value_meta', 
+            'value_minor',
+            'currency',
+            'value_exponent',
             'date_created', 
             'updated_at', 
             'deleted_at'
@@ -18,6 +21,9 @@ class ScrapedDataSerializer(serializers.ModelSerializer):
             'field_name': {'required': True},
             'field_value': {'required': True},
             'field_value_meta': {'required': False},  # Optional for flexibility
+            'value_minor': {'read_only': True},
+            'currency': {'read_only': True},
+            'value_exponent': {'read_only': True},
             'date_created': {'read_only': True},
             'updated_at': {'read_only': True},
             'deleted_at': {'required': False}, 
@@ -1,9 +1,18 @@
+import asyncio
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from asgiref.sync import sync_to_async, async_to_sync
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from ..websites.websites_model import Website, KABELBINDER
 from ..criterias.criterias_model import Criterias
 from ..services.base.logger_service import LoggerService
+from ..services.base.host_scheduler import host_scheduler
+from ..services.base.retry_policy import crawl_budget
+from ..services.base.circuit_breaker_registry import circuit_breaker_registry
+from ..services.base.extraction_plan import extraction_plan_cache, PRODUCT, PRICE, PRICE_TABLE
+from ..services.base.copy_ingest_service import INGEST_BACKENDS
 from ..services.scraping.kabelbinder_service import KabelBinderService
 from ..services.scraping.scraped_data_service import ScrapedDataService
 from ..services.base.page_service import PageService, Page
@@ -15,13 +24,15 @@ class ScrapedDataViewSet(viewsets.ViewSet):
         self.logger_service = LoggerService(__name__)
         self.page_service = PageService()
         self.scraped_data_service = ScrapedDataService()
+        self.ingest_backend = settings.SCRAPING_INGEST_BACKEND
 
     def _initialize_scraper_service(self, website: Website):
         """
         :param website: The Website instance for which to initialize the scraper service.
         :return: An instance of the appropriate scraping service.
         """
-        if website.name == KABELBINDER:
+        # Websites declaring their extraction through criteria meta share the generic crawl
+        if website.name == KABELBINDER or extraction_plan_cache.get(website).declarative:
             return KabelBinderService()
         return ScrapedDataService()
 
@@ -35,13 +46,22 @@ class ScrapedDataViewSet(viewsets.ViewSet):
         if isinstance(website, Response):
             return website
 
+        # Page discovery writes category listings through the ORM only
+        if action_type == "pages" and 'ingest' in request.data:
+            return error_response("'ingest' is only supported by sync-scraped-data", code=status.HTTP_400_BAD_REQUEST)
+
+        self.ingest_backend = request.data.get('ingest', settings.SCRAPING_INGEST_BACKEND)
+        if self.ingest_backend not in INGEST_BACKENDS:
+            return error_response(f"'ingest' must be one of {list(INGEST_BACKENDS)}", code=status.HTTP_400_BAD_REQUEST)
+
         self.scraper_service = self._initialize_scraper_service(website)
+        host_scheduler.configure_website(website)
 
         try:
             response = async_to_sync(self.process_data)(website, action_type)
             return success_response("Data synced successfully", status.HTTP_200_OK) if response else error_response("No response found", status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            self.logger_service.error(f"Error syncing data: {str(e)}")
+            self.logger_service.error("Error syncing data: %s", e)
             return error_response("An error occurred while syncing data", status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['post'])
@@ -60,6 +80,14 @@ class ScrapedDataViewSet(viewsets.ViewSet):
         """
         return self._handle_sync_action(request, "scraped_data")
 
+    @action(detail=False, methods=['get'])
+    def circuit_breakers(self, request):
+        """
+        :param request: The HTTP request object.
+        :return: The state of every scraping circuit breaker, for monitoring.
+        """
+        return success_response({'circuit_breakers': circuit_breaker_registry.snapshot()}, status.HTTP_200_OK)
+
     async def process_data(self, website: Website, action_type: str) -> bool:
         """
         :param website: The Website instance to process data for.
@@ -69,33 +97,95 @@ class ScrapedDataViewSet(viewsets.ViewSet):
         if not self.scraper_service:
             return False
 
-        if action_type == "pages":
-            return await self.process_pages(website)
-        elif action_type == "scraped_data":
-            return await self.process_scraped_data(website)
+        with crawl_budget(settings.SCRAPING_CRAWL_DEADLINE):
+            if action_type == "pages":
+                return await self.process_pages(website)
+            elif action_type == "scraped_data":
+                return await self.process_scraped_data(website)
         return False
 
     async def process_pages(self, website: Website) -> bool:
         """
+        Discovered category listings flow through a bounded queue and are persisted in chunks
+        while the remaining categories are still being fetched. Only listings whose fingerprint
+        changed write pages; products gone from every listing are soft-deleted at the end and
+        pages not scraped within SCRAPING_RESCRAPE_INTERVAL are requeued.
         :param website: The Website instance for which pages are being processed.
         :return: A boolean indicating success or failure of the pages processing.
         """
-        nav_selector = await sync_to_async(
-            lambda: list(Criterias.objects.filter(web_id=website.id, type='nav').values_list('css_selector', flat=True))
-        )()
-        content_selectors = await sync_to_async(self.get_content_selectors)(website)
-        response = await self.scraper_service.get_pages(website.base_url, nav_selector, content_selectors)
-        if not response or not isinstance(response, dict):
-            self.logger_service.warning(f"Invalid response received from scraper service for website: {website.name}")
+        if not isinstance(self.scraper_service, KabelBinderService):
+            self.logger_service.warning("Website %s is not supported for scraping.", website.name)
             return False
 
-        urls = self.scraper_service.extract_urls(response)
-        if urls:
-            await sync_to_async(self.page_service.process_pages_batch)(website, urls)
-            return True
+        nav_selector, pagination = await self.get_nav_selectors(website)
+        content_selectors = await self.get_content_selectors(website)
 
-        self.logger_service.warning(f"No URLs extracted from the response for website: {website.name}")
-        return False
+        queue = asyncio.Queue(maxsize=settings.SCRAPING_PAGES_QUEUE_SIZE)
+        producer = asyncio.create_task(self._produce_pages(website, nav_selector, content_selectors, pagination, queue))
+        try:
+            listed_urls, removed_urls = await self._persist_pages(website, queue)
+        except BaseException:
+            # Nothing reads the queue any more, so a producer blocked on it must be stopped
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            raise
+        await producer
+
+        if not listed_urls:
+            self.logger_service.warning("No URLs extracted from the response for website: %s", website.name)
+            return False
+
+        deleted = await sync_to_async(self.page_service.finish_category_sync)(website, listed_urls, removed_urls)
+        requeued = await sync_to_async(self.page_service.requeue_pages)(website)
+        self.logger_service.info("Removed %s pages and requeued %s stale pages for website: %s", deleted, requeued, website.name)
+        return True
+
+    async def _produce_pages(self, website: Website, nav_selector: list, content_selectors: list, pagination: dict,
+                             queue: asyncio.Queue):
+        """
+        Feeds each category listing into the queue, ending with None as end-of-stream marker.
+        A cancelled producer puts no marker, since its consumer is gone.
+        """
+        try:
+            async for listing in self.scraper_service.get_pages(website.base_url, nav_selector, content_selectors,
+                                                                pagination=pagination):
+                await queue.put(listing)
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    async def _persist_pages(self, website: Website, queue: asyncio.Queue) -> tuple:
+        """
+        Persists queued category listings in chunks of about SCRAPING_PAGES_CHUNK_SIZE pages.
+        Listings that failed to load are counted as listed but left as stored.
+        :return: The set of category URLs listed by the navigation and the set of product URLs
+                 that dropped off a listing.
+        """
+        chunk_size = settings.SCRAPING_PAGES_CHUNK_SIZE
+        chunk, chunk_pages = [], 0
+        listed_urls, removed_urls = set(), set()
+        totals = {'unchanged': 0, 'changed': 0, 'created': 0, 'requeued': 0}
+
+        while True:
+            listing = await queue.get()
+            if listing is not None:
+                listed_urls.add(listing['url'])
+                if 'pages' in listing:
+                    chunk.append(listing)
+                    chunk_pages += len(listing['pages'])
+            if chunk and (listing is None or chunk_pages >= chunk_size):
+                result = await sync_to_async(self.page_service.process_category_listings)(website, chunk)
+                removed_urls.update(result.pop('removed'))
+                for key, value in result.items():
+                    totals[key] += value
+                chunk, chunk_pages = [], 0
+            if listing is None:
+                self.logger_service.info(
+                    "Category listings for website %s: %s changed, %s unchanged, %s pages added, %s requeued",
+                    website.name, totals['changed'], totals['unchanged'], totals['created'], totals['requeued'],
+                )
+                return listed_urls, removed_urls
 
     async def process_scraped_data(self, website: Website) -> bool:
         """
@@ -105,77 +195,126 @@ class ScrapedDataViewSet(viewsets.ViewSet):
         if not self.scraper_service:
             return False
 
-        content_selectors = await sync_to_async(self.get_content_selectors)(website)
-        pending_pages = await sync_to_async(
-            lambda: list(Page.objects.filter(
-                web=website,
-                status='pending',
-                deleted_at__isnull=True
-            ))
-        )()
+        plan = await extraction_plan_cache.aget(website)
+        pending_pages = [page async for page in Page.objects.filter(web=website, status='pending', deleted_at__isnull=True)]
 
         if not pending_pages:
-            self.logger_service.warning(f"No pending pages found for website: {website.name}")
+            self.logger_service.warning("No pending pages found for website: %s", website.name)
             return False
 
-        self.logger_service.info(f"Found {len(pending_pages)} pending pages for website: {website.name}")
+        self.logger_service.info("Found %s pending pages for website: %s", len(pending_pages), website.name)
 
-        urls = [page.url for page in pending_pages]
-        batch_size = 25
+        if not isinstance(self.scraper_service, KabelBinderService):
+            self.logger_service.warning("Website %s is not supported for scraping.", website.name)
+            return False
 
-        for start in range(0, len(urls), batch_size):
-            url_batch = urls[start:start + batch_size]
-            if website.name == KABELBINDER:
-                response = await self.scraper_service.get_data(content_selectors, url_batch)
-                if response.get("data"):
-                    await self._process_scraped_data_batch(pending_pages, response["data"], start)
-                else:
-                    self.logger_service.warning(f"No data returned for batch starting at {start} for website: {website.name}")
-                self.logger_service.info(f"Response for batch starting at {start}: {response.get('data', 'No data in response')}")
-            else:
-                self.logger_service.warning(f"Website {website.name} is not supported for scraping.")
-                return False
+        # Outcomes arrive keyed by URL in completion order and are persisted in chunks as they come
+        pages_by_url = {page.url: page for page in pending_pages}
+        chunk_size = settings.SCRAPING_DATA_CHUNK_SIZE
+        chunk = []
+        scraped, failed, changed = 0, 0, 0
 
+        async for url, outcome in self.scraper_service.get_data(plan.classes, list(pages_by_url), plan):
+            page = pages_by_url.get(url)
+            if page is None:
+                self.logger_service.warning("Received data for unknown page: %s", url)
+                continue
+            chunk.append((page, outcome))
+            if len(chunk) >= chunk_size:
+                chunk_scraped, chunk_failed, chunk_changed = await sync_to_async(self._persist_scraped_data)(chunk)
+                scraped, failed, changed = scraped + chunk_scraped, failed + chunk_failed, changed + chunk_changed
+                chunk = []
+
+        if chunk:
+            chunk_scraped, chunk_failed, chunk_changed = await sync_to_async(self._persist_scraped_data)(chunk)
+            scraped, failed, changed = scraped + chunk_scraped, failed + chunk_failed, changed + chunk_changed
+
+        self.logger_service.info("Scraped %s pages (%s prices changed), %s failed for website: %s", scraped, changed, failed, website.name)
         return True
 
-    async def _process_scraped_data_batch(self, pending_pages, data_batch, start):
+    def _persist_scraped_data(self, records: list) -> tuple:
         """
-        Process a batch of scraped data and update the corresponding pages.
+        Upserts the scraped data of all successful pages in one statement and updates the pages'
+        statuses in bulk. Unchanged prices are not rewritten.
+        :param records: (page, outcome) pairs; an outcome with 'error' marks the page as failed.
+        :return: The number of scraped and failed pages, and of scraped data rows written.
         """
+        now = timezone.now()
+        errors = {}
+        scraped_records = []
+        changed = 0
+
+        for page, outcome in records:
+            if outcome.get('error'):
+                errors[page.pk] = outcome['error']
+                continue
+            extra_fields = {key: value for key, value in outcome.items() if key not in (PRODUCT, PRICE, PRICE_TABLE)}
+            scraped_records.append((page, [{
+                "field_name": outcome.get(PRODUCT) or "N/A",
+                "field_value": outcome.get(PRICE) or "N/A",
+                "field_value_meta": {"prices": outcome.get(PRICE_TABLE) or [], **extra_fields}
+            }]))
+
+        try:
+            with transaction.atomic():
+                changed = self.scraped_data_service.upsert_scraped_data(scraped_records, self.ingest_backend)
+        except Exception as e:
+            # Store page by page so one bad row only fails its own page
+            self.logger_service.error("Bulk upsert of scraped data failed, retrying per page: %s", e)
+            for page, items in scraped_records:
+                try:
+                    with transaction.atomic():
+                        changed += self.scraped_data_service.upsert_scraped_data([(page, items)], self.ingest_backend)
+                except Exception as e:
+                    self.logger_service.error("Error processing page %s: %s", page.url, e)
+                    errors[page.pk] = f"Error storing scraped data: {str(e)}"
+
         updates = []
         failed_pages = []
-        
-        for page, resp in zip(pending_pages[start:start + len(data_batch)], data_batch):
-            try:
-                if resp:
-                    scraped_data_items = [{
-                        "field_name": resp.get("product", "N/A"),
-                        "field_value": resp.get("price", "N/A"),
-                        "field_value_meta": {"prices": resp.get("price_table", [])}
-                    }]
-                    await sync_to_async(self.scraped_data_service.createScrapedData)(page, scraped_data_items)
-                    page.status = 'scraped'
-                else:
-                    page.status = 'failed'
-                updates.append(page)
-            except Exception as e:
-                self.logger_service.error(f"Error processing page {page.url}: {str(e)}")
+        for page, outcome in records:
+            error = errors.get(page.pk)
+            if error:
+                page.status = 'error'
+                page.error_message = error
                 failed_pages.append(page.url)
+            else:
+                page.status = 'scraped'
+                page.error_message = None
+                page.last_scraped = now
+            page.updated_at = now
+            updates.append(page)
 
-        # Bulk update page statuses
-        if updates:
-            await sync_to_async(Page.objects.bulk_update)(updates, ['status'])
+        Page.objects.bulk_update(updates, ['status', 'error_message', 'last_scraped', 'updated_at'])
 
         if failed_pages:
-            self.logger_service.warning(f"Failed to process the following pages: {failed_pages}")
+            self.logger_service.warning("Failed to scrape %d pages: %s", len(failed_pages), failed_pages)
 
-        self.logger_service.info(f"Processed batch starting at {start} with {len(updates)} pages updated.")
+        return len(updates) - len(failed_pages), len(failed_pages), changed
+
+    async def get_nav_selectors(self, website: Website) -> tuple:
+        """
+        A nav criteria whose meta has {"role": "pagination"} selects the category listing pager
+        instead of navigation links; its meta may set "page_param" (default 'p') and "max_pages".
+        :param website: The Website instance for which to retrieve navigation selectors.
+        :return: The navigation CSS selectors and the listing pagination (None when not configured).
+        """
+        nav_selector, pagination = [], None
+        async for css_selector, meta in Criterias.objects.filter(web_id=website.id, type='nav').values_list('css_selector', 'meta'):
+            if isinstance(meta, dict) and meta.get('role') == 'pagination':
+                pagination = {
+                    'classes': [cls for cls in css_selector.split('|') if cls],
+                    'page_param': meta.get('page_param', 'p'),
+                    'max_pages': meta.get('max_pages', settings.SCRAPING_LISTING_MAX_PAGES),
+                }
+            else:
+                nav_selector.append(css_selector)
+        return nav_selector, pagination
 
-    def get_content_selectors(self, website: Website):
+    async def get_content_selectors(self, website: Website):
         """
         :param website: The Website instance for which to retrieve content selectors.
         :return: A list of CSS selectors for content criteria associated with the website.
         """
         content_selectors = Criterias.objects.filter(web_id=website.id, type='content').values_list('css_selector', flat=True)
 
-        return [item for selector in content_selectors for item in selector.split('|')]
+        return [item async for selector in content_selectors for item in selector.split('|')]
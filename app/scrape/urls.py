@@ -1,7 +1,12 @@
 from django.urls import path
 from .scraped_data_view import ScrapedDataViewSet
+from .price_history_view import PriceHistoryViewSet
+from .latest_price_view import LatestPriceViewSet
 
 urlpatterns = [
     path('sync-pages/', ScrapedDataViewSet.as_view({'post': 'sync_pages'}), name='scraped_data_sync_pages'),
     path('sync-scraped-data/', ScrapedDataViewSet.as_view({'post': 'sync_scraped_data'}), name='scraped_data_sync_scraped_data'),
+    path('circuit-breakers/', ScrapedDataViewSet.as_view({'get': 'circuit_breakers'}), name='scraped_data_circuit_breakers'),
+    path('price-history/<int:page_id>/', PriceHistoryViewSet.as_view({'get': 'retrieve'}), name='scraped_data_price_history'),
+    path('latest-prices/', LatestPriceViewSet.as_view({'get': 'list'}), name='scraped_data_latest_prices'),
 ]
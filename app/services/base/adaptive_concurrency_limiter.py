@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from .logger_service import LoggerService
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, min_limit: int = 1, max_limit: int = 50, initial_limit: int = 5,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0, name: str = 'default'):
+        """
+        Bounds in-flight requests with an AIMD policy: the limit grows by roughly one slot per
+        window of successful, stable-latency requests and is cut multiplicatively on overload
+        signals (timeouts, 5xx, open circuit breaker).
+
+        The limiter is safe to share between event loops, so one instance can learn across
+        syncs for the lifetime of the process.
+
+        :param min_limit: The lowest concurrency the limiter will back off to.
+        :param max_limit: The highest concurrency the limiter will grow to.
+        :param initial_limit: The concurrency to start with.
+        :param decrease_factor: The multiplier applied to the limit on overload.
+        :param latency_tolerance: How many times the average latency a request may take
+                                  before it stops counting towards an increase.
+        :param name: A label used in log messages.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.name = name
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.latency_ewma = None
+        self.last_decrease = 0.0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        self.logger_service = LoggerService(__name__)
+
+    async def acquire(self) -> None:
+        """
+        Waits until a slot is free under the current limit and takes it.
+        """
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    else:
+                        # Already woken: hand the wake-up on to the next waiter
+                        self._wake_waiters()
+                raise
+
+    def release(self, latency: float = None, overloaded: bool = False) -> None:
+        """
+        Frees a slot and adapts the limit to the outcome of the request that held it.
+
+        :param latency: How long the request took in seconds (None if it did not complete).
+        :param overloaded: Whether the request hit an overload signal.
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if overloaded:
+                self._decrease()
+            elif latency is not None:
+                self._increase(latency)
+            self._wake_waiters()
+
+    def _increase(self, latency: float) -> None:
+        """
+        Additive increase while latency stays within tolerance of its moving average.
+        """
+        stable = self.latency_ewma is None or latency <= self.latency_ewma * self.latency_tolerance
+        self.latency_ewma = latency if self.latency_ewma is None else 0.9 * self.latency_ewma + 0.1 * latency
+        if stable:
+            self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+
+    def _decrease(self) -> None:
+        """
+        Multiplicative decrease, at most once per average round-trip so a burst of failures
+        from the same congested window only counts once.
+        """
+        now = time.monotonic()
+        if now - self.last_decrease < (self.latency_ewma or 0.0):
+            return
+        self.last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self.logger_service.warning(f"Concurrency limiter '{self.name}' backing off from {int(previous)} to {int(self.limit)}")
+
+    def _wake_waiters(self) -> None:
+        """
+        Wakes as many waiters as there are free slots; called with the lock held.
+        """
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            loop = waiter.get_loop()
+            if waiter.done() or loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(self._resolve, waiter)
+            free -= 1
+
+    @staticmethod
+    def _resolve(waiter) -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+    async def run(self, coro_fn, *args, is_overloaded=None, **kwargs):
+        """
+        Runs a coroutine function inside a slot and feeds its outcome back to the limiter.
+
+        :param coro_fn: The coroutine function to call.
+        :param is_overloaded: Optional callable classifying a returned result or raised
+                              exception as an overload signal (timeouts always count).
+        :return: The coroutine's result.
+        """
+        await self.acquire()
+        started = time.monotonic()
+        latency, overloaded = None, False
+        try:
+            result = await coro_fn(*args, **kwargs)
+            overloaded = bool(is_overloaded and is_overloaded(result))
+            latency = time.monotonic() - started
+            return result
+        except Exception as e:
+            overloaded = isinstance(e, asyncio.TimeoutError) or bool(is_overloaded and is_overloaded(e))
+            raise
+        finally:
+            self.release(latency, overloaded)
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from contextlib import ExitStack, asynccontextmanager
+from datetime import datetime, timedelta, timezone
+import aiohttp
+import pybreaker
+from django.conf import settings
+from .logger_service import LoggerService
+from .retry_policy import DeadlineExceeded
+
+class CircuitBreakerLogListener(pybreaker.CircuitBreakerListener):
+    def __init__(self, logger_service: LoggerService):
+        """
+        Logs every state change and records when each breaker last opened.
+        """
+        self.logger_service = logger_service
+        self.opened_at = {}
+
+    def state_change(self, cb, old_state, new_state):
+        old_name = old_state.name if old_state else None
+        if new_state.name == pybreaker.STATE_OPEN:
+            self.opened_at[cb.name] = datetime.now(timezone.utc)
+        else:
+            self.opened_at.pop(cb.name, None)
+        self.logger_service.warning("Circuit breaker '%s' changed state: %s -> %s", cb.name, old_name, new_state.name)
+
+def _is_not_transport_error(exception) -> bool:
+    """
+    Endpoint breakers only trip when the microservice itself cannot be reached; slow or
+    failing target shops surface as timeouts and HTTP errors and are tracked per host.
+    """
+    return not isinstance(exception, aiohttp.ClientConnectionError) or isinstance(exception, TimeoutError)
+
+class CircuitBreakerRegistry:
+    ENDPOINT = 'endpoint'
+    HOST = 'host'
+
+    def __init__(self):
+        """
+        Process-wide circuit breakers keyed by microservice endpoint and by target host, so
+        breaker state accumulates across syncs and a failing shop does not block healthy ones.
+        """
+        self._breakers = {}
+        self._probing = set()
+        self._lock = threading.Lock()
+        self.logger_service = LoggerService(__name__)
+        self._listener = CircuitBreakerLogListener(self.logger_service)
+
+    def get(self, kind: str, key: str) -> pybreaker.CircuitBreaker:
+        """
+        :param kind: ENDPOINT or HOST.
+        :param key: The endpoint URL or target host.
+        :return: The shared breaker for this key, created on first use.
+        """
+        name = f"{kind}:{key}"
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                exclude = [DeadlineExceeded, asyncio.CancelledError]
+                if kind == self.ENDPOINT:
+                    exclude.append(_is_not_transport_error)
+                breaker = self._breakers[name] = pybreaker.CircuitBreaker(
+                    fail_max=settings.SCRAPING_BREAKER_FAIL_MAX,
+                    reset_timeout=settings.SCRAPING_BREAKER_RESET_TIMEOUT,
+                    exclude=exclude,
+                    listeners=[self._listener],
+                    name=name,
+                )
+            return breaker
+
+    def _is_probe(self, breaker: pybreaker.CircuitBreaker) -> bool:
+        """
+        :return: True if the next call through this breaker is a half-open trial call: it is
+                 half-open, or open for longer than its reset timeout (pybreaker moves it to
+                 half-open when that call starts).
+        """
+        if breaker.current_state == pybreaker.STATE_HALF_OPEN:
+            return True
+        if breaker.current_state == pybreaker.STATE_OPEN:
+            opened_at = self._listener.opened_at.get(breaker.name)
+            return opened_at is None or datetime.now(timezone.utc) >= opened_at + timedelta(seconds=breaker.reset_timeout)
+        return False
+
+    @asynccontextmanager
+    async def guard(self, endpoint: str, host: str = None):
+        """
+        Runs the block under the endpoint breaker and, when given, the host breaker. While a
+        breaker is half-open only one trial call is let through; concurrent callers fail fast.
+
+        :param endpoint: The microservice endpoint URL.
+        :param host: The target page host.
+        :raises pybreaker.CircuitBreakerError: If a breaker is open or already probing.
+        """
+        breakers = [self.get(self.ENDPOINT, endpoint)]
+        if host:
+            breakers.append(self.get(self.HOST, host))
+
+        probes = []
+        with self._lock:
+            for breaker in breakers:
+                if self._is_probe(breaker):
+                    if breaker.name in self._probing:
+                        raise pybreaker.CircuitBreakerError(f"Circuit breaker '{breaker.name}' is probing")
+                    probes.append(breaker.name)
+            self._probing.update(probes)
+
+        try:
+            with ExitStack() as stack:
+                for breaker in breakers:
+                    stack.enter_context(breaker.calling())
+                yield
+        finally:
+            with self._lock:
+                self._probing.difference_update(probes)
+
+    def snapshot(self) -> list:
+        """
+        :return: The state of every breaker, for monitoring.
+        """
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [
+            {
+                'name': breaker.name,
+                'state': breaker.current_state,
+                'fail_counter': breaker.fail_counter,
+                'fail_max': breaker.fail_max,
+                'reset_timeout': breaker.reset_timeout,
+                'opened_at': self._listener.opened_at.get(breaker.name),
+            }
+            for breaker in breakers
+        ]
+
+circuit_breaker_registry = CircuitBreakerRegistry()
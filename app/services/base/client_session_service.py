@@ -0,0 +1,62 @@
+import asyncio
+import weakref
+import aiohttp
+from django.conf import settings
+from .logger_service import LoggerService
+
+class ClientSessionService:
+    def __init__(self):
+        """
+        Keeps one pooled aiohttp session per event loop so every scraper service shares
+        the same keep-alive connections instead of opening a new connector per fetch.
+        """
+        self._sessions = weakref.WeakKeyDictionary()
+        self.logger_service = LoggerService(__name__)
+
+    def _create_connector(self) -> aiohttp.TCPConnector:
+        """
+        :return: A TCP connector tuned from the SCRAPING_HTTP_* settings.
+        """
+        return aiohttp.TCPConnector(
+            limit=settings.SCRAPING_HTTP_POOL_LIMIT,
+            limit_per_host=settings.SCRAPING_HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=settings.SCRAPING_HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=settings.SCRAPING_HTTP_DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        :return: The shared session bound to the running event loop, created on first use.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            self._discard_stale_sessions()
+            session = aiohttp.ClientSession(
+                connector=self._create_connector(),
+                timeout=aiohttp.ClientTimeout(total=settings.SCRAPING_HTTP_TIMEOUT),
+            )
+            self._sessions[loop] = session
+            self.logger_service.debug(f"Opened pooled client session for loop {id(loop)}")
+        return session
+
+    def _discard_stale_sessions(self) -> None:
+        """
+        Drops sessions whose event loop has already been closed (e.g. loops created by
+        async_to_sync under WSGI); their sockets can no longer be closed asynchronously.
+        """
+        for loop in [loop for loop in self._sessions.keys() if loop.is_closed()]:
+            self._sessions.pop(loop, None)
+
+    async def close(self) -> None:
+        """
+        Closes the session bound to the running event loop, if any.
+        """
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+            self.logger_service.debug("Closed pooled client session")
+        self._discard_stale_sessions()
+
+client_session_service = ClientSessionService()
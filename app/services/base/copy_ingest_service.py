@@ -0,0 +1,220 @@
+import json
+import time
+from django.db import connection, transaction
+from django.utils import timezone
+from ...pages.pages_model import Page
+from ...scrape.scraped_data_model import ScrapedData
+from ...scrape.price_observation_model import PriceObservation
+from ...scrape.latest_price_model import LatestPrice
+from .logger_service import LoggerService
+from .price_history_service import price_history_service, month_start
+
+# Ingest backends selectable per crawl: batched ORM statements, or COPY into a staging table
+ORM = 'orm'
+COPY = 'copy'
+INGEST_BACKENDS = (ORM, COPY)
+
+# COPY text format: backslash, tab and line breaks are escaped and NULL is \N
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def copy_value(value) -> str:
+    if value is None:
+        return '\\N'
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value, ensure_ascii=False)
+    return str(value).translate(_COPY_ESCAPES)
+
+def staging_table_sql(table: str, columns: tuple) -> str:
+    """
+    :param table: The temporary staging table.
+    :param columns: (column, model field) pairs; each column takes the type and nullability of
+                    its field, so staged values always fit the target table.
+    :return: The CREATE TEMP TABLE statement, dropped when the transaction commits.
+    """
+    definitions = ', '.join(
+        f"{column} {field.db_type(connection)}{'' if field.null else ' NOT NULL'}" for column, field in columns
+    )
+    return f"CREATE TEMP TABLE IF NOT EXISTS {table} ({definitions}) ON COMMIT DROP"
+
+class CopyStream:
+    def __init__(self, rows):
+        """
+        Read-only file object rendering rows in COPY text format as psycopg2 reads them, so the
+        rows are never held in memory as one buffer.
+
+        :param rows: An iterable of value tuples.
+        """
+        self.rows = iter(rows)
+        self.buffer = ''
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.buffer) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.buffer += '\t'.join(copy_value(value) for value in row) + '\n'
+            self.count += 1
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+    def readline(self, size: int = -1) -> str:
+        return self.read(size)
+
+MERGE_PAGES = f"""
+WITH staged AS (
+    SELECT DISTINCT url FROM ingest_pages
+), inserted AS (
+    INSERT INTO {Page._meta.db_table} (web_id, url, status, created_at)
+    SELECT %(web_id)s, url, 'pending', %(now)s FROM staged
+    ON CONFLICT (web_id, url) DO NOTHING
+    RETURNING 1
+), updated AS (
+    UPDATE {Page._meta.db_table} page
+    SET status = 'pending', last_scraped = NULL, error_message = NULL, deleted_at = NULL, updated_at = %(now)s
+    FROM staged
+    WHERE page.web_id = %(web_id)s AND page.url = staged.url
+      AND NOT (page.status = 'pending' AND page.last_scraped IS NULL AND page.error_message IS NULL AND page.deleted_at IS NULL)
+    RETURNING 1
+), removed AS (
+    UPDATE {Page._meta.db_table} page
+    SET deleted_at = %(now)s, updated_at = %(now)s
+    WHERE %(mark_missing)s AND page.web_id = %(web_id)s AND page.deleted_at IS NULL
+      AND NOT EXISTS (SELECT 1 FROM staged WHERE staged.url = page.url)
+    RETURNING page.id
+), forgotten AS (
+    DELETE FROM {LatestPrice._meta.db_table} WHERE page_id IN (SELECT id FROM removed)
+), unhashed AS (
+    UPDATE {ScrapedData._meta.db_table} SET content_hash = NULL
+    WHERE page_id IN (SELECT id FROM removed) AND content_hash IS NOT NULL
+)
+SELECT (SELECT count(*) FROM staged), (SELECT count(*) FROM inserted), (SELECT count(*) FROM updated), (SELECT count(*) FROM removed)
+"""
+
+MERGE_SCRAPED_DATA = f"""
+WITH changed AS (
+    SELECT staged.* FROM ingest_scraped_data staged
+    LEFT JOIN {ScrapedData._meta.db_table} stored
+      ON stored.page_id = staged.page_id AND stored.field_name = staged.field_name AND stored.deleted_at IS NULL
+    WHERE stored.content_hash IS DISTINCT FROM staged.content_hash
+), upserted AS (
+    INSERT INTO {ScrapedData._meta.db_table}
+        (page_id, field_name, field_value, field_value_meta, value_minor, currency, value_exponent, content_hash, created_at, updated_at, deleted_at)
+    SELECT page_id, field_name, field_value, field_value_meta, value_minor, currency, value_exponent, content_hash, %(now)s, %(now)s, NULL FROM changed
+    ON CONFLICT (page_id, field_name) DO UPDATE SET
+        field_value = EXCLUDED.field_value, field_value_meta = EXCLUDED.field_value_meta,
+        value_minor = EXCLUDED.value_minor, currency = EXCLUDED.currency, value_exponent = EXCLUDED.value_exponent,
+        content_hash = EXCLUDED.content_hash,
+        updated_at = EXCLUDED.updated_at, deleted_at = NULL
+    RETURNING 1
+), observed AS (
+    INSERT INTO {PriceObservation._meta.db_table} (page_id, observed_at, product_name, value_minor, currency, value_exponent, price_table)
+    SELECT page_id, %(now)s, field_name, value_minor, currency, value_exponent, price_table FROM changed
+    RETURNING 1
+), latest AS (
+    INSERT INTO {LatestPrice._meta.db_table}
+        (page_id, web_id, url, product_name, value_minor, currency, value_exponent, price_table, price_changed_at, last_seen_at)
+    SELECT DISTINCT ON (changed.page_id) changed.page_id, page.web_id, page.url, changed.field_name,
+        changed.value_minor, changed.currency, changed.value_exponent, changed.price_table, %(now)s, %(now)s
+    FROM changed JOIN {Page._meta.db_table} page ON page.id = changed.page_id
+    ORDER BY changed.page_id
+    ON CONFLICT (page_id) DO UPDATE SET
+        web_id = EXCLUDED.web_id, url = EXCLUDED.url, product_name = EXCLUDED.product_name,
+        value_minor = EXCLUDED.value_minor, currency = EXCLUDED.currency, value_exponent = EXCLUDED.value_exponent,
+        price_table = EXCLUDED.price_table, price_changed_at = EXCLUDED.price_changed_at, last_seen_at = EXCLUDED.last_seen_at
+), seen AS (
+    UPDATE {LatestPrice._meta.db_table} SET last_seen_at = %(now)s
+    WHERE page_id IN (SELECT page_id FROM ingest_scraped_data)
+      AND page_id NOT IN (SELECT page_id FROM changed)
+)
+SELECT (SELECT count(*) FROM upserted), (SELECT count(*) FROM observed)
+"""
+
+class CopyIngestService:
+    def __init__(self):
+        """
+        Bulk ingest for very large crawls: rows are streamed through COPY into a temporary
+        staging table and merged into the target tables, latest prices included, by one
+        set-based statement, with the same results as the ORM path
+        (PageService.process_pages_batch and ScrapedDataService.upsert_scraped_data).
+        PostgreSQL only.
+        """
+        self.logger_service = LoggerService(__name__)
+
+    def _copy(self, cursor, table: str, columns: tuple, rows) -> int:
+        stream = CopyStream(rows)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", stream)
+        return stream.count
+
+    def _report(self, name: str, rows: int, started: float) -> dict:
+        seconds = time.perf_counter() - started
+        rows_per_sec = rows / seconds if seconds else 0.0
+        self.logger_service.info(f"COPY ingest of {rows} {name} rows in {seconds:.3f}s ({rows_per_sec:.0f} rows/sec)")
+        return {'rows': rows, 'seconds': seconds, 'rows_per_sec': rows_per_sec}
+
+    def upsert_pages(self, website, urls, mark_missing: bool = False) -> dict:
+        """
+        :param website: The website instance associated with the pages.
+        :param urls: The URLs to insert or reset to pending.
+        :param mark_missing: Whether urls is the website's full set, so live pages not in it are soft-deleted.
+        :return: Counts of 'created', 'updated', 'unchanged' and 'removed' pages, plus 'rows',
+                 'seconds' and 'rows_per_sec' of the ingest.
+        """
+        started = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(staging_table_sql('ingest_pages', (('url', Page._meta.get_field('url')),)))
+            cursor.execute("TRUNCATE ingest_pages")
+            rows = self._copy(cursor, 'ingest_pages', ('url',), ((url,) for url in urls if url))
+            cursor.execute(MERGE_PAGES, {
+                'web_id': website.id,
+                'now': timezone.now(),
+                'mark_missing': bool(mark_missing and rows),
+            })
+            staged, created, updated, removed = cursor.fetchone()
+
+        return {
+            'created': created,
+            'updated': updated,
+            'unchanged': staged - created - updated,
+            'removed': removed,
+            **self._report('page', rows, started),
+        }
+
+    def upsert_scraped_data(self, scraped_data: list) -> dict:
+        """
+        :param scraped_data: Unsaved rows from ScrapedDataService.build_scraped_data, at most one per
+                             (page, field_name).
+        :return: The number of rows 'written' (new or changed), plus 'rows', 'seconds' and
+                 'rows_per_sec' of the ingest.
+        """
+        started = time.perf_counter()
+        now = timezone.now()
+
+        def rows():
+            for row in scraped_data:
+                meta = json.loads(row.field_value_meta or '{}')
+                yield (
+                    row.page_id, row.field_name, row.field_value, row.field_value_meta,
+                    row.value_minor, row.currency, row.value_exponent, row.content_hash, meta.get('prices_minor') or [],
+                )
+
+        with transaction.atomic():
+            price_history_service.ensure_partition(month_start(now))
+            with connection.cursor() as cursor:
+                columns = tuple(
+                    (field.column, field) for field in map(ScrapedData._meta.get_field, (
+                        'page', 'field_name', 'field_value', 'field_value_meta', 'value_minor', 'currency', 'value_exponent', 'content_hash',
+                    ))
+                ) + (('price_table', PriceObservation._meta.get_field('price_table')),)
+                cursor.execute(staging_table_sql('ingest_scraped_data', columns))
+                # The staging table lives until the outermost transaction commits
+                cursor.execute("TRUNCATE ingest_scraped_data")
+                copied = self._copy(cursor, 'ingest_scraped_data', tuple(column for column, _ in columns), rows())
+                cursor.execute(MERGE_SCRAPED_DATA, {'now': now})
+                written, _ = cursor.fetchone()
+
+        return {'written': written, **self._report('scraped data', copied, started)}
+
+copy_ingest_service = CopyIngestService()
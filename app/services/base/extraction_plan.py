@@ -0,0 +1,305 @@
+import threading
+from functools import lru_cache
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from ...criterias.criterias_model import Criterias
+from .logger_service import LoggerService
+from .selector_plan import SelectorPlan
+
+# Field roles: what is taken from a matched node
+TEXT = 'text'
+ATTRIBUTE = 'attribute'
+TABLE = 'table'
+ROLES = (TEXT, ATTRIBUTE, TABLE)
+
+# Fields the scrape pipeline persists as name, value and price tiers; any other field is kept as meta
+PRODUCT = 'product'
+PRICE = 'price'
+PRICE_TABLE = 'price_table'
+
+def clean_price(price: str) -> str:
+    """
+    Prices are kept as displayed and parsed into an amount and currency at ingest, so the raw
+    text survives for auditing and re-parsing.
+
+    :param price: A scraped price such as ' 1.234,50 €* '.
+    :return: The price without surrounding whitespace, e.g. '1.234,50 €*'.
+    """
+    return price.strip() if price else price
+
+POST_PROCESSORS = {
+    'strip': str.strip,
+    'lower': str.lower,
+    'collapse_whitespace': lambda value: ' '.join(value.split()),
+    'price': clean_price,
+}
+
+class FieldSpec:
+    def __init__(self, name: str, role: str, tag: str, classes: list, post: list = (), required: bool = True,
+                 attribute: str = None, table_class: str = 'table', cell_class: str = 'bulk-price'):
+        """
+        One extracted field: which nodes it comes from and how the value is taken and cleaned.
+
+        :param name: The output key.
+        :param role: TEXT (node text), ATTRIBUTE (an attribute value) or TABLE (cell texts of a price table).
+        :param tag: The HTML tag of matching nodes ('*' for any).
+        :param classes: Class names of matching nodes; any one of them matches.
+        :param post: Names of POST_PROCESSORS applied in order to every extracted value.
+        :param required: Whether a page without this field yields no result.
+        :param attribute: The attribute read for the ATTRIBUTE role.
+        :param table_class: The class of the table element for the TABLE role.
+        :param cell_class: The class of the span holding each cell's value for the TABLE role.
+        """
+        if role not in ROLES:
+            raise ValueError(f"Unknown extraction role '{role}' for field '{name}'")
+        if role == ATTRIBUTE and not attribute:
+            raise ValueError(f"Field '{name}' needs an 'attribute' for the attribute role")
+        unknown = [step for step in post if step not in POST_PROCESSORS]
+        if unknown:
+            raise ValueError(f"Unknown post-processing {unknown} for field '{name}'")
+
+        self.name = name
+        self.role = role
+        self.tag = tag
+        self.classes = tuple(classes)
+        self.post = tuple(POST_PROCESSORS[step] for step in post)
+        self.required = required
+        self.attribute = attribute
+        self.table_class = table_class
+        self.cell_class = cell_class
+
+    @classmethod
+    def from_criteria(cls, criteria: Criterias) -> 'FieldSpec':
+        """
+        Builds a field from a content criteria whose meta declares it, e.g.
+        {"field": "price", "role": "text", "post": ["price"], "required": true}.
+        The criteria's html_tag is the node tag and css_selector holds '|'-separated class names.
+
+        :param criteria: The Criterias row.
+        :return: The field specification.
+        :raises ValueError: If the meta is not a valid field declaration.
+        """
+        meta = criteria.meta or {}
+        return cls.from_meta(meta, criteria.html_tag, [cls_name for cls_name in criteria.css_selector.split('|') if cls_name])
+
+    @classmethod
+    def from_meta(cls, meta: dict, tag: str, classes: list) -> 'FieldSpec':
+        """
+        :param meta: The field declaration.
+        :param tag: The node tag.
+        :param classes: The node class names.
+        :return: The field specification.
+        :raises ValueError: If the declaration is invalid.
+        """
+        if not isinstance(meta, dict) or not meta.get('field'):
+            raise ValueError("Extraction meta must declare a 'field' name")
+        post = meta.get('post', [])
+        if not isinstance(post, list):
+            raise ValueError("Extraction meta 'post' must be a list")
+        return cls(
+            name=meta['field'],
+            role=meta.get('role', TEXT),
+            tag=tag,
+            classes=classes,
+            post=post,
+            required=bool(meta.get('required', True)),
+            attribute=meta.get('attribute'),
+            table_class=meta.get('table_class', 'table'),
+            cell_class=meta.get('cell_class', 'bulk-price'),
+        )
+
+    def extract(self, node: dict):
+        """
+        :param node: A node routed to this field.
+        :return: The raw value (a list of cell values for the TABLE role).
+        """
+        if self.role == TEXT:
+            return node.get('text')
+        if self.role == ATTRIBUTE:
+            return (node.get('attributes') or {}).get(self.attribute)
+        return table_cells(node.get('children') or (), self.table_class, self.cell_class)
+
+    def clean(self, value):
+        for step in self.post:
+            value = step(value)
+        return value
+
+def table_cells(children: list, table_class: str, cell_class: str) -> list:
+    """
+    :param children: The children of a price table container.
+    :param table_class: The class of the table elements to read.
+    :param cell_class: The class of the span holding a cell's value.
+    :return: The text of the first matching span in each cell of every table.
+    """
+    values = []
+    append = values.append
+    for child in children:
+        attributes = child.get('attributes')
+        if not attributes or table_class not in (attributes.get('class') or ()):
+            continue
+        for row in child.get('children') or ():
+            if row.get('tag') != 'tr':
+                continue
+            for cell in row.get('children') or ():
+                if cell.get('tag') != 'td':
+                    continue
+                for span in cell.get('children') or ():
+                    if span.get('tag') != 'span':
+                        continue
+                    attributes = span.get('attributes')
+                    if attributes and cell_class in (attributes.get('class') or ()):
+                        text = span.get('text')
+                        if text:
+                            append(text)
+                        break
+    return values
+
+class ExtractionPlan:
+    def __init__(self, fields: list, declarative: bool = False):
+        """
+        Compiled extraction for one website: nodes are routed to fields through a single
+        SelectorPlan lookup, then each field takes and cleans its value.
+
+        :param fields: FieldSpecs in priority order.
+        :param declarative: Whether the plan was declared through criteria meta rather than
+                            derived from selector positions.
+        """
+        self.fields = {field.name: field for field in fields}
+        self.declarative = declarative
+        self.selector_plan = SelectorPlan([(field.name, field.tag, field.classes) for field in fields])
+        self.classes = list(self.selector_plan.classes)
+
+    @classmethod
+    def from_classes(cls, classes: list) -> 'ExtractionPlan':
+        """
+        :param classes: Content selectors in positional order: title classes, price class,
+                        price table classes.
+        :return: The positional plan, shared by every crawl using the same selectors.
+        """
+        return _positional_plan(tuple(classes))
+
+    def extract(self, nodes: list) -> dict:
+        """
+        Walks the top-level nodes once. Text and attribute fields keep the last match; table
+        fields collect the cells of every matching table.
+
+        :param nodes: The 'scraped_data' list of a microservice response.
+        :return: Every field's cleaned value (None or [] when nothing matched).
+        """
+        values = {name: [] if field.role == TABLE else None for name, field in self.fields.items()}
+        for node in nodes:
+            name = self.selector_plan.role_for(node)
+            if name is None:
+                continue
+            field = self.fields[name]
+            value = field.extract(node)
+            if field.role == TABLE:
+                values[name].extend(value)
+            elif value is not None:
+                values[name] = value
+
+        for name, field in self.fields.items():
+            if field.post and values[name]:
+                value = values[name]
+                values[name] = [field.clean(item) for item in value] if field.role == TABLE else field.clean(value)
+        return values
+
+    def missing(self, values: dict) -> list:
+        """
+        :param values: The result of extract().
+        :return: The names of required fields without a value.
+        """
+        return [name for name, field in self.fields.items() if field.required and not values.get(name)]
+
+@lru_cache(maxsize=128)
+def _positional_plan(classes: tuple) -> ExtractionPlan:
+    return ExtractionPlan([
+        FieldSpec(PRODUCT, TEXT, 'h1', classes[:2]),
+        FieldSpec(PRICE, TEXT, 'div', classes[2:3], post=['price']),
+        FieldSpec(PRICE_TABLE, TABLE, 'div', classes[3:], post=['price']),
+    ])
+
+class ExtractionPlanCache:
+    def __init__(self):
+        """
+        Per-website extraction plans, compiled from the website's content criteria and reused
+        until the criteria change (added, removed or updated).
+        """
+        self._plans = {}
+        self._lock = threading.Lock()
+        self.logger_service = LoggerService(__name__)
+
+    def _criterias(self, website):
+        return Criterias.objects.filter(web_id=website.id, type=Criterias.CONTENT, deleted_at__isnull=True)
+
+    def _signature(self):
+        return {'count': Count('id'), 'last_id': Max('id'), 'updated_at': Max('updated_at')}
+
+    def _cached(self, website, signature: tuple) -> ExtractionPlan:
+        with self._lock:
+            cached = self._plans.get(website.id)
+        return cached[1] if cached and cached[0] == signature else None
+
+    def _store(self, website, signature: tuple, plan: ExtractionPlan) -> ExtractionPlan:
+        with self._lock:
+            self._plans[website.id] = (signature, plan)
+        return plan
+
+    def get(self, website) -> ExtractionPlan:
+        """
+        :param website: The Website instance.
+        :return: The website's compiled extraction plan.
+        """
+        signature = tuple(self._criterias(website).aggregate(**self._signature()).values())
+        return self._cached(website, signature) or self._store(website, signature, self.compile(website))
+
+    async def aget(self, website) -> ExtractionPlan:
+        """
+        Async get(): the criteria signature is read through the async ORM and the plan is only
+        compiled off the event loop when the criteria changed.
+
+        :param website: The Website instance.
+        :return: The website's compiled extraction plan.
+        """
+        signature = tuple((await self._criterias(website).aaggregate(**self._signature())).values())
+        plan = self._cached(website, signature)
+        if plan is None:
+            plan = self._store(website, signature, await sync_to_async(self.compile)(website))
+        return plan
+
+    def compile(self, website) -> ExtractionPlan:
+        """
+        Criteria whose meta declares a field make a declarative plan; invalid declarations are
+        logged and skipped. Without any, the plan is derived from selector positions.
+
+        :param website: The Website instance.
+        :return: The compiled extraction plan.
+        """
+        criterias = list(self._criterias(website).order_by('id'))
+        declared = [criteria for criteria in criterias if isinstance(criteria.meta, dict) and criteria.meta.get('field')]
+
+        if not declared:
+            classes = [cls for criteria in criterias for cls in criteria.css_selector.split('|')]
+            return ExtractionPlan.from_classes(classes)
+
+        fields = []
+        for criteria in sorted(declared, key=lambda criteria: criteria.meta.get('order', 0)):
+            try:
+                fields.append(FieldSpec.from_criteria(criteria))
+            except ValueError as e:
+                self.logger_service.error(f"Skipping criteria {criteria.id} for website {website.name}: {str(e)}")
+
+        self.logger_service.info(f"Compiled extraction plan for website {website.name}: {[field.name for field in fields]}")
+        return ExtractionPlan(fields, declarative=True)
+
+    def invalidate(self, website_id: int = None) -> None:
+        """
+        :param website_id: The website whose plan is dropped; all plans when omitted.
+        """
+        with self._lock:
+            if website_id is None:
+                self._plans.clear()
+            else:
+                self._plans.pop(website_id, None)
+
+extraction_plan_cache = ExtractionPlanCache()
@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from django.conf import settings
+from .logger_service import LoggerService
+
+class HostBucket:
+    def __init__(self, rate: float, burst: int, max_concurrency: int):
+        """
+        Token bucket plus concurrency cap for a single target host.
+
+        :param rate: Tokens (requests) added per second.
+        :param burst: The bucket capacity.
+        :param max_concurrency: The maximum number of in-flight requests to the host.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.waiters = deque()
+        self.granted = set()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def can_dispatch(self) -> bool:
+        return bool(self.waiters) and self.in_flight < self.max_concurrency and self.tokens >= 1
+
+    def time_to_token(self) -> float:
+        return max(0.0, (1 - self.tokens) / self.rate) if self.rate > 0 else 1.0
+
+class HostScheduler:
+    def __init__(self):
+        """
+        Politeness scheduler keyed by target host. Each host gets a token bucket and a
+        concurrency cap; waiting requests are dispatched round-robin across hosts so one large
+        shop cannot starve the others when several websites sync at once.
+        """
+        self._buckets = OrderedDict()
+        self._overrides = {}
+        self._lock = threading.Lock()
+        self._timer_due = None
+        self.logger_service = LoggerService(__name__)
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        """
+        :param url: A target page URL.
+        :return: The normalized host used as scheduling key ('www.' is folded).
+        """
+        host = (urlparse(url).hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def configure(self, host: str, rate: float = None, burst: int = None, max_concurrency: int = None) -> None:
+        """
+        Sets the politeness limits for a host; None falls back to the SCRAPING_HOST_* settings.
+
+        :param host: The target host.
+        :param rate: Requests per second.
+        :param burst: The number of requests allowed back to back.
+        :param max_concurrency: The maximum number of in-flight requests.
+        """
+        limits = (
+            rate or settings.SCRAPING_HOST_RATE,
+            burst or settings.SCRAPING_HOST_BURST,
+            max_concurrency or settings.SCRAPING_HOST_CONCURRENCY,
+        )
+        with self._lock:
+            self._overrides[host] = limits
+            bucket = self._buckets.get(host)
+            if bucket:
+                bucket.rate, bucket.burst, bucket.max_concurrency = limits
+
+    def configure_website(self, website) -> None:
+        """
+        :param website: The Website whose crawl_* fields configure its host.
+        """
+        self.configure(
+            self.host_for(website.base_url),
+            rate=website.crawl_rate,
+            burst=website.crawl_burst,
+            max_concurrency=website.crawl_concurrency,
+        )
+
+    def _bucket(self, host: str) -> HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst, max_concurrency = self._overrides.get(host, (
+                settings.SCRAPING_HOST_RATE,
+                settings.SCRAPING_HOST_BURST,
+                settings.SCRAPING_HOST_CONCURRENCY,
+            ))
+            bucket = self._buckets[host] = HostBucket(rate, burst, max_concurrency)
+        return bucket
+
+    async def acquire(self, host: str) -> None:
+        """
+        Waits for the host's turn: a free concurrency slot, a token, and its round-robin slot.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._bucket(host).waiters.append(waiter)
+            self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                bucket = self._buckets[host]
+                if waiter in bucket.granted:
+                    # Granted just before cancellation: give the slot back
+                    bucket.granted.discard(waiter)
+                    bucket.in_flight = max(0, bucket.in_flight - 1)
+                    self._dispatch()
+                elif waiter in bucket.waiters:
+                    bucket.waiters.remove(waiter)
+            raise
+        with self._lock:
+            self._buckets[host].granted.discard(waiter)
+
+    def release(self, host: str) -> None:
+        """
+        Frees the host's concurrency slot taken by acquire().
+        """
+        with self._lock:
+            bucket = self._buckets[host]
+            bucket.in_flight = max(0, bucket.in_flight - 1)
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """
+        Holds a politeness slot for the host of the given URL; URLs without a host pass through.
+        :param url: The target page URL.
+        """
+        host = self.host_for(url) if url else ''
+        if not host:
+            yield
+            return
+        await self.acquire(host)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    def _dispatch(self) -> None:
+        """
+        Grants waiting requests one per host per round, rotating the host order so the host
+        served last goes to the back. Called with the lock held.
+        """
+        now = time.monotonic()
+        for bucket in self._buckets.values():
+            bucket.refill(now)
+
+        granted = True
+        while granted:
+            granted = False
+            for host in list(self._buckets.keys()):
+                bucket = self._buckets[host]
+                while bucket.waiters and (bucket.waiters[0].done() or bucket.waiters[0].get_loop().is_closed()):
+                    bucket.waiters.popleft()
+                if not bucket.can_dispatch():
+                    continue
+                waiter = bucket.waiters.popleft()
+                bucket.tokens -= 1
+                bucket.in_flight += 1
+                bucket.granted.add(waiter)
+                waiter.get_loop().call_soon_threadsafe(self._resolve, waiter)
+                self._buckets.move_to_end(host)
+                granted = True
+
+        self._schedule_refill(now)
+
+    def _schedule_refill(self, now: float) -> None:
+        """
+        Arms a timer for the earliest host that only lacks tokens. Called with the lock held.
+        """
+        delays = [
+            (bucket.time_to_token(), bucket.waiters[0].get_loop())
+            for bucket in self._buckets.values()
+            if bucket.waiters and bucket.in_flight < bucket.max_concurrency and bucket.tokens < 1
+        ]
+        if not delays:
+            return
+        delay, loop = min(delays, key=lambda item: item[0])
+        due = now + delay
+        if self._timer_due is not None and self._timer_due <= due and self._timer_due > now:
+            return
+        self._timer_due = due
+        loop.call_soon_threadsafe(loop.call_later, delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer_due = None
+            self._dispatch()
+
+    @staticmethod
+    def _resolve(waiter) -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+host_scheduler = HostScheduler()
@@ -0,0 +1,80 @@
+from datetime import datetime
+from django.conf import settings
+from django.utils import timezone
+from ...scrape.latest_price_model import LatestPrice
+from ...scrape.scraped_data_model import ScrapedData
+from .logger_service import LoggerService
+from .price_history_service import price_history_service
+
+class LatestPriceService:
+    def __init__(self):
+        """
+        Maintains the latest_prices table incrementally as scraped data is ingested: changed
+        prices are upserted, unchanged pages only get their last seen time bumped, and
+        soft-deleted pages are removed.
+        """
+        self.logger_service = LoggerService(__name__)
+
+    def record(self, scraped_data: list, seen_page_ids: set, seen_at: datetime = None) -> int:
+        """
+        :param scraped_data: New or changed ScrapedData rows of this ingest.
+        :param seen_page_ids: Every page scraped in this ingest, changed or not.
+        :param seen_at: When the pages were scraped (now by default).
+        :return: The number of latest prices written.
+        """
+        seen_at = seen_at or timezone.now()
+        # One row per page; the last scraped field wins
+        latest = {}
+        for row in scraped_data:
+            observation = price_history_service.build_observation(row, seen_at)
+            latest[row.page_id] = LatestPrice(
+                page_id=row.page_id,
+                web_id=row.page.web_id,
+                url=row.page.url,
+                product_name=observation.product_name,
+                value_minor=observation.value_minor,
+                currency=observation.currency,
+                value_exponent=observation.value_exponent,
+                price_table=observation.price_table,
+                price_changed_at=seen_at,
+                last_seen_at=seen_at,
+            )
+
+        if latest:
+            LatestPrice.objects.bulk_create(
+                list(latest.values()),
+                batch_size=settings.SCRAPING_UPSERT_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['page'],
+                update_fields=['web', 'url', 'product_name', 'value_minor', 'currency', 'value_exponent', 'price_table', 'price_changed_at', 'last_seen_at'],
+            )
+
+        unchanged = set(seen_page_ids).difference(latest)
+        if unchanged:
+            LatestPrice.objects.filter(page_id__in=list(unchanged)).update(last_seen_at=seen_at)
+        return len(latest)
+
+    def forget(self, pages) -> int:
+        """
+        Removes the latest prices of pages being soft-deleted. Their stored content hashes are
+        cleared too, so a restored page is written again on its next scrape even if unchanged.
+
+        :param pages: A Page queryset.
+        :return: The number of latest prices removed.
+        """
+        ScrapedData.objects.filter(page__in=pages).exclude(content_hash__isnull=True).update(content_hash=None)
+        deleted, _ = LatestPrice.objects.filter(page__in=pages).delete()
+        return deleted
+
+    def prices(self, website, changed_since: datetime = None):
+        """
+        :param website: The Website instance.
+        :param changed_since: Only prices changed at or after this instant, when given.
+        :return: The website's latest prices.
+        """
+        prices = LatestPrice.objects.filter(web=website)
+        if changed_since is not None:
+            prices = prices.filter(price_changed_at__gte=changed_since)
+        return prices.order_by('page_id')
+
+latest_price_service = LatestPriceService()
@@ -0,0 +1,113 @@
+import atexit
+import json
+import logging
+import queue
+import reprlib
+from logging.handlers import QueueHandler, QueueListener
+
+# Containers logged as arguments are rendered through these limits instead of in full
+_payload_repr = reprlib.Repr()
+_payload_repr.maxlevel = 3
+_payload_repr.maxlist = _payload_repr.maxtuple = _payload_repr.maxset = 10
+_payload_repr.maxdict = 10
+_payload_repr.maxstring = 200
+_payload_repr.maxother = 200
+
+_PAYLOAD_TYPES = (dict, list, tuple, set, frozenset)
+
+def truncate(message: str, max_length: int) -> str:
+    """
+    :param message: The rendered log message.
+    :param max_length: The maximum length kept (0 keeps everything).
+    :return: The message, cut to max_length with a note of how much was dropped.
+    """
+    if not max_length or len(message) <= max_length:
+        return message
+    return f"{message[:max_length]}... [{len(message) - max_length} chars truncated]"
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        :return: One JSON object per line with timestamp, level, logger, message and, when
+                 present, the exception and any 'context' passed through extra.
+        """
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        context = getattr(record, 'context', None)
+        if context is not None:
+            entry['context'] = context
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class QueuedStreamHandler(QueueHandler):
+    def __init__(self, formatter: logging.Formatter = None, max_length: int = 0, stream=None):
+        """
+        Hands records to a background thread that formats and writes them, so logging from
+        the event loop never blocks on console or file I/O.
+
+        :param formatter: The formatter applied in the background thread.
+        :param max_length: Messages longer than this are truncated (0 disables truncation).
+        :param stream: The target stream (stderr by default).
+        """
+        super().__init__(queue.SimpleQueue())
+        self.max_length = max_length
+        self.target = logging.StreamHandler(stream)
+        if formatter is not None:
+            self.target.setFormatter(formatter)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def setFormatter(self, formatter: logging.Formatter) -> None:
+        # dictConfig assigns the configured formatter here; it belongs to the writer thread
+        self.target.setFormatter(formatter)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Renders only the message in the calling thread (arguments may change once the call
+        returns); large containers are abbreviated and the message truncated.
+        """
+        args = record.args
+        if isinstance(args, tuple) and args:
+            args = tuple(_payload_repr.repr(arg) if isinstance(arg, _PAYLOAD_TYPES) else arg for arg in args)
+        elif isinstance(args, dict):
+            # logging unpacks a lone mapping argument; it is only a mapping of values for '%(key)s'
+            if '%(' in str(record.msg):
+                args = {key: _payload_repr.repr(arg) if isinstance(arg, _PAYLOAD_TYPES) else arg for key, arg in args.items()}
+            else:
+                args = (_payload_repr.repr(args),)
+
+        if isinstance(record.msg, _PAYLOAD_TYPES):
+            message = _payload_repr.repr(record.msg)
+        elif args:
+            message = str(record.msg) % args
+        else:
+            message = str(record.msg)
+
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = truncate(message, self.max_length)
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def stop(self) -> None:
+        """
+        Writes out the queued records and stops the background thread.
+        """
+        if self._running:
+            self._running = False
+            self.listener.stop()
+
+    def close(self) -> None:
+        self.stop()
+        super().close()
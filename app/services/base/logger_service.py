@@ -1,32 +1,26 @@
 import logging
+import os
 
 class LoggerService:
-    def __init__(self, name: str, log_file: str = None, level: int = logging.INFO) -> None:
+    def __init__(self, name: str, log_file: str = None, level: int = None) -> None:
         """
-        Initializes the Logger class.
+        Initializes the Logger class. Output handlers are configured once in settings.LOGGING;
+        creating a LoggerService per request only looks up the named logger.
 
         :param name: The name of the logger.
-        :param log_file: The file where logs should be saved. If None, logs will be output to the console.
-        :param level: The logging level.
+        :param log_file: An additional file where logs should be saved (added once per logger and file).
+        :param level: The logging level; inherited from the LOGGING configuration when None.
         """
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(level)
+        if level is not None:
+            self.logger.setLevel(level)
 
-        # Create handlers
         if log_file:
-            # File handler
-            file_handler = logging.FileHandler(log_file)
-            file_handler.setLevel(level)
-            file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(level)
-        console_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+            path = os.path.abspath(log_file)
+            if not any(isinstance(handler, logging.FileHandler) and handler.baseFilename == path for handler in self.logger.handlers):
+                file_handler = logging.FileHandler(path)
+                file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+                self.logger.addHandler(file_handler)
 
     def get_logger(self) -> logging.Logger:
         """
@@ -36,34 +30,42 @@ class LoggerService:
         """
         return self.logger
 
-    def info(self, message: str) -> None:
+    def info(self, message: str, *args, **kwargs) -> None:
         """
         Logs an info message.
         
-        :param message: The message to log.
+        :param message: The message to log, with %-style placeholders formatted only if the record is emitted.
+        :param args: The placeholder values.
+        :param kwargs: Passed to the logger (e.g. exc_info, extra).
         """
-        self.logger.info(message)
+        self.logger.info(message, *args, stacklevel=2, **kwargs)
 
-    def warning(self, message: str) -> None:
+    def warning(self, message: str, *args, **kwargs) -> None:
         """
         Logs a warning message.
         
-        :param message: The message to log.
+        :param message: The message to log, with %-style placeholders formatted only if the record is emitted.
+        :param args: The placeholder values.
+        :param kwargs: Passed to the logger (e.g. exc_info, extra).
         """
-        self.logger.warning(message)
+        self.logger.warning(message, *args, stacklevel=2, **kwargs)
 
-    def error(self, message: str) -> None:
+    def error(self, message: str, *args, **kwargs) -> None:
         """
         Logs an error message.
         
-        :param message: The message to log.
+        :param message: The message to log, with %-style placeholders formatted only if the record is emitted.
+        :param args: The placeholder values.
+        :param kwargs: Passed to the logger (e.g. exc_info, extra).
         """
-        self.logger.error(message)
+        self.logger.error(message, *args, stacklevel=2, **kwargs)
 
-    def debug(self, message: str) -> None:
+    def debug(self, message: str, *args, **kwargs) -> None:
         """
         Logs a debug message.
         
-        :param message: The message to log.
+        :param message: The message to log, with %-style placeholders formatted only if the record is emitted.
+        :param args: The placeholder values.
+        :param kwargs: Passed to the logger (e.g. exc_info, extra).
         """
-        self.logger.debug(message)
+        self.logger.debug(message, *args, stacklevel=2, **kwargs)
@@ -1,6 +1,21 @@
+import hashlib
+from datetime import timedelta
+from django.conf import settings
 from django.db import transaction, IntegrityError
+from django.db.models import Q
+from django.utils import timezone
 from ...pages.pages_model import Page
+from ...pages.category_listing_model import CategoryListing
 from .logger_service import LoggerService
+from .copy_ingest_service import copy_ingest_service, COPY, ORM
+from .latest_price_service import latest_price_service
+
+def listing_fingerprint(product_urls: list) -> str:
+    """
+    :param product_urls: The sorted product URLs found on a category listing.
+    :return: A sha256 hex digest identifying the listing's content.
+    """
+    return hashlib.sha256('\n'.join(product_urls).encode('utf-8')).hexdigest()
 
 class PageService:
     def __init__(self):
@@ -9,48 +24,193 @@ class PageService:
         """
         self.logger_service = LoggerService(__name__)
 
-    def process_pages_batch(self, website, urls):
+    def process_pages_batch(self, website, urls, mark_missing: bool = False, backend: str = ORM) -> dict:
         """
+        Set-based upsert of a URL batch: unknown URLs are inserted in chunks (conflicting rows
+        are skipped), known pages are reset to pending by a single UPDATE and pages already
+        pending are left untouched.
+
         :param website: The website instance associated with the pages.
         :param urls: A list of URLs to be processed for creation or update.
+        :param mark_missing: Whether urls is the website's full set, so live pages not in it are soft-deleted.
+        :param backend: ORM, or COPY to stream the URLs through a staging table (see CopyIngestService).
+        :return: Counts of 'created', 'updated', 'unchanged' and 'removed' pages.
         """
-        created_urls = set()
-        updated_urls = set()
+        if backend == COPY:
+            return copy_ingest_service.upsert_pages(website, urls, mark_missing)
 
-        defaults = {
-            'status': 'pending',
-            'last_scraped': None,
-            'error_message': None,
-            'deleted_at': None,
-            'updated_at': None,
-        }
+        urls = list(dict.fromkeys(url for url in urls if url))
+        batch_size = settings.SCRAPING_UPSERT_BATCH_SIZE
+        now = timezone.now()
 
         try:
-            # Fetch existing pages to avoid duplicates during bulk_create
-            existing_pages = Page.objects.filter(url__in=urls, web=website).values_list('url', flat=True)
-            new_urls = set(urls) - set(existing_pages)
-            
-            # Prepare pages for bulk creation
-            pages_to_create = [Page(url=url, web=website, **defaults) for url in new_urls]
-
-            # Create new pages in bulk
-            if pages_to_create:
-                with transaction.atomic():
-                    Page.objects.bulk_create(pages_to_create)
-                    created_urls.update(new_urls)
-
-            # Update existing pages using update_or_create
-            for url in existing_pages:
-                try:
-                    page, created = Page.objects.update_or_create(
-                        url=url,
-                        web=website,
-                        defaults=defaults
-                    )
-                    if not created:
-                        updated_urls.add(url)
-                except Exception as e:
-                    self.logger_service.error(f"Error updating page {url}: {str(e)}")
+            with transaction.atomic():
+                existing = set()
+                for start in range(0, len(urls), batch_size):
+                    existing.update(Page.objects.filter(web=website, url__in=urls[start:start + batch_size]).values_list('url', flat=True))
+
+                pages_to_create = [Page(url=url, web=website, status='pending') for url in urls if url not in existing]
+                Page.objects.bulk_create(pages_to_create, batch_size=batch_size, ignore_conflicts=True)
+
+                # Pages already pending with nothing to clear are not rewritten
+                updated = 0
+                if existing:
+                    updated = Page.objects.filter(web=website, url__in=list(existing)).exclude(
+                        status='pending', last_scraped__isnull=True, error_message__isnull=True, deleted_at__isnull=True
+                    ).update(status='pending', last_scraped=None, error_message=None, deleted_at=None, updated_at=now)
 
+                removed = 0
+                if mark_missing and urls:
+                    missing = Page.objects.filter(web=website, deleted_at__isnull=True).exclude(url__in=urls)
+                    latest_price_service.forget(missing)
+                    removed = missing.update(deleted_at=now, updated_at=now)
         except IntegrityError as e:
-            self.logger_service.error(f"Error during bulk create: {str(e)}")
+            self.logger_service.error(f"Error upserting pages for website {website.name}: {str(e)}")
+            raise
+
+        return {
+            'created': len(pages_to_create),
+            'updated': updated,
+            'unchanged': len(existing) - updated,
+            'removed': removed,
+        }
+
+    def process_category_listings(self, website, listings: list) -> dict:
+        """
+        Stores each category listing with its fingerprint and writes only the pages of listings
+        that changed since the last crawl: new URLs are added and the listing's other pages are
+        requeued. Unchanged listings write no pages.
+
+        :param website: The website instance associated with the listings.
+        :param listings: Dictionaries with the category 'url', 'parent_name' and the 'pages' found on it.
+        :return: Counts of 'unchanged' and 'changed' listings, 'created' and 'requeued' pages, plus
+                 the set of 'removed' URLs that dropped off a listing (see finish_category_sync).
+        """
+        now = timezone.now()
+        by_url = {listing['url']: listing for listing in listings}
+        stored = {listing.url: listing for listing in CategoryListing.objects.filter(web=website, url__in=list(by_url))}
+
+        added, relisted, removed = set(), set(), set()
+        to_create, to_update = [], []
+        unchanged = 0
+
+        for url, listing in by_url.items():
+            product_urls = sorted({page['url'] for page in listing['pages'] if page.get('url')})
+            fingerprint = listing_fingerprint(product_urls)
+            current = stored.get(url)
+
+            if current is not None and current.fingerprint == fingerprint:
+                current.last_crawled = now
+                to_update.append(current)
+                unchanged += 1
+                continue
+
+            previous = set(current.product_urls) if current is not None else set()
+            added.update(product_url for product_url in product_urls if product_url not in previous)
+            relisted.update(previous.intersection(product_urls))
+            removed.update(previous.difference(product_urls))
+
+            if current is None:
+                to_create.append(CategoryListing(
+                    web=website,
+                    url=url,
+                    parent_name=listing.get('parent_name'),
+                    fingerprint=fingerprint,
+                    product_urls=product_urls,
+                    last_crawled=now,
+                ))
+            else:
+                current.parent_name = listing.get('parent_name')
+                current.fingerprint = fingerprint
+                current.product_urls = product_urls
+                current.last_crawled = now
+                to_update.append(current)
+
+        # bulk_update does not apply auto_now
+        for listing in to_update:
+            listing.updated_at = now
+
+        with transaction.atomic():
+            if to_create:
+                CategoryListing.objects.bulk_create(to_create)
+            if to_update:
+                CategoryListing.objects.bulk_update(to_update, ['parent_name', 'fingerprint', 'product_urls', 'last_crawled', 'updated_at'])
+            created = self.add_pages(website, added)
+            requeued = self.requeue_pages(website, relisted.difference(added)) if relisted else 0
+
+        return {
+            'unchanged': unchanged,
+            'changed': len(by_url) - unchanged,
+            'created': created,
+            'requeued': requeued,
+            'removed': removed,
+        }
+
+    def add_pages(self, website, urls) -> int:
+        """
+        Creates pages for URLs not known yet and restores soft-deleted ones; live pages are left untouched.
+
+        :param website: The website instance associated with the pages.
+        :param urls: The discovered product URLs.
+        :return: The number of pages created or restored.
+        """
+        if not urls:
+            return 0
+
+        existing = dict(Page.objects.filter(web=website, url__in=list(urls)).values_list('url', 'deleted_at'))
+        pages_to_create = [Page(url=url, web=website, status='pending') for url in urls if url not in existing]
+        restored = [url for url, deleted_at in existing.items() if deleted_at is not None]
+
+        if pages_to_create:
+            Page.objects.bulk_create(pages_to_create, ignore_conflicts=True)
+        if restored:
+            Page.objects.filter(web=website, url__in=restored).update(
+                deleted_at=None, status='pending', error_message=None, updated_at=timezone.now()
+            )
+        return len(pages_to_create) + len(restored)
+
+    def finish_category_sync(self, website, listed_urls: set, removed_urls: set) -> int:
+        """
+        Drops listings of categories no longer linked from the navigation, then soft-deletes the
+        pages that no stored listing contains anymore.
+
+        :param website: The website instance associated with the listings.
+        :param listed_urls: Every category URL linked from the navigation in this crawl.
+        :param removed_urls: URLs that dropped off a listing during this crawl.
+        :return: The number of pages soft-deleted.
+        """
+        removed_urls = set(removed_urls)
+        stale = CategoryListing.objects.filter(web=website).exclude(url__in=list(listed_urls))
+        for product_urls in stale.values_list('product_urls', flat=True):
+            removed_urls.update(product_urls)
+        stale.delete()
+
+        if not removed_urls:
+            return 0
+
+        # A product may be listed in several categories; keep it while any listing still has it
+        for product_urls in CategoryListing.objects.filter(web=website).values_list('product_urls', flat=True).iterator():
+            removed_urls.difference_update(product_urls)
+
+        removed = Page.objects.filter(web=website, url__in=list(removed_urls), deleted_at__isnull=True)
+        latest_price_service.forget(removed)
+        return removed.update(deleted_at=timezone.now(), updated_at=timezone.now())
+
+    def requeue_pages(self, website, urls=None) -> int:
+        """
+        Marks live pages pending again so the next scraped data sync refreshes their prices.
+
+        :param website: The website instance associated with the pages.
+        :param urls: The pages to requeue; when omitted, those whose last scrape attempt is older
+                     than SCRAPING_RESCRAPE_INTERVAL.
+        :return: The number of pages requeued.
+        """
+        now = timezone.now()
+        pages = Page.objects.filter(web=website, deleted_at__isnull=True).exclude(status='pending')
+        if urls is not None:
+            pages = pages.filter(url__in=list(urls))
+        else:
+            # updated_at is written by every scrape attempt, successful or not
+            cutoff = now - timedelta(seconds=settings.SCRAPING_RESCRAPE_INTERVAL)
+            pages = pages.filter(Q(updated_at__lt=cutoff) | Q(updated_at__isnull=True))
+        return pages.update(status='pending', error_message=None, updated_at=now)
@@ -0,0 +1,184 @@
+import json
+import threading
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.db.utils import ProgrammingError
+from django.utils import timezone
+from ...scrape.price_observation_model import PriceObservation
+from .logger_service import LoggerService
+
+PARENT_TABLE = PriceObservation._meta.db_table
+
+def month_start(moment: datetime) -> datetime:
+    """
+    :param moment: Any aware datetime.
+    :return: The first instant of its month in UTC.
+    """
+    moment = moment.astimezone(dt_timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+def add_months(month: datetime, months: int) -> datetime:
+    """
+    :param month: The first instant of a month.
+    :param months: The number of months to move (may be negative).
+    :return: The first instant of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_{month.year:04d}_{month.month:02d}"
+
+class PriceHistoryService:
+    def __init__(self):
+        """
+        Appends price observations, one per price change, and maintains the monthly partitions
+        of their table. Each observation lands in the partition of its month, created on first
+        use; old months are dropped as whole partitions rather than deleted row by row.
+        """
+        self.logger_service = LoggerService(__name__)
+        self._partitions = set()
+        self._lock = threading.Lock()
+
+    @property
+    def partitioned(self) -> bool:
+        return connection.vendor == 'postgresql'
+
+    def ensure_partition(self, month: datetime) -> None:
+        """
+        :param month: The first instant of the month whose partition must exist.
+        """
+        name = partition_name(month)
+        if not self.partitioned or name in self._partitions:
+            return
+
+        with self._lock:
+            if name in self._partitions:
+                return
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT_TABLE}" FOR VALUES FROM (%s) TO (%s)',
+                        [month, add_months(month, 1)],
+                    )
+            except ProgrammingError as e:
+                # Another process created it between the existence check and the CREATE
+                if 'already exists' not in str(e):
+                    raise
+            # Remembered only once committed; a rolled back CREATE must be retried
+            transaction.on_commit(lambda: self._partitions.add(name))
+        self.logger_service.debug("Price history partition %s is ready", name)
+
+    def ensure_partitions(self, start: datetime, months: int) -> list:
+        """
+        :param start: Any instant of the first month.
+        :param months: The number of consecutive months.
+        :return: The names of the partitions now present.
+        """
+        first = month_start(start)
+        names = []
+        for offset in range(months):
+            month = add_months(first, offset)
+            self.ensure_partition(month)
+            names.append(partition_name(month))
+        return names
+
+    def list_partitions(self) -> list:
+        """
+        :return: (name, month) of every monthly partition, oldest first.
+        """
+        if not self.partitioned:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = %s",
+                [PARENT_TABLE],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        partitions = []
+        prefix = f"{PARENT_TABLE}_"
+        for name in names:
+            try:
+                month = datetime.strptime(name[len(prefix):], '%Y_%m').replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                # The default partition and any manually attached tables are left alone
+                continue
+            partitions.append((name, month))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def drop_partitions(self, before: datetime) -> list:
+        """
+        :param before: Partitions of months ending on or before this instant are dropped.
+        :return: The names of the dropped partitions.
+        """
+        dropped = []
+        for name, month in self.list_partitions():
+            if add_months(month, 1) > before:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
+            self._partitions.discard(name)
+            dropped.append(name)
+            self.logger_service.info(f"Dropped price history partition {name}")
+        return dropped
+
+    def build_observation(self, scraped_data, observed_at: datetime) -> PriceObservation:
+        """
+        :param scraped_data: A ScrapedData built by ScrapedDataService.build_scraped_data.
+        :param observed_at: When the price was scraped.
+        :return: An unsaved observation of the page's price and tier table.
+        """
+        try:
+            meta = json.loads(scraped_data.field_value_meta or '{}')
+        except ValueError:
+            meta = {}
+        return PriceObservation(
+            page=scraped_data.page,
+            observed_at=observed_at,
+            product_name=scraped_data.field_name,
+            value_minor=scraped_data.value_minor,
+            currency=scraped_data.currency,
+            value_exponent=scraped_data.value_exponent,
+            price_table=meta.get('prices_minor') or [],
+        )
+
+    def record(self, scraped_data: list, observed_at: datetime = None, batch_size: int = None) -> int:
+        """
+        :param scraped_data: ScrapedData rows just stored.
+        :param observed_at: When the prices were scraped (now by default).
+        :param batch_size: Rows per INSERT statement.
+        :return: The number of observations appended.
+        """
+        observed_at = observed_at or timezone.now()
+        observations = [self.build_observation(row, observed_at) for row in scraped_data]
+        if not observations:
+            return 0
+        self.ensure_partition(month_start(observed_at))
+        PriceObservation.objects.bulk_create(observations, batch_size=batch_size)
+        return len(observations)
+
+    def history(self, page, start: datetime, end: datetime):
+        """
+        :param page: The Page whose prices are queried.
+        :param start: The inclusive start of the range.
+        :param end: The exclusive end of the range.
+        :return: The page's observations in the range, oldest first.
+        """
+        return PriceObservation.objects.filter(page=page, observed_at__gte=start, observed_at__lt=end).order_by('observed_at', 'id')
+
+    def price_at(self, page, moment: datetime) -> PriceObservation:
+        """
+        Only price changes are observed, so the price in effect at a moment is the last
+        observation before it.
+
+        :param page: The Page whose price is queried.
+        :param moment: The instant of interest.
+        :return: The latest observation before moment, or None.
+        """
+        return PriceObservation.objects.filter(page=page, observed_at__lt=moment).order_by('-observed_at', '-id').first()
+
+price_history_service = PriceHistoryService()
@@ -0,0 +1,126 @@
+import re
+from django.conf import settings
+
+CURRENCY_SYMBOLS = {
+    '€': 'EUR',
+    'EUR': 'EUR',
+    '$': 'USD',
+    'USD': 'USD',
+    '£': 'GBP',
+    'GBP': 'GBP',
+    'CHF': 'CHF',
+    'zł': 'PLN',
+    'PLN': 'PLN',
+    'Kč': 'CZK',
+    'CZK': 'CZK',
+    'SEK': 'SEK',
+    '¥': 'JPY',
+    'JPY': 'JPY',
+}
+CURRENCY_EXPONENTS = {'JPY': 0}
+CURRENCY_DISPLAY = {'EUR': '€', 'USD': '$', 'GBP': '£'}
+# Decimals kept for sub-minor-unit prices such as '0,045 €'; finer digits are rounded
+MAX_EXPONENT = 6
+
+# Longest symbols first so 'EUR' wins over any shorter symbol it contains
+_CURRENCY = re.compile('|'.join(re.escape(symbol) for symbol in sorted(CURRENCY_SYMBOLS, key=len, reverse=True)))
+# A signed run of digits with '.', ',', apostrophe or (narrow) space group separators
+_AMOUNT = re.compile(r"(-?)\s*(\d[\d.,'\u00a0\u202f ]*)")
+_GROUPING = re.compile(r"['\u00a0\u202f ]")
+
+class ParsedPrice:
+    __slots__ = ('amount_minor', 'currency', 'exponent')
+
+    def __init__(self, amount_minor: int, currency: str, exponent: int = None):
+        """
+        :param amount_minor: The amount in units of 10 ** -exponent of the currency.
+        :param currency: The ISO 4217 currency code.
+        :param exponent: The number of decimals of amount_minor; the currency's minor unit
+                         (2 for cents) by default, more for sub-cent prices such as '0,045 €'.
+        """
+        self.amount_minor = amount_minor
+        self.currency = currency
+        self.exponent = CURRENCY_EXPONENTS.get(currency, 2) if exponent is None else exponent
+
+    def scaled(self, exponent: int) -> int:
+        """
+        :param exponent: A number of decimals at least as fine as this price's.
+        :return: The amount in units of 10 ** -exponent.
+        """
+        return self.amount_minor * 10 ** (exponent - self.exponent)
+
+    def format(self) -> str:
+        """
+        :return: The amount with a decimal point followed by the currency symbol, e.g. '1234.50 €'.
+        """
+        exponent = self.exponent
+        sign = '-' if self.amount_minor < 0 else ''
+        units, minor = divmod(abs(self.amount_minor), 10 ** exponent)
+        amount = f"{units}.{minor:0{exponent}d}" if exponent else str(units)
+        return f"{sign}{amount} {CURRENCY_DISPLAY.get(self.currency, self.currency)}"
+
+    def __eq__(self, other):
+        return isinstance(other, ParsedPrice) and (self.amount_minor, self.currency, self.exponent) == (other.amount_minor, other.currency, other.exponent)
+
+    def __repr__(self):
+        return f"ParsedPrice({self.amount_minor}, {self.currency!r}, {self.exponent})"
+
+def _decimal_separator(digits: str, decimal_hint: str, exponent: int) -> str:
+    """
+    :param digits: The amount without grouping spaces, e.g. '1.234,50'.
+    :param decimal_hint: The separator assumed to be decimal when the text is ambiguous.
+    :param exponent: The currency's number of minor unit digits.
+    :return: The decimal separator used in digits, or None for a whole amount.
+    """
+    last_dot, last_comma = digits.rfind('.'), digits.rfind(',')
+    if last_dot >= 0 and last_comma >= 0:
+        return '.' if last_dot > last_comma else ','
+
+    separator = '.' if last_dot >= 0 else ',' if last_comma >= 0 else None
+    if separator is None:
+        return None
+    # Repeated separators can only be grouping: '1.234.567'
+    if digits.count(separator) > 1:
+        return None
+    # '12,5' / '12.50' are decimals; '1.234' is grouping unless the hint says otherwise
+    if len(digits) - digits.rfind(separator) - 1 != 3:
+        return separator
+    return separator if separator == decimal_hint and exponent else None
+
+def parse_price(text: str, default_currency: str = None, decimal_hint: str = None) -> ParsedPrice:
+    """
+    Parses a displayed price such as '1.234,50 €*', '€1,234.50', 'CHF 12.-', '12,50' or 'ab 0,045 €'.
+
+    :param text: The scraped price text.
+    :param default_currency: The currency when the text has no symbol (SCRAPING_PRICE_DEFAULT_CURRENCY).
+    :param decimal_hint: The decimal separator for ambiguous amounts like '1.234' (SCRAPING_PRICE_DECIMAL_SEPARATOR).
+    :return: The parsed price, or None if the text holds no amount.
+    """
+    if not text:
+        return None
+
+    amount = _AMOUNT.search(text)
+    if not amount:
+        return None
+
+    currency_match = _CURRENCY.search(text)
+    currency = CURRENCY_SYMBOLS[currency_match.group()] if currency_match else (default_currency or settings.SCRAPING_PRICE_DEFAULT_CURRENCY)
+    exponent = CURRENCY_EXPONENTS.get(currency, 2)
+
+    digits = _GROUPING.sub('', amount.group(2)).rstrip('.,')
+    separator = _decimal_separator(digits, decimal_hint or settings.SCRAPING_PRICE_DECIMAL_SEPARATOR, exponent)
+    if separator:
+        units, _, fraction = digits.rpartition(separator)
+    else:
+        units, fraction = digits, ''
+    units = units.replace('.', '').replace(',', '')
+
+    # Keep decimals past the minor unit, without trailing zeros; round half up beyond MAX_EXPONENT
+    fraction = fraction[:exponent] + fraction[exponent:].rstrip('0')
+    exponent = max(exponent, min(len(fraction), MAX_EXPONENT))
+    fraction = fraction.ljust(exponent + 1, '0')
+    amount_minor = int(units or '0') * 10 ** exponent + int(fraction[:exponent] or '0')
+    if fraction[exponent] >= '5':
+        amount_minor += 1
+
+    return ParsedPrice(-amount_minor if amount.group(1) else amount_minor, currency, exponent)
@@ -0,0 +1,136 @@
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import aiohttp
+from django.conf import settings
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from tenacity.stop import stop_base
+from tenacity.wait import wait_base
+
+class RetryableHTTPError(Exception):
+    def __init__(self, status: int, retry_after: float = None):
+        """
+        Raised for responses worth retrying (429 and 5xx).
+
+        :param status: The HTTP status code.
+        :param retry_after: Seconds the server asked us to wait, if it sent Retry-After.
+        """
+        super().__init__(f"Retryable response status {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+class DeadlineExceeded(Exception):
+    """Raised when the crawl's deadline budget is spent before a request could be made."""
+
+class CrawlBudget:
+    def __init__(self, seconds: float):
+        """
+        :param seconds: The wall-clock budget for the whole crawl.
+        """
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+_crawl_budget = contextvars.ContextVar('crawl_budget', default=None)
+
+@contextmanager
+def crawl_budget(seconds: float):
+    """
+    Sets the deadline budget for every fetch started inside the block, including fetches
+    made by tasks spawned from it.
+
+    :param seconds: The wall-clock budget for the crawl.
+    """
+    token = _crawl_budget.set(CrawlBudget(seconds))
+    try:
+        yield
+    finally:
+        _crawl_budget.reset(token)
+
+def remaining_budget() -> float:
+    """
+    :return: Seconds left in the current crawl budget, or None if no budget is set.
+    """
+    budget = _crawl_budget.get()
+    return budget.remaining() if budget else None
+
+def request_timeout() -> float:
+    """
+    :return: The timeout for the next attempt: the per-request timeout, capped by the crawl budget.
+    :raises DeadlineExceeded: If the crawl budget is already spent.
+    """
+    remaining = remaining_budget()
+    if remaining is None:
+        return settings.SCRAPING_REQUEST_TIMEOUT
+    if remaining <= 0:
+        raise DeadlineExceeded("Crawl deadline exceeded")
+    return min(settings.SCRAPING_REQUEST_TIMEOUT, remaining)
+
+def parse_retry_after(value: str) -> float:
+    """
+    :param value: A Retry-After header value, in delta-seconds or HTTP-date form.
+    :return: The delay in seconds, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(exception: BaseException) -> bool:
+    """
+    :param exception: The exception raised by an attempt.
+    :return: True for timeouts, connection resets/disconnects and 429/5xx responses.
+    """
+    return isinstance(exception, (
+        RetryableHTTPError,
+        asyncio.TimeoutError,
+        aiohttp.ServerDisconnectedError,
+        aiohttp.ClientConnectionError,
+        ConnectionResetError,
+    ))
+
+class wait_retry_after(wait_base):
+    def __init__(self, fallback: wait_base):
+        """
+        Honors the server's Retry-After when present, otherwise defers to the fallback wait;
+        never sleeps past the crawl budget.
+        """
+        self.fallback = fallback
+
+    def __call__(self, retry_state) -> float:
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(exception, 'retry_after', None)
+        delay = retry_after if retry_after is not None else self.fallback(retry_state)
+        delay = min(delay, settings.SCRAPING_RETRY_AFTER_MAX)
+        remaining = remaining_budget()
+        return delay if remaining is None else max(0.0, min(delay, remaining))
+
+class stop_when_budget_spent(stop_base):
+    def __call__(self, retry_state) -> bool:
+        remaining = remaining_budget()
+        return remaining is not None and remaining <= 0
+
+def build_retrying() -> AsyncRetrying:
+    """
+    :return: A retry controller with jittered exponential backoff for retryable failures,
+             bounded by the attempt count and the crawl budget. The last error is re-raised.
+    """
+    return AsyncRetrying(
+        retry=retry_if_exception(is_retryable),
+        wait=wait_retry_after(wait_random_exponential(
+            multiplier=settings.SCRAPING_RETRY_BACKOFF_BASE,
+            max=settings.SCRAPING_RETRY_BACKOFF_MAX,
+        )),
+        stop=stop_after_attempt(settings.SCRAPING_RETRY_ATTEMPTS) | stop_when_budget_spent(),
+        reraise=True,
+    )
@@ -0,0 +1,41 @@
+ANY_TAG = '*'
+
+class SelectorPlan:
+    def __init__(self, rules: list):
+        """
+        Dispatch plan routing scraped nodes to extraction roles. Rules are compiled once into
+        a tag -> class -> role table, so each node costs one dictionary lookup per class it
+        carries instead of a scan over every selector.
+
+        :param rules: (role, tag, classes) tuples in priority order; when a node matches several
+                      rules the earliest one wins. A tag of '*' matches any tag.
+        """
+        self.rules = tuple((role, tag or ANY_TAG, tuple(classes)) for role, tag, classes in rules)
+        self.dispatch = {}
+        for rank, (role, tag, classes) in enumerate(self.rules):
+            by_class = self.dispatch.setdefault(tag, {})
+            for cls in classes:
+                by_class.setdefault(cls, (rank, role))
+        self.classes = tuple(dict.fromkeys(cls for _, _, classes in self.rules for cls in classes))
+
+    def role_for(self, node: dict) -> str:
+        """
+        :param node: A scraped node.
+        :return: The role of the highest priority rule matching the node, or None.
+        """
+        attributes = node.get('attributes')
+        classes = attributes.get('class') if attributes else None
+        if not classes:
+            return None
+        if isinstance(classes, str):
+            classes = classes.split()
+
+        best = None
+        for by_class in (self.dispatch.get(node.get('tag')), self.dispatch.get(ANY_TAG)):
+            if not by_class:
+                continue
+            for cls in classes:
+                match = by_class.get(cls)
+                if match is not None and (best is None or match[0] < best[0]):
+                    best = match
+        return best[1] if best else None
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+class SingleFlight:
+    def __init__(self, ttl: float = 0, max_entries: int = 1000):
+        """
+        Coalesces concurrent calls for the same key onto one in-flight task, and optionally
+        keeps successful results for a short time so callers arriving just after reuse them.
+
+        :param ttl: Seconds a cacheable result is kept (0 disables the result cache).
+        :param max_entries: The maximum number of cached results; the oldest are evicted first.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._in_flight = weakref.WeakKeyDictionary()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key):
+        if not self.ttl:
+            return None
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._results[key]
+                return None
+            return entry
+
+    def _store(self, key, result) -> None:
+        with self._lock:
+            self._results[key] = (time.monotonic() + self.ttl, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    async def do(self, key, coro_fn, *args, cacheable=None, **kwargs):
+        """
+        :param key: A hashable key identifying identical calls.
+        :param coro_fn: The coroutine function to run for the first caller.
+        :param cacheable: Optional callable deciding whether a result may be cached.
+        :return: The result of the single in-flight (or recently cached) call.
+        """
+        entry = self._cached(key)
+        if entry is not None:
+            return entry[1]
+
+        # Futures are bound to their event loop, so in-flight calls are tracked per loop
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        task = in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn(*args, **kwargs))
+            in_flight[key] = task
+
+            def _done(finished, key=key):
+                in_flight.pop(key, None)
+                if self.ttl and not finished.cancelled() and finished.exception() is None:
+                    result = finished.result()
+                    if cacheable is None or cacheable(result):
+                        self._store(key, result)
+
+            task.add_done_callback(_done)
+
+        # Shielded so one caller giving up does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """
+        Drops all cached results.
+        """
+        with self._lock:
+            self._results.clear()
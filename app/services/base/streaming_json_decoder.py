@@ -0,0 +1,169 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'\s*')
+_SEPARATORS = re.compile(r'[\s,]*')
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+_NUMBER_START = frozenset('-0123456789')
+_NUMBER_END = frozenset(' \t\r\n,}]')
+
+class StreamingScrapeDecoder:
+    def __init__(self, array_key: str = 'scraped_data', node_filter=None):
+        """
+        Incrementally decodes a microservice response of the form {"scraped_data": [...], ...}.
+        Elements of the array are decoded one at a time as their bytes arrive, and only the
+        ones accepted by node_filter are kept, so the raw body and the full tree are never
+        held in memory together.
+
+        :param array_key: The top-level key holding the list of scraped nodes.
+        :param node_filter: Optional callable deciding whether a decoded node is kept.
+        """
+        self.array_key = array_key
+        self.node_filter = node_filter
+        self.result = {}
+        self.nodes = None
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'start'
+        self._key = None
+        self._value_start = None
+        self._retry_len = 0
+        self._final = False
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        :param chunk: The next piece of the response body.
+        :return: The nodes decoded by this chunk that passed the filter. A node spanning many
+                 chunks may only be decoded on a later one or by close(), whose result always
+                 holds every kept node.
+        """
+        self._buffer += self._utf8.decode(chunk)
+        nodes = self._parse()
+        # Drop what has been consumed so the buffer only holds the value being decoded
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            if self._value_start is not None:
+                self._value_start -= self._pos
+            self._pos = 0
+        return nodes
+
+    def close(self) -> dict:
+        """
+        :return: The decoded top-level object, with the kept nodes under array_key.
+        :raises ValueError: If the body ended before the object was complete.
+        """
+        self._buffer += self._utf8.decode(b'', final=True)
+        self._final = True
+        self._parse()
+        if self._state != 'done':
+            raise ValueError("Incomplete or malformed response body")
+        if self.nodes is not None:
+            self.result[self.array_key] = self.nodes
+        return self.result
+
+    def _skip(self, pattern) -> None:
+        self._pos = pattern.match(self._buffer, self._pos).end()
+
+    def _parse(self) -> list:
+        nodes = []
+        buffer = self._buffer
+        while True:
+            if self._state == 'start':
+                self._skip(_WHITESPACE)
+                if self._pos >= len(buffer):
+                    return nodes
+                if buffer[self._pos] != '{':
+                    raise ValueError("Response body is not a JSON object")
+                self._pos += 1
+                self._state = 'key'
+
+            elif self._state == 'key':
+                self._skip(_SEPARATORS)
+                if self._pos >= len(buffer):
+                    return nodes
+                if buffer[self._pos] == '}':
+                    self._pos += 1
+                    self._state = 'done'
+                    return nodes
+                if buffer[self._pos] != '"':
+                    raise ValueError("Malformed response body")
+                match = _STRING_TAIL.match(buffer, self._pos + 1)
+                if not match:
+                    return nodes
+                colon = _WHITESPACE.match(buffer, match.end()).end()
+                if colon >= len(buffer):
+                    return nodes
+                self._key = json.loads(buffer[self._pos:match.end()])
+                self._pos = colon + 1
+                self._state = 'value'
+
+            elif self._state == 'value':
+                self._skip(_WHITESPACE)
+                if self._pos >= len(buffer):
+                    return nodes
+                if self._key == self.array_key and buffer[self._pos] == '[':
+                    self._pos += 1
+                    self.nodes = []
+                    self._state = 'element'
+                    continue
+                value = self._take_value()
+                if value is _INCOMPLETE:
+                    return nodes
+                self.result[self._key] = value
+                self._state = 'key'
+
+            elif self._state == 'element':
+                if self._value_start is None:
+                    self._skip(_SEPARATORS)
+                    if self._pos >= len(buffer):
+                        return nodes
+                    if buffer[self._pos] == ']':
+                        self._pos += 1
+                        self._state = 'key'
+                        continue
+                node = self._take_value()
+                if node is _INCOMPLETE:
+                    return nodes
+                if self.node_filter is None or self.node_filter(node):
+                    self.nodes.append(node)
+                    nodes.append(node)
+
+            else:
+                return nodes
+
+    def _take_value(self):
+        """
+        Decodes the JSON value starting at the current position once all of it has arrived.
+        A failed attempt is only retried after the pending bytes have doubled, which keeps
+        the total work linear even for a value spanning many chunks.
+        """
+        buffer = self._buffer
+        if self._value_start is None:
+            self._value_start = self._pos
+            self._retry_len = 0
+
+        pending = len(buffer) - self._value_start
+        if pending < self._retry_len and not self._final:
+            return _INCOMPLETE
+
+        try:
+            value, end = self._json.raw_decode(buffer, self._value_start)
+        except json.JSONDecodeError:
+            if self._final:
+                raise ValueError("Incomplete or malformed response body")
+            self._retry_len = pending * 2
+            return _INCOMPLETE
+
+        # A number is only complete once a delimiter follows it; "12." or "1e" may continue
+        if buffer[self._value_start] in _NUMBER_START and not self._final:
+            if end == len(buffer) or buffer[end] not in _NUMBER_END:
+                return _INCOMPLETE
+
+        self._pos = end
+        self._value_start = None
+        return value
+
+_INCOMPLETE = object()
@@ -1,27 +1,58 @@
 import aiohttp
 import asyncio
+import json
 from .logger_service import LoggerService
+from .client_session_service import client_session_service
 from django.conf import settings
-from tenacity import retry, stop_after_attempt, wait_fixed, RetryError
 from urllib.parse import urlencode
+from .adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from .host_scheduler import host_scheduler
+from .circuit_breaker_registry import circuit_breaker_registry
+from .single_flight import SingleFlight
+from .streaming_json_decoder import StreamingScrapeDecoder
+from .retry_policy import RetryableHTTPError, DeadlineExceeded, build_retrying, parse_retry_after, remaining_budget, request_timeout
 import pybreaker
 
+# Shared by every service instance so the learned concurrency survives across syncs
+microservice_concurrency_limiter = AdaptiveConcurrencyLimiter(
+    min_limit=settings.SCRAPING_CONCURRENCY_MIN,
+    max_limit=settings.SCRAPING_CONCURRENCY_MAX,
+    initial_limit=settings.SCRAPING_CONCURRENCY_INITIAL,
+    name='scrape-microservice',
+)
+
+# Identical fetches in flight at the same time (overlapping syncs, products linked from
+# several categories) share one request
+microservice_single_flight = SingleFlight(
+    ttl=settings.SCRAPING_RESULT_CACHE_TTL,
+    max_entries=settings.SCRAPING_RESULT_CACHE_SIZE,
+)
+
 class WebScrapeMicroService:
     def __init__(self):
         self.microservice_url = f"{settings.SCRAPING_MICROSERVICE_BASE_URL}/scrape/data/"
+        self.microservice_batch_url = f"{settings.SCRAPING_MICROSERVICE_BASE_URL}/scrape/data/batch/"
+        self.batch_size = settings.SCRAPING_MICROSERVICE_BATCH_SIZE
+        self.concurrency_limiter = microservice_concurrency_limiter
+        self.single_flight = microservice_single_flight
+        self.stream_decode = settings.SCRAPING_STREAM_DECODE
         self.headers = {
             "Content-Type": "application/json",
             "X-Client-ID": settings.SCRAPING_MICROSERVICE_CLIENT_ID,
             "X-Client-Secret": settings.SCRAPING_MICROSERVICE_CLIENT_SECRET,
         }
-        self.timeout = aiohttp.ClientTimeout(total=3600)  # 60-second timeout for requests
         self.logger_service = LoggerService(__name__)
 
-        # Initialize the CircuitBreaker
-        self.circuit_breaker = pybreaker.CircuitBreaker(
-            fail_max=3,
-            reset_timeout=30
-        )
+    @staticmethod
+    def is_overloaded(outcome) -> bool:
+        """
+        :param outcome: A result returned by, or an exception raised from, a fetch attempt.
+        :return: True if the outcome signals that the microservice is overloaded, including an
+                 open circuit breaker.
+        """
+        if isinstance(outcome, (RetryableHTTPError, pybreaker.CircuitBreakerError)):
+            return True
+        return isinstance(outcome, dict) and bool(outcome.get("overloaded"))
 
     def _concatenate_data_to_url(self, url_to_scrape, data):
         """
@@ -41,43 +72,249 @@ class WebScrapeMicroService:
         :param url_to_scrape: The base URL to scrape.
         :param data: The additional data to be concatenated as query parameters (optional).
         :return: The JSON response from the microservice, or an error message.
+        :raises RetryableHTTPError: For 429 and 5xx responses, carrying any Retry-After delay.
         """
         url_with_params = self._concatenate_data_to_url(url_to_scrape, data)
-        async with session.get(url_with_params, headers=self.headers) as response:
+        timeout = aiohttp.ClientTimeout(total=request_timeout())
+        async with session.get(url_with_params, headers=self.headers, timeout=timeout) as response:
             if response.status == 200:
+                if self.stream_decode:
+                    return await self._decode_stream(response, data)
                 return await response.json()
-            else:
-                self.logger_service.error(f"Failed to fetch data: {response.status}, {await response.text()} from {url_with_params}")
-                return {"error": f"Failed to fetch data from microservice: {response.status}"}
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))  # Retry logic for fetching data
+            self.logger_service.error("Failed to fetch data: %s, %s from %s", response.status, await response.text(), url_with_params)
+            if response.status == 429 or response.status >= 500:
+                raise RetryableHTTPError(response.status, parse_retry_after(response.headers.get('Retry-After')))
+            return {"error": f"Failed to fetch data from microservice: {response.status}"}
+
+    async def _decode_stream(self, response, data=None) -> dict:
+        """
+        Decodes the body chunk by chunk, keeping only scraped nodes that carry one of the
+        requested classes, so peak memory does not grow with the size of the page.
+        :param response: The successful aiohttp response.
+        :param data: The request data holding the requested 'class_name' list.
+        :return: The decoded response, shaped like response.json().
+        """
+        decoder = StreamingScrapeDecoder(node_filter=self._node_filter(data))
+        async for chunk in response.content.iter_chunked(settings.SCRAPING_STREAM_CHUNK_SIZE):
+            decoder.feed(chunk)
+        return decoder.close()
+
+    def _node_filter(self, data=None):
+        """
+        :param data: The request data holding the requested 'class_name' list.
+        :return: A predicate keeping nodes without a class attribute or with a requested class,
+                 or None when no classes were requested.
+        """
+        classes = frozenset((data or {}).get('class_name') or ())
+        if not classes:
+            return None
+
+        def keep(node):
+            node_classes = node.get('attributes', {}).get('class') if isinstance(node, dict) else None
+            return not node_classes or not classes.isdisjoint(node_classes)
+        return keep
+
     async def get_data(self, url_to_scrape, data=None):
         """
+        Concurrent calls for the same URL and selectors await a single in-flight fetch; with
+        SCRAPING_RESULT_CACHE_TTL set, successful results are also reused for a short time.
         :param url_to_scrape: The base URL to scrape.
         :param data: Optional data to be passed and concatenated to the URL.
         :return: The data scraped from the microservice, or an error message.
         """
-        try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                self.logger_service.info(f"Fetching data from: {url_to_scrape}")
-
-                fetched_data = await self.circuit_breaker.call(self._fetch_data, session, url_to_scrape, data)
+        key = self._concatenate_data_to_url(url_to_scrape, data)
+        return await self.single_flight.do(
+            key, self._get_data_with_retry, url_to_scrape, data,
+            cacheable=lambda result: isinstance(result, dict) and 'error' not in result,
+        )
 
-                self.logger_service.info(f"Successfully fetched data from {url_to_scrape}")
-                return fetched_data
+    async def _get_data_with_retry(self, url_to_scrape, data=None):
+        """
+        Retries retryable failures with jittered exponential backoff (or the server's
+        Retry-After), within the attempt limit and the current crawl budget. Each attempt
+        waits for a politeness slot on the target page's host and then runs within the shared
+        adaptive concurrency limit; neither is held while backing off between attempts.
+        :param url_to_scrape: The base URL to scrape.
+        :param data: Optional data to be passed and concatenated to the URL.
+        :return: The data scraped from the microservice, or an error message.
+        """
+        target_url = data.get('url') if data else None
+        try:
+            async for attempt in build_retrying():
+                with attempt:
+                    async with host_scheduler.slot(target_url):
+                        return await self.concurrency_limiter.run(
+                            self._get_data, url_to_scrape, data, is_overloaded=self.is_overloaded
+                        )
 
         except pybreaker.CircuitBreakerError:
-            self.logger_service.error(f"Circuit breaker is open. Request to {url_to_scrape} has failed.")
-            return {"error": "Service unavailable due to circuit breaker open state."}
-        except RetryError as e:
-            self.logger_service.error(f"Max retries exceeded for {url_to_scrape}: {e}")
-            return {"error": "Microservice unavailable after retries"}
+            self.logger_service.error("Circuit breaker is open. Request to %s has failed.", url_to_scrape)
+            return {"error": "Service unavailable due to circuit breaker open state.", "overloaded": True}
+        except DeadlineExceeded:
+            self.logger_service.error("Crawl deadline exceeded before fetching %s", target_url)
+            return {"error": "Crawl deadline exceeded"}
+        except RetryableHTTPError as e:
+            self.logger_service.error("Max retries exceeded for %s: %s", url_to_scrape, e)
+            return {"error": f"Microservice unavailable after retries: {e.status}", "overloaded": True}
+        except asyncio.TimeoutError:
+            self.logger_service.error("Request timed out for %s", url_to_scrape)
+            return {"error": "Request timed out", "overloaded": True}
         except aiohttp.ClientError as e:
-            self.logger_service.error(f"Client error while connecting to microservice: {str(e)} for {url_to_scrape}")
+            self.logger_service.error("Client error while connecting to microservice: %s for %s", e, url_to_scrape)
             return {"error": str(e)}
-        except asyncio.TimeoutError:
-            self.logger_service.error(f"Request timed out for {url_to_scrape}")
-            return {"error": "Request timed out"}
         except Exception as e:
-            self.logger_service.error(f"Unexpected error while fetching data from {url_to_scrape}: {str(e)}")
+            self.logger_service.error("Unexpected error while fetching data from %s: %s", url_to_scrape, e)
             return {"error": "Unexpected error occurred"}
+
+    async def _get_data(self, url_to_scrape, data=None):
+        """
+        Makes a single attempt; retryable failures propagate to the retry loop in get_data.
+        :param url_to_scrape: The base URL to scrape.
+        :param data: Optional data to be passed and concatenated to the URL.
+        :return: The data scraped from the microservice, or an error message.
+        """
+        session = await client_session_service.get_session()
+        self.logger_service.debug("Fetching data from: %s", url_to_scrape)
+
+        target_host = host_scheduler.host_for(data['url']) if data and data.get('url') else None
+        async with circuit_breaker_registry.guard(url_to_scrape, target_host):
+            fetched_data = await self._fetch_data(session, url_to_scrape, data)
+
+        self.logger_service.debug("Successfully fetched data from %s", url_to_scrape)
+        return fetched_data
+
+    async def get_data_many(self, urls: list, class_name: list, batch_size: int = None):
+        """
+        Posts the URLs to the batch endpoint in chunks, sending the selector set once per
+        chunk, and yields results as the microservice streams them back (one JSON object
+        per line, each carrying the "url" it belongs to). Each batch request is paced by the
+        politeness scheduler of its URLs' hosts and runs in one slot of the shared concurrency
+        limiter under the batch endpoint's circuit breaker. URLs a batch does not answer, for
+        instance because the request failed or a breaker is open, are fetched one by one through
+        get_data, with its retries, single flight and host breakers.
+        :param urls: The page URLs to scrape.
+        :param class_name: CSS class names for elements to scrape in every page.
+        :param batch_size: The number of URLs per batch request (default: settings value).
+        :return: An async iterator of (url, result) tuples; failed URLs yield an error dict.
+        """
+        if not urls:
+            return
+
+        batch_size = batch_size or self.batch_size or len(urls)
+
+        for start in range(0, len(urls), batch_size):
+            batch = urls[start:start + batch_size]
+            pending = set(batch)
+            try:
+                async for url, result in self._get_batch(batch, class_name):
+                    if url in pending:
+                        pending.discard(url)
+                        yield url, result
+            except pybreaker.CircuitBreakerError:
+                self.logger_service.error("Circuit breaker is open. Batch request to %s was not sent.", self.microservice_batch_url)
+            except DeadlineExceeded:
+                self.logger_service.error("Crawl deadline exceeded before sending a batch to %s", self.microservice_batch_url)
+            except (RetryableHTTPError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger_service.error("Batch request to %s failed: %s", self.microservice_batch_url, e)
+
+            missing = [url for url in batch if url in pending]
+            if not missing:
+                continue
+            tasks = [asyncio.ensure_future(self._get_one(url, class_name)) for url in missing]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def _get_one(self, url: str, class_name: list):
+        """
+        :param url: A page URL a batch request did not answer.
+        :param class_name: CSS class names for elements to scrape.
+        :return: The (url, result) tuple from the single-URL endpoint.
+        """
+        return url, await self.get_data(self.microservice_url, {'url': url, 'class_name': class_name})
+
+    async def _get_batch(self, urls: list, class_name: list):
+        """
+        Runs one batch request in a concurrency limiter slot and under the batch endpoint's
+        breaker; a failed request releases its slot as an overload signal when it is one.
+        :param urls: The page URLs of this batch.
+        :param class_name: CSS class names for elements to scrape.
+        :return: An async iterator of (url, result) tuples decoded line by line.
+        :raises pybreaker.CircuitBreakerError: If the batch endpoint's breaker is open.
+        :raises RetryableHTTPError: For 429 and 5xx responses.
+        """
+        # A batch takes longer than one page, so only the crawl budget caps the session timeout
+        remaining = remaining_budget()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("Crawl deadline exceeded")
+        timeout = aiohttp.ClientTimeout(total=remaining) if remaining is not None else None
+        # The batch fetches every URL from its host, so each one spends a politeness token
+        for url in urls:
+            async with host_scheduler.slot(url):
+                pass
+
+        session = await client_session_service.get_session()
+        await self.concurrency_limiter.acquire()
+        overloaded = False
+        try:
+            async with circuit_breaker_registry.guard(self.microservice_batch_url):
+                async for item in self._fetch_batch(session, urls, class_name, timeout):
+                    yield item
+        except Exception as e:
+            overloaded = isinstance(e, asyncio.TimeoutError) or self.is_overloaded(e)
+            raise
+        finally:
+            # A batch's duration is not comparable with single-request latency, so it does not
+            # feed the limiter's latency average
+            self.concurrency_limiter.release(None, overloaded)
+
+    async def _fetch_batch(self, session, urls: list, class_name: list, timeout: aiohttp.ClientTimeout = None):
+        """
+        :param session: The aiohttp session used for the request.
+        :param urls: The page URLs of this batch.
+        :param class_name: CSS class names for elements to scrape.
+        :param timeout: The timeout of the whole batch request (default: the session's).
+        :return: An async iterator of (url, result) tuples decoded line by line.
+        :raises RetryableHTTPError: For 429 and 5xx responses.
+        """
+        payload = {'urls': urls, 'class_name': class_name}
+        options = {'timeout': timeout} if timeout else {}
+        async with session.post(self.microservice_batch_url, json=payload, headers=self.headers, **options) as response:
+            if response.status != 200:
+                self.logger_service.error("Failed to fetch batch: %s, %s from %s", response.status, await response.text(), self.microservice_batch_url)
+                if response.status == 429 or response.status >= 500:
+                    raise RetryableHTTPError(response.status, parse_retry_after(response.headers.get('Retry-After')))
+                return
+
+            buffer = b''
+            async for chunk in response.content.iter_any():
+                buffer += chunk
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    item = self._decode_batch_line(line)
+                    if item:
+                        yield item
+
+            item = self._decode_batch_line(buffer)
+            if item:
+                yield item
+
+    def _decode_batch_line(self, line: bytes):
+        """
+        :param line: One line of the batch response body.
+        :return: A (url, result) tuple, or None for blank or malformed lines.
+        """
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            self.logger_service.error("Malformed batch line from microservice: %s", e)
+            return None
+        url = item.pop('url', None)
+        return (url, item) if url else None
@@ -1,14 +1,29 @@
 from ..base.abstract_web_scrape import AbstractWebScraper
 from ..base.web_scrape_micro_service import WebScrapeMicroService
 from ..base.logger_service import LoggerService
-from urllib.parse import urlencode
+from ..base.extraction_plan import ExtractionPlan, PRODUCT, clean_price, table_cells
+from urllib.parse import urlencode, urlparse, parse_qs
 import asyncio
+import re
+
+# 'Seite 1 von 7', 'Page 1 of 7', 'Seite 1 / 7'; item counters such as '1 - 50 von 327 Artikeln' do not match
+_PAGE_COUNT_TEXT = re.compile(r'\b(?:seite|page)\s*\d+\s*(?:von|of|/)\s*(\d+)', re.IGNORECASE)
+
+def with_query(url: str, params: dict) -> str:
+    """
+    :param url: The URL to extend.
+    :param params: Query parameters to add.
+    :return: The URL with params appended to any query it already has.
+    """
+    separator = '&' if urlparse(url).query else '?'
+    return f"{url}{separator}{urlencode(params)}"
 
 class KabelBinderService(AbstractWebScraper):
     def __init__(self):
         super().__init__()
         self.web_scraper_service = WebScrapeMicroService()
         self.base_url = self.web_scraper_service.microservice_url
+        self.concurrency_limiter = self.web_scraper_service.concurrency_limiter
         self.website_name = 'kabelbinder'
         self.logger_service = LoggerService(__name__)
         
@@ -46,156 +61,258 @@ class KabelBinderService(AbstractWebScraper):
         """
         return await self.web_scraper_service.get_data(self.base_url, data)
 
-    async def get_pages(self, base_url: str, classes: list, child_classes: list, additional_params: dict = {'af': 50}, batch_size: int = 25) -> dict:
+    async def get_pages(self, base_url: str, classes: list, child_classes: list, additional_params: dict = {'af': 50},
+                        pagination: dict = None):
         """
         :param base_url: The base URL for the initial page fetch.
         :param classes: CSS class names for elements to scrape in the main pages.
         :param child_classes: CSS class names for elements to scrape in child pages.
         :param additional_params: Additional parameters to append to URLs (default: {'af': 50}).
-        :param batch_size: The number of URLs to fetch in each batch (default: 25).
-        :return: A dictionary containing 'pages' with scraped data.
+        :param pagination: Optional listing pagination: the 'classes' of the pager element, the
+                           'page_param' query parameter and the 'max_pages' fetched per category.
+        :return: An async iterator yielding, as each category completes, its listing: a dictionary with the
+                 category 'url' and 'parent_name', and either the 'pages' found in it or the fetch 'error'.
         """
         # Initial fetch: get the main list of pages
         result = await self.fetch({'url': base_url, 'class_name': classes})
-        self.logger_service.info(f"Initial fetch result on kabelbinder service get_pages: {result}")
+        self.logger_service.info("Initial fetch on kabelbinder service get_pages returned %s nodes", len((result or {}).get('scraped_data', [])))
 
         # Check for valid scraped data
         if not result or 'scraped_data' not in result:
             self.logger_service.error("No valid 'scraped_data' found in results.")
-            return {'pages': []}
+            return
 
         data = result.get('scraped_data', [])
-        pages = []
         urls_to_fetch = []
 
         # Prepare URLs to fetch with additional parameters
-        additional_query_string = urlencode(additional_params)
         for page in data:
             if 'attributes' in page:
                 url = page['attributes'].get('href', '#')
                 if url != '#':
-                    full_url = f"{url}?{additional_query_string}"
+                    full_url = with_query(url, additional_params)
                     urls_to_fetch.append({
                         'url': full_url,
                         'parent_name': page.get('text', 'Unknown')
                     })
 
-        self.logger_service.info(f"URLs to fetch: {urls_to_fetch}")
-
-        # Batch processing
-        for i in range(0, len(urls_to_fetch), batch_size):
-            batch = urls_to_fetch[i:i + batch_size]
-            self.logger_service.info(f"Fetching for child classes: {child_classes}")
-            fetch_tasks = [
-                self.fetch({'url': item['url'], 'class_name': child_classes})
-                for item in batch
-            ]
-
-            # Concurrently execute the fetches within the batch
-            batch_results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
-            self.logger_service.info(f"Batch result: {batch_results}")
-
-            # Process the results of each fetch
-            for idx, product_details_result in enumerate(batch_results):
-                if isinstance(product_details_result, Exception):
-                    self.logger_service.error(f"Error fetching data for URL: {batch[idx]['url']} - {str(product_details_result)}")
+        self.logger_service.info("Category URLs to fetch: %s", len(urls_to_fetch))
+
+        self.logger_service.info("Fetching for child classes: %s", child_classes)
+
+        async def fetch_category(item):
+            try:
+                return item, await self.fetch_listing(item['url'], child_classes, pagination)
+            except Exception as e:
+                return item, e
+
+        # Every category is in flight under the adaptive limit; pages are yielded as each
+        # category completes, so one slow category no longer holds back the rest.
+        tasks = [asyncio.ensure_future(fetch_category(item)) for item in urls_to_fetch]
+        total_pages = 0
+        try:
+            for completed in asyncio.as_completed(tasks):
+                item, product_details_result = await completed
+                listing = {'url': item['url'], 'parent_name': item['parent_name']}
+                if isinstance(product_details_result, Exception) or 'scraped_data' not in product_details_result:
+                    error = str(product_details_result) if isinstance(product_details_result, Exception) else product_details_result.get('error')
+                    self.logger_service.error("Error fetching data for URL: %s - %s", item['url'], error)
+                    yield {**listing, 'error': error or 'Invalid response from scraping microservice'}
                     continue
 
-                product_details = product_details_result.get('scraped_data', [])
-                parent_name = batch[idx]['parent_name']
+                pages = self.extract_category_pages(item, product_details_result)
+                total_pages += len(pages)
+                yield {**listing, 'pages': pages}
+        finally:
+            # The consumer may stop early; do not leave category fetches running
+            for task in tasks:
+                task.cancel()
 
-                for detail in product_details:
-                    product_name = detail.get('text', 'Unknown Product')
-                    if detail.get('children'):
-                        for product_child in detail['children']:
-                            product_url = product_child['attributes'].get('href', batch[idx]['url'])
-                            pages.append({
-                                'name': product_name,
-                                'url': product_url,
-                                'parent_name': parent_name
-                            })
-                    else:
-                        self.logger_service.error(f"No children found in product detail: {detail}")
+        self.logger_service.info("Pages result: %s pages", total_pages)
 
-        self.logger_service.info(f"Pages result: {pages}")
-        return {'pages': pages}
+    async def fetch_listing(self, url: str, child_classes: list, pagination: dict = None) -> dict:
+        """
+        Fetches a category listing. With pagination, the page count is read from the pager on the
+        first page and the remaining pages are fetched concurrently; their nodes are merged.
+
+        :param url: The category listing URL (its first page).
+        :param child_classes: CSS class names for elements to scrape in the listing.
+        :param pagination: Optional listing pagination (see get_pages).
+        :return: The microservice response, with the nodes of every listing page when paginated;
+                 an error response if any page failed, so a partial listing is never used.
+        """
+        if not pagination:
+            return await self.fetch({'url': url, 'class_name': child_classes})
+
+        pager_classes = set(pagination['classes'])
+        class_name = child_classes + [cls for cls in pagination['classes'] if cls not in child_classes]
+        first = await self.fetch({'url': url, 'class_name': class_name})
+        if 'scraped_data' not in first:
+            return first
+
+        def is_pager(node):
+            return bool(pager_classes.intersection((node.get('attributes') or {}).get('class') or ()))
+
+        nodes = [node for node in first['scraped_data'] if not is_pager(node)]
+        pager = [node for node in first['scraped_data'] if is_pager(node)]
+
+        page_param = pagination.get('page_param', 'p')
+        page_count = min(self.detect_page_count(pager, page_param), pagination.get('max_pages') or 1)
+        if page_count <= 1:
+            return {**first, 'scraped_data': nodes}
+
+        self.logger_service.debug("Fetching %d listing pages for %s", page_count, url)
+        results = await asyncio.gather(*(
+            self.fetch({'url': with_query(url, {page_param: number}), 'class_name': class_name})
+            for number in range(2, page_count + 1)
+        ))
+        for number, result in enumerate(results, start=2):
+            if 'scraped_data' not in result:
+                return {'error': f"Listing page {number} failed: {result.get('error')}"}
+            nodes.extend(node for node in result['scraped_data'] if not is_pager(node))
+        return {**first, 'scraped_data': nodes}
+
+    def detect_page_count(self, pager: list, page_param: str) -> int:
+        """
+        :param pager: The pager nodes of a listing's first page.
+        :param page_param: The query parameter carrying the page number in pager links.
+        :return: The highest page number found in pager links, page number texts or 'Seite x von N' /
+                 'Page x of N' texts (at least 1).
+        """
+        page_count = 1
+        stack = list(pager)
+        while stack:
+            node = stack.pop()
+            href = (node.get('attributes') or {}).get('href')
+            if href:
+                for value in parse_qs(urlparse(href).query).get(page_param, ()):
+                    if value.isdigit():
+                        page_count = max(page_count, int(value))
+            text = (node.get('text') or '').strip()
+            if text.isdigit():
+                page_count = max(page_count, int(text))
+            for match in _PAGE_COUNT_TEXT.findall(text):
+                page_count = max(page_count, int(match))
+            stack.extend(node.get('children') or ())
+        return page_count
+
+    def extract_category_pages(self, item: dict, product_details_result: dict) -> list:
+        """
+        :param item: The category entry ('url' and 'parent_name') that was fetched.
+        :param product_details_result: The microservice response for the category listing.
+        :return: A list of page dictionaries ('name', 'url', 'parent_name').
+        """
+        pages = []
+        product_details = product_details_result.get('scraped_data', [])
+        parent_name = item['parent_name']
+
+        for detail in product_details:
+            product_name = detail.get('text', 'Unknown Product')
+            if detail.get('children'):
+                for product_child in detail['children']:
+                    product_url = product_child['attributes'].get('href', item['url'])
+                    pages.append({
+                        'name': product_name,
+                        'url': product_url,
+                        'parent_name': parent_name
+                    })
+            else:
+                self.logger_service.error("No children found in product detail: %s", detail)
+        return pages
 
-    async def get_data(self, classes: list, urls: list, max_workers: int = 5) -> dict:
+    async def get_data(self, classes: list, urls: list, plan: ExtractionPlan = None):
         """
         :param classes: CSS class names for elements to scrape in each page.
         :param urls: List of URLs to fetch data from.
-        :param max_workers: The maximum number of concurrent workers (default: 5).
-        :return: A dictionary containing 'data' with scraped product listings.
+        :param plan: The website's extraction plan; derived from the positions in classes when omitted.
+        :return: An async iterator yielding one (url, outcome) record per URL as it completes; the
+                 outcome holds the extracted fields, or 'error' when the page could not be scraped.
         """
-        self.logger_service.info(f"Fetching product listings from {len(urls)} URLs.")
-        results = []
+        self.logger_service.info("Fetching product listings from %s URLs.", len(urls))
 
         if not urls:
             self.logger_service.warning("No URLs provided for fetching products.")
-            return {"data": results}
-        
+            return
+
+        plan = plan or ExtractionPlan.from_classes(classes)
+
+        if self.web_scraper_service.batch_size:
+            async for url, response in self.web_scraper_service.get_data_many(urls, classes):
+                yield url, self.build_outcome(url, classes, response, plan)
+            return
+
         queue = asyncio.Queue()
         for url in urls:
-            await queue.put(url)
+            queue.put_nowait(url)
+        results = asyncio.Queue()
 
         async def worker():
             while not queue.empty():
-                url = await queue.get()
+                url = queue.get_nowait()
                 params = {'url': url, 'class_name': classes}
+                # Every URL yields exactly one outcome, or the consumer would wait forever
                 try:
-                    response = await self.fetch(params)
-                    if isinstance(response, dict) and 'scraped_data' in response:
-                        product_data = self.parse_response(url, classes, response)
-                        if product_data:
-                            results.append(product_data)
+                    outcome = self.build_outcome(url, classes, await self.fetch(params), plan)
                 except Exception as e:
-                    self.logger_service.error(f"Error fetching data from {url}: {str(e)}")
-                finally:
-                    queue.task_done()
+                    self.logger_service.error("Error scraping %s: %s", url, e)
+                    outcome = {'error': str(e)}
+                await results.put((url, outcome))
 
+        # The limiter decides how many fetches are actually in flight
+        max_workers = self.concurrency_limiter.max_limit
         tasks = [asyncio.create_task(worker()) for _ in range(min(max_workers, len(urls)))]
 
-        await queue.join()
-        await asyncio.gather(*tasks)
-
-        return {"data": results}
+        try:
+            for _ in range(len(urls)):
+                yield await results.get()
+        finally:
+            # The consumer may stop early; do not leave fetches running
+            for task in tasks:
+                task.cancel()
 
-    def parse_response(self, url: str, classes: list, response: dict) -> dict:
+    def build_outcome(self, url: str, classes: list, response: dict, plan: ExtractionPlan) -> dict:
+        """
+        :param url: The URL that was fetched.
+        :param classes: CSS class names for elements to parse in the response.
+        :param response: The microservice response for the URL.
+        :param plan: The website's extraction plan.
+        :return: The extracted fields, or a dictionary with an 'error' message.
+        """
+        if not isinstance(response, dict) or 'scraped_data' not in response:
+            error = response.get('error') if isinstance(response, dict) else None
+            self.logger_service.error("Error fetching data from %s: %s", url, error)
+            return {'error': error or 'Invalid response from scraping microservice'}
+
+        try:
+            product_data = self.parse_response(url, classes, response, plan)
+        except Exception as e:
+            # A plan that cannot handle this page fails the page, not the whole crawl
+            self.logger_service.error("Error extracting data from %s: %s", url, e)
+            return {'error': f"Extraction failed: {str(e)}"}
+        return product_data or {'error': 'No product data found on page'}
+
+    def parse_response(self, url: str, classes: list, response: dict, plan: ExtractionPlan = None) -> dict:
         """
         :param url: The URL of the page being parsed.
         :param classes: CSS class names for elements to parse in the response.
         :param response: The response data to parse.
-        :return: A dictionary containing parsed product information.
+        :param plan: The website's extraction plan; derived from the positions in classes when omitted.
+        :return: A dictionary containing the extracted fields ('product', 'price', 'price_table', ...).
         """
         # Check if the response is valid
         if not response or not isinstance(response, dict) or 'scraped_data' not in response:
-            self.logger_service.warning(f"Invalid or empty response for URL: {url}.")
+            self.logger_service.warning("Invalid or empty response for URL: %s.", url)
             return {}
 
-        parsed_data = response['scraped_data']
-        product_name, main_price, price_table = None, None, []
-        
-        for item in parsed_data:
-            item_classes = item.get('attributes', {}).get('class', [])
-
-            if item['tag'] == 'h1' and any(cls in item_classes for cls in classes[:2]):
-                product_name = item.get('text')
-                
-            elif item['tag'] == 'div' and any(cls in item_classes for cls in classes[2:3]):
-                main_price = item.get('text')
-
-            elif item['tag'] == 'div' and any(cls in item_classes for cls in classes[3:]):
-                price_table.extend(self.parse_price_table(item.get('children', [])))
-                
-        if product_name and main_price and price_table:
-            self.logger_service.info(f"Found bulk prices for product: {product_name}")
-            return {
-                "product": product_name,
-                "price": self.clean_price(main_price),
-                "price_table": [self.clean_price(p) for p in price_table]
-            }
-
-        self.logger_service.warning(f"No bulk prices found for product: {product_name}.")
+        plan = plan or ExtractionPlan.from_classes(classes)
+        product_data = plan.extract(response['scraped_data'])
+        missing = plan.missing(product_data)
+
+        if not missing:
+            self.logger_service.debug("Found bulk prices for product: %s", product_data.get(PRODUCT))
+            return product_data
+
+        self.logger_service.warning("No bulk prices found for product: %s (missing %s).", product_data.get(PRODUCT), ', '.join(missing))
         return {}
 
     def parse_price_table(self, children: list) -> list:
@@ -203,43 +320,16 @@ class KabelBinderService(AbstractWebScraper):
         :param children: The child elements containing price data.
         :return: A list of parsed prices.
         """
-        prices = []
-
         if not children:
             self.logger_service.warning("No children found to parse.")
-            return prices
-
-        for child in children:
-            child_classes = child.get('attributes', {}).get('class', [])
-
-            if 'table' in child_classes:
-                rows = child.get('children', [])
-                
-                for row in rows:
-                    if row.get('tag') == 'tr': 
-                        cells = row.get('children', [])
-                        for cell in cells:
-                            if cell.get('tag') == 'td':
-                                
-                                span = next((s for s in cell.get('children', []) 
-                                             if s.get('tag') == 'span' and 'bulk-price' in s.get('attributes', {}).get('class', [])), None)
-                                if span:
-                                    price = span.get('text')
-                                    if price:
-                                        prices.append(price)
-
-        return prices
+            return []
+
+        return table_cells(children, 'table', 'bulk-price')
 
     def clean_price(self, price: str) -> str:
         """
-        Cleans the price string by removing any unwanted characters and ensuring the Euro symbol is correct.
         :param price: The price string to clean.
-        :return: The cleaned price string with the Euro sign.
+        :return: The price as displayed, trimmed; it is parsed into an amount at ingest.
         """
-        if price:
-            price = price.replace('*', '').strip()
-            price = price.replace("\u20ac", "€")
-            price = price.replace(",", ".") 
-
-        return price
+        return clean_price(price)
 
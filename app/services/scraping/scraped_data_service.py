@@ -1,42 +1,119 @@
 from ...pages.pages_model import Page
 from ...scrape.scraped_data_model import ScrapedData
+from ..base.price_parser import parse_price
+from ..base.price_history_service import price_history_service
+from ..base.copy_ingest_service import copy_ingest_service, COPY, ORM
+from ..base.latest_price_service import latest_price_service
+from django.conf import settings
 from django.core.exceptions import ValidationError
+import hashlib
 import logging
 import json
 
+def content_hash(field_value: str, field_value_meta: str) -> str:
+    """
+    :param field_value: The scraped price.
+    :param field_value_meta: The serialized meta holding the price tiers.
+    :return: A sha256 hex digest of the stored content.
+    """
+    return hashlib.sha256(f"{field_value}\n{field_value_meta}".encode('utf-8')).hexdigest()
+
 class ScrapedDataService:
     def __init__(self):
         self.logger_service = logging.getLogger(__name__)
 
+    def build_scraped_data(self, page: Page, item: dict) -> ScrapedData:
+        """
+        :param page: The page the data was scraped from.
+        :param item: A dictionary with 'field_name', 'field_value' and 'field_value_meta'.
+        :return: An unsaved ScrapedData keeping the scraped price text, with the price and its tiers
+                 parsed into integer amounts that share one exponent.
+        """
+        field_name = item.get('field_name', "N/A")
+        field_value = item.get('field_value', "N/A")
+        field_value_meta = item.get('field_value_meta', {})
+        price = parse_price(field_value)
+        tiers = [parse_price(tier) for tier in field_value_meta.get('prices') or ()]
+        # The finest of the price and tier precisions, so no amount is rounded
+        exponent = max((parsed.exponent for parsed in [price, *tiers] if parsed), default=None)
+        if tiers:
+            field_value_meta = {**field_value_meta, 'prices_minor': [tier.scaled(exponent) if tier else None for tier in tiers]}
+
+        try:
+            field_value_meta_json = json.dumps(field_value_meta, ensure_ascii=False)
+            self.logger_service.debug("Scraped data meta for %s: %s", field_name, field_value_meta_json)
+        except (TypeError, ValueError) as e:
+            self.logger_service.error(f"Error serializing field_value_meta for {field_name}: {e}")
+            field_value_meta_json = "{}"
+
+        return ScrapedData(
+            page=page,
+            field_name=field_name,
+            field_value=field_value,
+            field_value_meta=field_value_meta_json,
+            value_minor=price.scaled(exponent) if price else None,
+            currency=price.currency if price else None,
+            value_exponent=exponent,
+            content_hash=content_hash(field_value, field_value_meta_json),
+        )
+
+    def upsert_scraped_data(self, records: list, backend: str = ORM) -> int:
+        """
+        Inserts or updates the scraped data of many pages in one INSERT ... ON CONFLICT statement
+        per batch, keyed by (page, field_name). Rows whose content hash matches the stored one are
+        skipped; only new and changed rows are written, appended to the price history and made
+        the pages' latest prices.
+
+        :param records: (page, items) pairs, items being lists as accepted by createScrapedData.
+        :param backend: ORM, or COPY to stream the rows through a staging table (see CopyIngestService).
+        :return: The number of rows written.
+        """
+        # A statement may not touch the same row twice; the last value for a key wins
+        rows = {}
+        for page, items in records:
+            for item in items:
+                scraped_data = self.build_scraped_data(page, item)
+                rows[(page.pk, scraped_data.field_name)] = scraped_data
+
+        if not rows:
+            return 0
+        if backend == COPY:
+            return copy_ingest_service.upsert_scraped_data(list(rows.values()))['written']
+
+        received = len(rows)
+        stored = ScrapedData.objects.filter(page_id__in={page_id for page_id, _ in rows}, deleted_at__isnull=True).values_list(
+            'page_id', 'field_name', 'content_hash'
+        )
+        for page_id, field_name, stored_hash in stored:
+            row = rows.get((page_id, field_name))
+            if row is not None and stored_hash == row.content_hash:
+                del rows[(page_id, field_name)]
+
+        seen_page_ids = {page.pk for page, _ in records}
+        if not rows:
+            latest_price_service.record([], seen_page_ids)
+            self.logger_service.debug("All %d scraped data rows unchanged", received)
+            return 0
+
+        ScrapedData.objects.bulk_create(
+            list(rows.values()),
+            batch_size=settings.SCRAPING_UPSERT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['page', 'field_name'],
+            update_fields=['field_value', 'field_value_meta', 'value_minor', 'currency', 'value_exponent', 'content_hash', 'updated_at', 'deleted_at'],
+        )
+        # Every price change is also appended to the price history
+        price_history_service.record(list(rows.values()), batch_size=settings.SCRAPING_UPSERT_BATCH_SIZE)
+        latest_price_service.record(list(rows.values()), seen_page_ids)
+        self.logger_service.debug("Upserted %d of %d scraped data rows", len(rows), received)
+        return len(rows)
+
     def createScrapedData(self, page: Page, data: list):
         """Inserts or updates scraped data records into the ScrapedData model."""
-        for item in data:
-            field_name = item.get('field_name', "N/A")
-            field_value = item.get('field_value', "N/A")
-            field_value_meta = item.get('field_value_meta', {})
-           
-            try:
-                field_value_meta_json = json.dumps(field_value_meta, ensure_ascii=False)
-                self.logger_service.info(field_value_meta_json)
-            except (TypeError, ValueError) as e:
-                self.logger_service.error(f"Error serializing field_value_meta for {field_name}: {e}")
-                field_value_meta_json = "{}"
-
-            try:
-                scraped_data, created = ScrapedData.objects.update_or_create(
-                    page=page,
-                    field_name=field_name,
-                    defaults={
-                        'field_value': field_value,
-                        'field_value_meta': field_value_meta_json
-                    }
-                )
-                if created:
-                    self.logger_service.info(f"Created new scraped data: {scraped_data}")
-                else:
-                    self.logger_service.info(f"Updated scraped data: {scraped_data}")
-            except ValidationError as e:
-                self.logger_service.error(f"Validation error while saving scraped data: {e}")
+        try:
+            self.upsert_scraped_data([(page, data)])
+        except ValidationError as e:
+            self.logger_service.error(f"Validation error while saving scraped data: {e}")
 
     def get_pages(self, pages: list, response: dict) -> list:
      pass
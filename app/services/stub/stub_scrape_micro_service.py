@@ -0,0 +1,96 @@
+import json
+from aiohttp import web
+from ..base.logger_service import LoggerService
+
+class StubScrapeMicroService:
+    def __init__(self, pages: dict = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Local stand-in for the web data scrape microservice, serving canned responses for
+        both the single-URL and the batch contract.
+
+        :param pages: A mapping of page URL to the 'scraped_data' list returned for it.
+        :param host: The interface to bind to.
+        :param port: The port to bind to (0 picks a free port).
+        """
+        self.pages = pages or {}
+        self.host = host
+        self.port = port
+        self.runner = None
+        self.base_url = None
+        self.logger_service = LoggerService(__name__)
+
+    def scrape(self, url: str, class_name: list) -> dict:
+        """
+        :param url: The page URL requested by the client.
+        :param class_name: CSS class names requested by the client.
+        :return: The response body for this URL.
+        """
+        if url not in self.pages:
+            return {'error': f"Page not found: {url}"}
+        return {'scraped_data': self.pages[url]}
+
+    async def respond(self, url: str, class_name: list) -> dict:
+        """
+        Hook around scrape() for subclasses simulating latency or failures; an optional
+        'status' key sets the HTTP status of single-URL responses.
+        :param url: The page URL requested by the client.
+        :param class_name: CSS class names requested by the client.
+        :return: The response body for this URL.
+        """
+        return self.scrape(url, class_name)
+
+    async def handle_data(self, request: web.Request) -> web.Response:
+        """
+        GET /scrape/data/?url=...&class_name=...
+        """
+        url = request.query.get('url')
+        result = await self.respond(url, request.query.getall('class_name', []))
+        status = result.pop('status', 404 if 'error' in result else 200)
+        return web.json_response(result, status=status)
+
+    async def handle_batch(self, request: web.Request) -> web.StreamResponse:
+        """
+        POST /scrape/data/batch/ with {"urls": [...], "class_name": [...]}; streams one
+        JSON object per line, each tagged with its "url".
+        """
+        payload = await request.json()
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        for url in payload.get('urls', []):
+            result = await self.respond(url, payload.get('class_name', []))
+            result.pop('status', None)
+            line = json.dumps({'url': url, **result}, ensure_ascii=False) + '\n'
+            await response.write(line.encode('utf-8'))
+        await response.write_eof()
+        return response
+
+    def build_app(self) -> web.Application:
+        """
+        :return: The aiohttp application exposing the microservice routes.
+        """
+        app = web.Application()
+        app.router.add_get('/scrape/data/', self.handle_data)
+        app.router.add_post('/scrape/data/batch/', self.handle_batch)
+        return app
+
+    async def start(self) -> str:
+        """
+        Starts serving in the running event loop.
+        :return: The base URL to use as SCRAPING_MICROSERVICE_BASE_URL.
+        """
+        self.runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{self.host}:{port}"
+        self.logger_service.info(f"Stub scrape microservice listening on {self.base_url}")
+        return self.base_url
+
+    async def stop(self) -> None:
+        """
+        Stops the server started by start().
+        """
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,126 @@
+import asyncio
+import random
+import time
+from urllib.parse import parse_qs, urlparse
+from .stub_scrape_micro_service import StubScrapeMicroService
+
+class SyntheticScrapeMicroService(StubScrapeMicroService):
+    PAGER_CLASS = 'paging'
+
+    def __init__(self, shop_url: str = 'http://shop.test/', categories: int = 20, products_per_category: int = 50,
+                 price_tiers: int = 5, latency: float = 0.05, latency_jitter: float = 0.5, error_rate: float = 0.0,
+                 seed: int = 0, **kwargs):
+        """
+        Stand-in microservice generating kabelbinder-shaped trees on the fly: the shop root
+        lists category links, each category lists product links, and each product page has
+        a title, a main price and a tiered price table. Category listings honour the 'af'
+        (products per page) and 'p' (page) query parameters and, when PAGER_CLASS is requested,
+        include a pager linking every listing page.
+
+        :param shop_url: The root URL of the synthetic shop (use it as the Website base_url).
+        :param categories: The number of categories linked from the root.
+        :param products_per_category: The number of products listed per category.
+        :param price_tiers: The number of rows in each product's price table (drives payload size).
+        :param latency: The mean simulated latency per request in seconds.
+        :param latency_jitter: The +/- fraction of random variation around the mean latency.
+        :param error_rate: The fraction of requests answered with a 503.
+        :param seed: Seed for the latency and error randomness.
+        """
+        super().__init__(**kwargs)
+        self.shop_url = shop_url.rstrip('/') + '/'
+        self.categories = categories
+        self.products_per_category = products_per_category
+        self.price_tiers = price_tiers
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.request_latencies = []
+        self.error_count = 0
+
+    def category_url(self, category: int) -> str:
+        return f"{self.shop_url}category-{category}"
+
+    def product_url(self, category: int, product: int) -> str:
+        return f"{self.shop_url}category-{category}/product-{product}"
+
+    def scrape(self, url: str, class_name: list) -> dict:
+        path = url.split('?', 1)[0][len(self.shop_url):] if url and url.startswith(self.shop_url) else None
+        if path is None:
+            return {'error': f"Page not found: {url}"}
+        parts = [part for part in path.split('/') if part]
+
+        if not parts:
+            return {'scraped_data': self._navigation(class_name)}
+        if len(parts) == 1:
+            query = parse_qs(urlparse(url).query)
+            page_size = int(query.get('af', [0])[0]) or self.products_per_category
+            page = int(query.get('p', [1])[0])
+            return {'scraped_data': self._category(int(parts[0].split('-')[1]), class_name, page_size, page)}
+        return {'scraped_data': self._product(int(parts[0].split('-')[1]), int(parts[1].split('-')[1]), class_name)}
+
+    def _navigation(self, class_name: list) -> list:
+        nav_class = class_name[:1] or ['nav-link']
+        return [
+            {'tag': 'a', 'attributes': {'class': nav_class, 'href': self.category_url(category)}, 'text': f"Category {category}"}
+            for category in range(self.categories)
+        ]
+
+    def _category(self, category: int, class_name: list, page_size: int, page: int) -> list:
+        listing_class = class_name[:1] or ['product-listing']
+        first = (page - 1) * page_size
+        nodes = [
+            {
+                'tag': 'div',
+                'attributes': {'class': listing_class},
+                'text': f"Product {category}-{product}",
+                'children': [{'tag': 'a', 'attributes': {'href': self.product_url(category, product)}, 'text': 'Details'}],
+            }
+            for product in range(first, min(first + page_size, self.products_per_category))
+        ]
+        if self.PAGER_CLASS in class_name:
+            page_count = max(1, -(-self.products_per_category // page_size))
+            nodes.append({
+                'tag': 'div',
+                'attributes': {'class': [self.PAGER_CLASS]},
+                'text': f"Seite {page} von {page_count}",
+                'children': [
+                    {'tag': 'a', 'attributes': {'href': f"{self.category_url(category)}?p={number}"}, 'text': str(number)}
+                    for number in range(1, page_count + 1)
+                ],
+            })
+        return nodes
+
+    def _product(self, category: int, product: int, class_name: list) -> list:
+        title_class = class_name[:1] or ['product-title']
+        price_class = class_name[2:3] or ['product-price']
+        table_class = class_name[3:4] or ['bulk-prices']
+        base_price = 1 + (category * 31 + product * 17) % 500 / 10
+        rows = [
+            {
+                'tag': 'tr',
+                'children': [
+                    {'tag': 'td', 'children': [{'tag': 'span', 'attributes': {'class': ['quantity']}, 'text': f"ab {10 ** tier} Stk."}]},
+                    {'tag': 'td', 'children': [{'tag': 'span', 'attributes': {'class': ['bulk-price']}, 'text': f"{base_price * (1 - tier * 0.05):.2f} €*".replace('.', ',')}]},
+                ],
+            }
+            for tier in range(self.price_tiers)
+        ]
+        return [
+            {'tag': 'h1', 'attributes': {'class': title_class}, 'text': f"Product {category}-{product}"},
+            {'tag': 'div', 'attributes': {'class': price_class}, 'text': f"{base_price:.2f} €*".replace('.', ',')},
+            {'tag': 'div', 'attributes': {'class': table_class}, 'children': [{'tag': 'table', 'attributes': {'class': ['table']}, 'children': rows}]},
+        ]
+
+    async def respond(self, url: str, class_name: list) -> dict:
+        started = time.monotonic()
+        if self.latency:
+            jitter = self.latency * self.latency_jitter
+            await asyncio.sleep(max(0.0, self.random.uniform(self.latency - jitter, self.latency + jitter)))
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.error_count += 1
+            result = {'error': 'Simulated failure', 'status': 503}
+        else:
+            result = self.scrape(url, class_name)
+        self.request_latencies.append(time.monotonic() - started)
+        return result
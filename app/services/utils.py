@@ -67,3 +67,14 @@ def get_valid_website(data):
         return error_response("Website not found", code=status.HTTP_404_NOT_FOUND)
 
     return website
+
+def parse_flag(value):
+    """
+    :param value: A request flag: a JSON boolean or 'true'/'false' (any case).
+    :return: The flag's value, or None if it is not a valid boolean.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+        return value.strip().lower() == 'true'
+    return None
@@ -77,6 +77,12 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('POSTGRES_HOST'),
         'PORT': os.environ.get('POSTGRES_PORT'),
+        # The app is served over ASGI (uvicorn), where Django's persistent connections are
+        # opened per worker thread and never reused, so each request opens and closes its own.
+        # Pooling is done by pgbouncer in front of PostgreSQL (see docker-compose.yml); in its
+        # transaction mode server-side cursors, which outlive a transaction, must be disabled.
+        'CONN_MAX_AGE': 0,
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('POSTGRES_DISABLE_SERVER_SIDE_CURSORS', 'False') == 'True',
     }
 }
 
@@ -96,7 +102,11 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
-# Logging configuration
+# Logging configuration: records are written by a background thread; LOG_FORMAT is 'verbose' or 'json'
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'verbose')
+LOG_MAX_MESSAGE_LENGTH = int(os.getenv('LOG_MAX_MESSAGE_LENGTH', 2000))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -109,23 +119,25 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'app.services.base.log_handlers.JsonFormatter',
+        },
     },
     'handlers': {
         'console': {
             'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            '()': 'app.services.base.log_handlers.QueuedStreamHandler',
+            'max_length': LOG_MAX_MESSAGE_LENGTH,
+            'formatter': LOG_FORMAT,
         },
     },
     'root': {
         'handlers': ['console'],
-        'level': 'DEBUG',
+        'level': LOG_LEVEL,
     },
     'loggers': {
         'django': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': True,
+            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
         },
     },
 }
@@ -150,4 +162,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Microservice settings
 SCRAPING_MICROSERVICE_BASE_URL = os.getenv('SCRAPING_MICROSERVICE_BASE_URL')
 SCRAPING_MICROSERVICE_CLIENT_ID = os.getenv('SCRAPING_MICROSERVICE_CLIENT_ID')
-SCRAPING_MICROSERVICE_CLIENT_SECRET = os.getenv('SCRAPING_MICROSERVICE_CLIENT_SECRET')
\ No newline at end of file
+SCRAPING_MICROSERVICE_CLIENT_SECRET = os.getenv('SCRAPING_MICROSERVICE_CLIENT_SECRET')
+
+# Pooled HTTP client settings shared by the scraper services
+SCRAPING_HTTP_POOL_LIMIT = int(os.getenv('SCRAPING_HTTP_POOL_LIMIT', 100))
+SCRAPING_HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('SCRAPING_HTTP_POOL_LIMIT_PER_HOST', 30))
+SCRAPING_HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('SCRAPING_HTTP_KEEPALIVE_TIMEOUT', 60))
+SCRAPING_HTTP_DNS_CACHE_TTL = int(os.getenv('SCRAPING_HTTP_DNS_CACHE_TTL', 300))
+SCRAPING_HTTP_TIMEOUT = float(os.getenv('SCRAPING_HTTP_TIMEOUT', 3600))
+
+# Number of URLs sent per request to the microservice batch endpoint (0 disables batching)
+SCRAPING_MICROSERVICE_BATCH_SIZE = int(os.getenv('SCRAPING_MICROSERVICE_BATCH_SIZE', 0))
+
+# Adaptive (AIMD) concurrency bounds for requests to the scraping microservice
+SCRAPING_CONCURRENCY_MIN = int(os.getenv('SCRAPING_CONCURRENCY_MIN', 1))
+SCRAPING_CONCURRENCY_MAX = int(os.getenv('SCRAPING_CONCURRENCY_MAX', 50))
+SCRAPING_CONCURRENCY_INITIAL = int(os.getenv('SCRAPING_CONCURRENCY_INITIAL', 5))
+
+# Default per-host politeness limits, overridable per Website
+SCRAPING_HOST_RATE = float(os.getenv('SCRAPING_HOST_RATE', 5))
+SCRAPING_HOST_BURST = int(os.getenv('SCRAPING_HOST_BURST', 10))
+SCRAPING_HOST_CONCURRENCY = int(os.getenv('SCRAPING_HOST_CONCURRENCY', 8))
+
+# Retry policy and deadline budgets for scraping requests (seconds)
+SCRAPING_REQUEST_TIMEOUT = float(os.getenv('SCRAPING_REQUEST_TIMEOUT', 120))
+SCRAPING_CRAWL_DEADLINE = float(os.getenv('SCRAPING_CRAWL_DEADLINE', 3600))
+SCRAPING_RETRY_ATTEMPTS = int(os.getenv('SCRAPING_RETRY_ATTEMPTS', 3))
+SCRAPING_RETRY_BACKOFF_BASE = float(os.getenv('SCRAPING_RETRY_BACKOFF_BASE', 1))
+SCRAPING_RETRY_BACKOFF_MAX = float(os.getenv('SCRAPING_RETRY_BACKOFF_MAX', 30))
+SCRAPING_RETRY_AFTER_MAX = float(os.getenv('SCRAPING_RETRY_AFTER_MAX', 120))
+
+# Circuit breakers shared per microservice endpoint and per target host
+SCRAPING_BREAKER_FAIL_MAX = int(os.getenv('SCRAPING_BREAKER_FAIL_MAX', 5))
+SCRAPING_BREAKER_RESET_TIMEOUT = float(os.getenv('SCRAPING_BREAKER_RESET_TIMEOUT', 30))
+
+# Short-lived cache of successful microservice results (0 disables; in-flight calls are always shared)
+SCRAPING_RESULT_CACHE_TTL = float(os.getenv('SCRAPING_RESULT_CACHE_TTL', 0))
+SCRAPING_RESULT_CACHE_SIZE = int(os.getenv('SCRAPING_RESULT_CACHE_SIZE', 1000))
+
+# Incremental decoding of microservice responses
+SCRAPING_STREAM_DECODE = os.getenv('SCRAPING_STREAM_DECODE', 'True') == 'True'
+SCRAPING_STREAM_CHUNK_SIZE = int(os.getenv('SCRAPING_STREAM_CHUNK_SIZE', 65536))
+
+# Page discovery pipeline: queued category results and URLs persisted per chunk
+SCRAPING_PAGES_QUEUE_SIZE = int(os.getenv('SCRAPING_PAGES_QUEUE_SIZE', 100))
+SCRAPING_PAGES_CHUNK_SIZE = int(os.getenv('SCRAPING_PAGES_CHUNK_SIZE', 500))
+
+# Price normalization: currency assumed when a price has no symbol, and the decimal
+# separator used for ambiguous amounts such as '1.234'
+SCRAPING_PRICE_DEFAULT_CURRENCY = os.getenv('SCRAPING_PRICE_DEFAULT_CURRENCY', 'EUR')
+SCRAPING_PRICE_DECIMAL_SEPARATOR = os.getenv('SCRAPING_PRICE_DECIMAL_SEPARATOR', ',')
+
+# Scraped data persistence: outcomes written per chunk as they arrive
+SCRAPING_DATA_CHUNK_SIZE = int(os.getenv('SCRAPING_DATA_CHUNK_SIZE', 50))
+
+# Category listing pagination: upper bound on listing pages fetched per category
+SCRAPING_LISTING_MAX_PAGES = int(os.getenv('SCRAPING_LISTING_MAX_PAGES', 50))
+
+# Scraped or failed pages are requeued by the pages sync once their last scrape attempt is older
+# than this many seconds; pages on a category listing that changed are requeued right away
+SCRAPING_RESCRAPE_INTERVAL = float(os.getenv('SCRAPING_RESCRAPE_INTERVAL', 86400))
+
+# Rows per INSERT ... ON CONFLICT statement when upserting pages and scraped data
+SCRAPING_UPSERT_BATCH_SIZE = int(os.getenv('SCRAPING_UPSERT_BATCH_SIZE', 1000))
+
+# Ingest backend for pages and scraped data: 'orm' (batched statements) or 'copy' (COPY into a
+# staging table, then one merge statement); a sync request may choose with 'ingest'
+SCRAPING_INGEST_BACKEND = os.getenv('SCRAPING_INGEST_BACKEND', 'orm')
+
+# Price history: monthly partitions created ahead by price_history_partitions, months kept
+# (0 keeps everything) and the range returned by the history API without 'start'
+PRICE_HISTORY_PARTITIONS_AHEAD = int(os.getenv('PRICE_HISTORY_PARTITIONS_AHEAD', 2))
+PRICE_HISTORY_RETENTION_MONTHS = int(os.getenv('PRICE_HISTORY_RETENTION_MONTHS', 0))
+PRICE_HISTORY_DEFAULT_DAYS = int(os.getenv('PRICE_HISTORY_DEFAULT_DAYS', 30))
@@ -0,0 +1,59 @@
+import asyncio
+from django.test import SimpleTestCase
+from ..services.base.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+
+class AdaptiveConcurrencyLimiterTest(SimpleTestCase):
+    def test_successes_increase_limit_additively(self):
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=10, initial_limit=4)
+        for _ in range(4):
+            limiter.in_flight += 1
+            limiter.release(latency=0.01)
+        # About one slot per window of `limit` successful requests
+        self.assertGreater(limiter.limit, 4.9)
+        self.assertLess(limiter.limit, 5.0)
+
+    def test_limit_stays_within_bounds(self):
+        limiter = AdaptiveConcurrencyLimiter(min_limit=2, max_limit=3, initial_limit=3)
+        for _ in range(10):
+            limiter.in_flight += 1
+            limiter.release(latency=0.01)
+        self.assertEqual(limiter.limit, 3)
+        for _ in range(5):
+            limiter.last_decrease = 0.0
+            limiter.in_flight += 1
+            limiter.release(overloaded=True)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_overload_decreases_multiplicatively_once_per_round_trip(self):
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=50, initial_limit=16)
+        limiter.latency_ewma = 60.0
+        limiter.in_flight = 2
+        limiter.release(overloaded=True)
+        # A second failure from the same congested window does not count again
+        limiter.release(overloaded=True)
+        self.assertEqual(limiter.limit, 8)
+
+    def test_slow_requests_do_not_increase_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=50, initial_limit=4, latency_tolerance=2.0)
+        limiter.latency_ewma = 0.1
+        limiter.in_flight = 1
+        limiter.release(latency=1.0)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_run_bounds_in_flight_requests(self):
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=2, initial_limit=2)
+        active, peak = 0, 0
+
+        async def request():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        async def run():
+            await asyncio.gather(*(limiter.run(request) for _ in range(10)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.in_flight, 0)
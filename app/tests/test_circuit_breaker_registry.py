@@ -0,0 +1,59 @@
+import asyncio
+import aiohttp
+import pybreaker
+from django.test import SimpleTestCase, override_settings
+from ..services.base.circuit_breaker_registry import CircuitBreakerRegistry
+
+ENDPOINT = 'http://scraper/scrape'
+
+@override_settings(SCRAPING_BREAKER_FAIL_MAX=2, SCRAPING_BREAKER_RESET_TIMEOUT=0.05)
+class CircuitBreakerRegistryTest(SimpleTestCase):
+    async def fail(self, registry):
+        try:
+            async with registry.guard(ENDPOINT, 'shop.example'):
+                raise aiohttp.ServerDisconnectedError()
+        except (aiohttp.ServerDisconnectedError, pybreaker.CircuitBreakerError):
+            pass
+
+    def test_opens_after_fail_max_and_records_when(self):
+        registry = CircuitBreakerRegistry()
+
+        async def run():
+            for _ in range(2):
+                await self.fail(registry)
+            with self.assertRaises(pybreaker.CircuitBreakerError):
+                async with registry.guard(ENDPOINT, 'shop.example'):
+                    pass
+
+        asyncio.run(run())
+        states = {entry['name']: entry for entry in registry.snapshot()}
+        self.assertEqual(states[f'endpoint:{ENDPOINT}']['state'], pybreaker.STATE_OPEN)
+        self.assertIsNotNone(states[f'endpoint:{ENDPOINT}']['opened_at'])
+
+    def test_half_open_lets_one_trial_call_through(self):
+        registry = CircuitBreakerRegistry()
+        outcomes = []
+
+        async def trial(release):
+            try:
+                async with registry.guard(ENDPOINT):
+                    await release.wait()
+                outcomes.append('passed')
+            except pybreaker.CircuitBreakerError:
+                outcomes.append('rejected')
+
+        async def run():
+            for _ in range(2):
+                await self.fail(registry)
+            await asyncio.sleep(0.06)
+            release = asyncio.Event()
+            tasks = [asyncio.create_task(trial(release)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        self.assertEqual(sorted(outcomes), ['passed', 'rejected', 'rejected'])
+        states = {entry['name']: entry for entry in registry.snapshot()}
+        self.assertEqual(states[f'endpoint:{ENDPOINT}']['state'], pybreaker.STATE_CLOSED)
+        self.assertIsNone(states[f'endpoint:{ENDPOINT}']['opened_at'])
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from ..pages.pages_model import Page
+from ..scrape.latest_price_model import LatestPrice
+from ..scrape.price_observation_model import PriceObservation
+from ..scrape.scraped_data_model import ScrapedData
+from ..services.base.copy_ingest_service import copy_ingest_service, staging_table_sql
+from ..services.scraping.scraped_data_service import ScrapedDataService
+from ..websites.websites_model import Website
+
+class CopyIngestPagesTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.urls = [f'https://shop.test/product-{number}' for number in range(5)]
+
+    def counts(self, result):
+        return {key: result[key] for key in ('created', 'updated', 'unchanged', 'removed')}
+
+    def test_staging_table_follows_the_model_fields(self):
+        url = Page._meta.get_field('url')
+        self.assertEqual(staging_table_sql('ingest_pages', (('url', url),)),
+                         f"CREATE TEMP TABLE IF NOT EXISTS ingest_pages (url varchar({url.max_length}) NOT NULL) ON COMMIT DROP")
+
+    def test_merge_counts_match_the_orm_path(self):
+        self.assertEqual(self.counts(copy_ingest_service.upsert_pages(self.website, self.urls + [self.urls[0], ''])),
+                         {'created': 5, 'updated': 0, 'unchanged': 0, 'removed': 0})
+
+        Page.objects.filter(url__in=self.urls[:2]).update(status='scraped', last_scraped=timezone.now())
+        result = copy_ingest_service.upsert_pages(self.website, self.urls + ['https://shop.test/product-new'])
+
+        self.assertEqual(self.counts(result), {'created': 1, 'updated': 2, 'unchanged': 3, 'removed': 0})
+        self.assertEqual(result['rows'], 6)
+        self.assertEqual(Page.objects.filter(status='pending', last_scraped__isnull=True).count(), 6)
+
+    def test_mark_missing_soft_deletes_and_forgets_latest_prices(self):
+        copy_ingest_service.upsert_pages(self.website, self.urls)
+        pages = list(Page.objects.order_by('url'))
+        ScrapedDataService().upsert_scraped_data([(page, [{'field_name': 'Kabelbinder', 'field_value': '1,50 €'}]) for page in pages])
+
+        result = copy_ingest_service.upsert_pages(self.website, self.urls[:3], mark_missing=True)
+
+        self.assertEqual(result['removed'], 2)
+        self.assertEqual(set(Page.objects.filter(deleted_at__isnull=False).values_list('url', flat=True)), set(self.urls[3:]))
+        self.assertEqual(set(LatestPrice.objects.values_list('url', flat=True)), set(self.urls[:3]))
+        self.assertEqual(ScrapedData.objects.filter(content_hash__isnull=True).count(), 2)
+
+class CopyIngestScrapedDataTest(TestCase):
+    def setUp(self):
+        website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.pages = [Page.objects.create(web=website, url=f'https://shop.test/product-{number}') for number in range(2)]
+        self.service = ScrapedDataService()
+
+    def ingest(self, prices: dict) -> int:
+        rows = [self.service.build_scraped_data(page, {
+            'field_name': 'Kabelbinder', 'field_value': prices[page], 'field_value_meta': {'prices': [prices[page], '0,045 €']},
+        }) for page in prices]
+        return copy_ingest_service.upsert_scraped_data(rows)['written']
+
+    def test_merge_writes_data_history_and_latest_prices(self):
+        self.assertEqual(self.ingest({self.pages[0]: '1,50 €', self.pages[1]: '2,00 €'}), 2)
+
+        stored = ScrapedData.objects.get(page=self.pages[0])
+        self.assertEqual((stored.value_minor, stored.value_exponent, stored.currency), (1500, 3, 'EUR'))
+        self.assertEqual(PriceObservation.objects.count(), 2)
+        latest = LatestPrice.objects.get(page=self.pages[0])
+        self.assertEqual((latest.url, latest.value_minor, latest.value_exponent, latest.price_table), (self.pages[0].url, 1500, 3, [1500, 45]))
+
+    def test_only_changed_rows_are_merged_and_unchanged_pages_are_seen(self):
+        self.ingest({self.pages[0]: '1,50 €', self.pages[1]: '2,00 €'})
+        seen_before = timezone.now() - timedelta(hours=1)
+        LatestPrice.objects.update(last_seen_at=seen_before, price_changed_at=seen_before)
+
+        self.assertEqual(self.ingest({self.pages[0]: '1,40 €', self.pages[1]: '2,00 €'}), 1)
+
+        self.assertEqual(ScrapedData.objects.get(page=self.pages[0]).value_minor, 1400)
+        self.assertEqual(PriceObservation.objects.filter(page=self.pages[1]).count(), 1)
+        unchanged = LatestPrice.objects.get(page=self.pages[1])
+        self.assertEqual(unchanged.price_changed_at, seen_before)
+        self.assertGreater(unchanged.last_seen_at, seen_before)
+        self.assertGreater(LatestPrice.objects.get(page=self.pages[0]).price_changed_at, seen_before)
+
+    def test_soft_deleted_rows_are_restored(self):
+        self.ingest({self.pages[0]: '1,50 €'})
+        ScrapedData.objects.update(deleted_at=timezone.now())
+
+        self.assertEqual(self.ingest({self.pages[0]: '1,50 €'}), 1)
+        self.assertIsNone(ScrapedData.objects.get(page=self.pages[0]).deleted_at)
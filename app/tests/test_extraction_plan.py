@@ -0,0 +1,72 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.utils import timezone
+from ..criterias.criterias_model import Criterias
+from ..services.base.extraction_plan import ExtractionPlanCache, PRICE, PRICE_TABLE, PRODUCT
+from ..websites.websites_model import Website
+
+class ExtractionPlanCacheTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.cache = ExtractionPlanCache()
+
+    def content(self, tag, selector, meta=None):
+        return Criterias.objects.create(html_tag=tag, css_selector=selector, meta=meta, type=Criterias.CONTENT, web_id=self.website)
+
+    def test_positional_plan_from_selector_order(self):
+        self.content('h1', 'title|subtitle')
+        self.content('div', 'price')
+        self.content('div', 'bulk-prices')
+        Criterias.objects.create(html_tag='a', css_selector='nav-link', type=Criterias.NAV, web_id=self.website)
+
+        plan = self.cache.get(self.website)
+        self.assertFalse(plan.declarative)
+        self.assertEqual(plan.fields[PRODUCT].classes, ('title', 'subtitle'))
+        self.assertEqual(plan.fields[PRICE].classes, ('price',))
+        self.assertEqual(plan.fields[PRICE_TABLE].classes, ('bulk-prices',))
+
+    def test_declarative_plan_follows_order_and_skips_invalid_fields(self):
+        self.content('div', 'price', {'field': 'price', 'post': ['price'], 'order': 2})
+        self.content('h1', 'title', {'field': 'product', 'order': 1})
+        self.content('div', 'sku', {'field': 'sku', 'role': 'attribute', 'order': 3})
+
+        with self.assertLogs('app.services.base.extraction_plan', 'ERROR'):
+            plan = self.cache.get(self.website)
+        self.assertTrue(plan.declarative)
+        self.assertEqual(list(plan.fields), ['product', 'price'])
+        self.assertEqual(plan.extract([
+            {'tag': 'h1', 'attributes': {'class': ['title']}, 'text': 'Kabelbinder'},
+            {'tag': 'div', 'attributes': {'class': ['price']}, 'text': ' 1,50 € '},
+        ]), {'product': 'Kabelbinder', 'price': '1,50 €'})
+
+    def test_plan_is_reused_until_the_criteria_change(self):
+        criteria = self.content('h1', 'title', {'field': 'product'})
+        plan = self.cache.get(self.website)
+        # Only the signature query runs while the criteria are unchanged
+        with self.assertNumQueries(1):
+            self.assertIs(self.cache.get(self.website), plan)
+
+        criteria.meta = {'field': 'name'}
+        criteria.save()
+        updated = self.cache.get(self.website)
+        self.assertEqual(list(updated.fields), ['name'])
+
+        added = self.content('div', 'price', {'field': 'price'})
+        self.assertEqual(list(self.cache.get(self.website).fields), ['name', 'price'])
+
+        added.deleted_at = timezone.now()
+        added.save()
+        self.assertEqual(list(self.cache.get(self.website).fields), ['name'])
+
+    def test_invalidate_drops_the_cached_plan(self):
+        self.content('h1', 'title', {'field': 'product'})
+        plan = self.cache.get(self.website)
+        self.cache.invalidate(self.website.id)
+        self.assertIsNot(self.cache.get(self.website), plan)
+
+    async def test_async_get_shares_the_cache(self):
+        await Criterias.objects.acreate(html_tag='h1', css_selector='title', meta={'field': 'product'},
+                                        type=Criterias.CONTENT, web_id=self.website)
+        plan = await self.cache.aget(self.website)
+        self.assertEqual(list(plan.fields), ['product'])
+        self.assertIs(await sync_to_async(self.cache.get)(self.website), plan)
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from django.test import SimpleTestCase
+from ..services.base.host_scheduler import HostScheduler
+
+class HostSchedulerTest(SimpleTestCase):
+    def setUp(self):
+        self.scheduler = HostScheduler()
+
+    def test_host_for_folds_www(self):
+        self.assertEqual(HostScheduler.host_for('https://www.Shop.test/p/1'), 'shop.test')
+
+    def test_requests_beyond_burst_are_paced_by_rate(self):
+        self.scheduler.configure('shop.test', rate=20, burst=2, max_concurrency=10)
+
+        async def run():
+            started = time.monotonic()
+            for number in range(6):
+                async with self.scheduler.slot(f'https://shop.test/p/{number}'):
+                    pass
+            return time.monotonic() - started
+
+        # Two requests use the burst, the other four wait for tokens at 20 per second
+        elapsed = asyncio.run(run())
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertLess(elapsed, 1.0)
+
+    def test_concurrency_cap_per_host(self):
+        self.scheduler.configure('shop.test', rate=1000, burst=100, max_concurrency=2)
+        active, peak = 0, 0
+
+        async def request(number):
+            nonlocal active, peak
+            async with self.scheduler.slot(f'https://shop.test/p/{number}'):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        async def run():
+            await asyncio.gather(*(request(number) for number in range(8)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+
+    def test_slow_host_does_not_hold_up_others(self):
+        self.scheduler.configure('slow.test', rate=1, burst=1, max_concurrency=1)
+        self.scheduler.configure('fast.test', rate=1000, burst=100, max_concurrency=10)
+
+        async def fetch(url):
+            async with self.scheduler.slot(url):
+                return time.monotonic()
+
+        async def run():
+            started = time.monotonic()
+            slow = [asyncio.ensure_future(fetch(f'https://slow.test/{number}')) for number in range(2)]
+            fast = await asyncio.gather(*(fetch(f'https://fast.test/{number}') for number in range(5)))
+            await asyncio.gather(*slow)
+            return max(fast) - started
+
+        self.assertLess(asyncio.run(run()), 0.5)
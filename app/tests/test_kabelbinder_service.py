@@ -0,0 +1,74 @@
+import asyncio
+from django.test import SimpleTestCase
+from ..services.base.extraction_plan import ExtractionPlan, FieldSpec, ATTRIBUTE, TEXT
+from ..services.scraping.kabelbinder_service import KabelBinderService
+
+PLAN = ExtractionPlan([
+    FieldSpec('product', TEXT, 'h1', ['product-title']),
+    FieldSpec('sku', ATTRIBUTE, 'div', ['sku'], post=['strip'], attribute='data-sku'),
+])
+
+def page(sku) -> dict:
+    return {'scraped_data': [
+        {'tag': 'h1', 'attributes': {'class': ['product-title']}, 'text': 'Kabelbinder'},
+        {'tag': 'div', 'attributes': {'class': ['sku'], 'data-sku': sku}},
+    ]}
+
+RESPONSES = {
+    'http://shop.test/good': page(' KB-1 '),
+    # A list-valued attribute makes the 'strip' post-processor raise
+    'http://shop.test/bad': page(['KB-2', 'KB-3']),
+}
+
+class GetDataTest(SimpleTestCase):
+    def setUp(self):
+        self.service = KabelBinderService()
+
+        async def fetch(params):
+            if params['url'] == 'http://shop.test/down':
+                raise ConnectionError("microservice down")
+            return RESPONSES[params['url']]
+
+        async def get_data_many(urls, class_name):
+            for url in urls:
+                yield url, RESPONSES[url]
+
+        self.service.fetch = fetch
+        self.service.web_scraper_service.get_data_many = get_data_many
+
+    def collect(self, urls: list) -> dict:
+        async def run():
+            return {url: outcome async for url, outcome in self.service.get_data(PLAN.classes, urls, PLAN)}
+        return asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    def test_every_url_yields_one_outcome(self):
+        self.service.web_scraper_service.batch_size = 0
+        outcomes = self.collect(['http://shop.test/good', 'http://shop.test/bad', 'http://shop.test/down'])
+
+        self.assertEqual(outcomes['http://shop.test/good'], {'product': 'Kabelbinder', 'sku': 'KB-1'})
+        self.assertIn('error', outcomes['http://shop.test/bad'])
+        self.assertEqual(outcomes['http://shop.test/down'], {'error': 'microservice down'})
+
+    def test_batch_path_yields_errors_for_failed_extraction(self):
+        self.service.web_scraper_service.batch_size = 10
+        outcomes = self.collect(['http://shop.test/bad', 'http://shop.test/good'])
+
+        self.assertEqual(list(outcomes), ['http://shop.test/bad', 'http://shop.test/good'])
+        self.assertIn('error', outcomes['http://shop.test/bad'])
+        self.assertEqual(outcomes['http://shop.test/good']['sku'], 'KB-1')
+
+class DetectPageCountTest(SimpleTestCase):
+    def setUp(self):
+        self.service = KabelBinderService()
+
+    def test_item_counter_is_not_a_page_count(self):
+        pager = [{'tag': 'div', 'text': '1 - 50 von 327 Artikeln', 'children': [
+            {'tag': 'a', 'attributes': {'href': '/kabelbinder?p=2'}, 'text': '2'},
+            {'tag': 'a', 'attributes': {'href': '/kabelbinder?p=7'}, 'text': '7'},
+        ]}]
+        self.assertEqual(self.service.detect_page_count(pager, 'p'), 7)
+
+    def test_page_x_of_n_texts(self):
+        self.assertEqual(self.service.detect_page_count([{'tag': 'span', 'text': 'Seite 1 von 12'}], 'p'), 12)
+        self.assertEqual(self.service.detect_page_count([{'tag': 'span', 'text': 'Page 1 of 4'}], 'p'), 4)
+        self.assertEqual(self.service.detect_page_count([{'tag': 'span', 'text': '327 Artikel'}], 'p'), 1)
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from ..pages.pages_model import Page
+from ..scrape.latest_price_model import LatestPrice
+from ..scrape.scraped_data_model import ScrapedData
+from ..services.base.latest_price_service import latest_price_service
+from ..services.base.page_service import PageService
+from ..services.scraping.scraped_data_service import ScrapedDataService
+from ..websites.websites_model import Website
+
+def item(price, field_name='Kabelbinder'):
+    return {'field_name': field_name, 'field_value': price, 'field_value_meta': {'prices': [price, '0,045 €']}}
+
+class LatestPriceServiceTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.pages = [Page.objects.create(web=self.website, url=f'https://shop.test/product-{number}') for number in range(2)]
+        self.service = ScrapedDataService()
+        self.service.upsert_scraped_data([(self.pages[0], [item('1,50 €')]), (self.pages[1], [item('2,00 €')])])
+        self.earlier = timezone.now() - timedelta(hours=1)
+        LatestPrice.objects.update(price_changed_at=self.earlier, last_seen_at=self.earlier)
+
+    def latest(self, page) -> LatestPrice:
+        return LatestPrice.objects.get(page=page)
+
+    def test_ingest_keeps_one_latest_price_per_page(self):
+        latest = self.latest(self.pages[0])
+        self.assertEqual((latest.web_id, latest.url, latest.product_name), (self.website.id, self.pages[0].url, 'Kabelbinder'))
+        self.assertEqual((latest.value_minor, latest.value_exponent, latest.currency, latest.price_table), (1500, 3, 'EUR', [1500, 45]))
+        self.assertEqual(LatestPrice.objects.count(), 2)
+
+    def test_changed_price_moves_and_unchanged_price_is_only_seen(self):
+        self.service.upsert_scraped_data([(self.pages[0], [item('1,40 €')]), (self.pages[1], [item('2,00 €')])])
+
+        changed, unchanged = self.latest(self.pages[0]), self.latest(self.pages[1])
+        self.assertEqual(changed.value_minor, 1400)
+        self.assertGreater(changed.price_changed_at, self.earlier)
+        self.assertEqual((unchanged.value_minor, unchanged.price_changed_at), (2000, self.earlier))
+        self.assertGreater(unchanged.last_seen_at, self.earlier)
+
+    def test_last_scraped_field_of_a_page_wins(self):
+        self.service.upsert_scraped_data([(self.pages[0], [item('1,40 €'), item('1,30 €', 'Kabelbinder schwarz')])])
+        latest = self.latest(self.pages[0])
+        self.assertEqual((latest.product_name, latest.value_minor), ('Kabelbinder schwarz', 1300))
+
+    def test_soft_deleted_pages_are_forgotten_and_rewritten_when_restored(self):
+        PageService().process_pages_batch(self.website, [self.pages[0].url], mark_missing=True)
+
+        self.assertFalse(LatestPrice.objects.filter(page=self.pages[1]).exists())
+        self.assertIsNone(ScrapedData.objects.get(page=self.pages[1]).content_hash)
+
+        PageService().process_pages_batch(self.website, [self.pages[1].url])
+        self.assertEqual(self.service.upsert_scraped_data([(self.pages[1], [item('2,00 €')])]), 1)
+        self.assertEqual(self.latest(self.pages[1]).value_minor, 2000)
+
+    def test_prices_filters_by_change_time(self):
+        self.service.upsert_scraped_data([(self.pages[0], [item('1,40 €')])])
+        since = self.earlier + timedelta(minutes=30)
+        self.assertEqual([latest.page_id for latest in latest_price_service.prices(self.website, since)], [self.pages[0].pk])
+        self.assertEqual(len(latest_price_service.prices(self.website)), 2)
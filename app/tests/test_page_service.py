@@ -0,0 +1,92 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ..pages.category_listing_model import CategoryListing
+from ..pages.pages_model import Page
+from ..services.base.page_service import PageService
+from ..websites.websites_model import Website
+
+def listing(url, product_urls):
+    return {'url': url, 'parent_name': 'Kabelbinder', 'pages': [{'url': product_url} for product_url in product_urls]}
+
+@override_settings(SCRAPING_RESCRAPE_INTERVAL=3600)
+class CategoryListingSyncTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.page_service = PageService()
+        self.products = [f'https://shop.test/product-{number}' for number in range(3)]
+        self.page_service.process_category_listings(self.website, [listing('https://shop.test/ties', self.products)])
+        self.scraped_at = timezone.now()
+        Page.objects.update(status='scraped', last_scraped=self.scraped_at, updated_at=self.scraped_at)
+
+    def test_unchanged_listing_writes_no_pages(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.page_service.process_category_listings(self.website, [listing('https://shop.test/ties', self.products)])
+
+        self.assertEqual((result['unchanged'], result['changed'], result['created'], result['requeued']), (1, 0, 0, 0))
+        page_writes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith(('UPDATE "pages"', 'INSERT INTO "pages"'))]
+        self.assertEqual(page_writes, [])
+        # Pages scraped within the interval are not stale
+        self.assertEqual(self.page_service.requeue_pages(self.website), 0)
+        self.assertFalse(Page.objects.filter(status='pending').exists())
+
+    def test_changed_listing_adds_and_requeues_its_pages(self):
+        products = self.products[1:] + ['https://shop.test/product-new']
+        result = self.page_service.process_category_listings(self.website, [listing('https://shop.test/ties', products)])
+
+        self.assertEqual((result['changed'], result['created'], result['requeued']), (1, 1, 2))
+        self.assertEqual(result['removed'], {self.products[0]})
+        self.assertEqual(set(Page.objects.filter(status='pending').values_list('url', flat=True)), set(products))
+
+    def test_listing_updated_at_follows_each_crawl(self):
+        stored = CategoryListing.objects.get()
+        self.page_service.process_category_listings(self.website, [listing('https://shop.test/ties', self.products)])
+        self.assertGreater(CategoryListing.objects.get().updated_at, stored.updated_at)
+
+    def test_only_stale_pages_are_requeued(self):
+        stale = timezone.now() - timedelta(hours=2)
+        Page.objects.filter(url=self.products[0]).update(updated_at=stale)
+        Page.objects.filter(url=self.products[1]).update(status='error', error_message='timeout', updated_at=stale)
+
+        self.assertEqual(self.page_service.requeue_pages(self.website), 2)
+        self.assertEqual(set(Page.objects.filter(status='pending').values_list('url', flat=True)), set(self.products[:2]))
+        self.assertFalse(Page.objects.filter(error_message__isnull=False).exists())
+
+class ProcessPagesBatchTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.page_service = PageService()
+        self.urls = [f'https://shop.test/product-{number}' for number in range(5)]
+
+    def test_counts_created_updated_and_unchanged_pages(self):
+        self.assertEqual(self.page_service.process_pages_batch(self.website, self.urls + [self.urls[0], '']),
+                         {'created': 5, 'updated': 0, 'unchanged': 0, 'removed': 0})
+
+        Page.objects.filter(url__in=self.urls[:2]).update(status='scraped', last_scraped=timezone.now())
+        Page.objects.filter(url=self.urls[2]).update(status='error', error_message='timeout')
+        result = self.page_service.process_pages_batch(self.website, self.urls + ['https://shop.test/product-new'])
+
+        self.assertEqual(result, {'created': 1, 'updated': 3, 'unchanged': 2, 'removed': 0})
+        self.assertEqual(Page.objects.filter(status='pending', last_scraped__isnull=True, error_message__isnull=True).count(), 6)
+
+    def test_pending_pages_are_not_rewritten(self):
+        self.page_service.process_pages_batch(self.website, self.urls)
+        written_at = timezone.now() - timedelta(hours=1)
+        Page.objects.update(updated_at=written_at)
+        result = self.page_service.process_pages_batch(self.website, self.urls)
+
+        self.assertEqual(result, {'created': 0, 'updated': 0, 'unchanged': 5, 'removed': 0})
+        self.assertEqual(set(Page.objects.values_list('updated_at', flat=True)), {written_at})
+
+    def test_mark_missing_soft_deletes_unlisted_pages_and_restores_listed_ones(self):
+        self.page_service.process_pages_batch(self.website, self.urls)
+        result = self.page_service.process_pages_batch(self.website, self.urls[:3], mark_missing=True)
+
+        self.assertEqual(result['removed'], 2)
+        self.assertEqual(set(Page.objects.filter(deleted_at__isnull=False).values_list('url', flat=True)), set(self.urls[3:]))
+
+        result = self.page_service.process_pages_batch(self.website, self.urls[3:])
+        self.assertEqual((result['updated'], result['unchanged']), (2, 0))
+        self.assertFalse(Page.objects.filter(deleted_at__isnull=False).exists())
@@ -0,0 +1,35 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from ..pages.pages_model import Page
+from ..pages.pages_view import PagesListView
+from ..websites.websites_model import Website
+
+class PostPagesTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='kabelbinder', base_url='https://shop.test/')
+        Page.objects.create(web=self.website, url='https://shop.test/old')
+        self.view = PagesListView.as_view({'post': 'post_pages'})
+
+    def post(self, **data):
+        request = APIRequestFactory().post('/api/v1/pages/', {
+            'web_id': self.website.id, 'urls': ['https://shop.test/new'], **data,
+        }, format='json')
+        return self.view(request)
+
+    def test_mark_missing_rejects_non_booleans(self):
+        for value in ('no', 'yes', 0, 1, None, []):
+            with self.subTest(mark_missing=value):
+                response = self.post(mark_missing=value)
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Page.objects.filter(url='https://shop.test/new').exists())
+
+    def test_mark_missing_false_string_keeps_pages(self):
+        response = self.post(mark_missing='false')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['removed'], 0)
+
+    def test_mark_missing_true_removes_missing_pages(self):
+        response = self.post(mark_missing=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['removed'], 1)
+        self.assertIsNotNone(Page.objects.get(url='https://shop.test/old').deleted_at)
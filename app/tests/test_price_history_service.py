@@ -0,0 +1,65 @@
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection
+from django.test import TestCase
+from ..pages.pages_model import Page
+from ..scrape.price_observation_model import PriceObservation
+from ..services.base.price_history_service import PriceHistoryService, add_months, month_start
+from ..services.scraping.scraped_data_service import ScrapedDataService
+from ..websites.websites_model import Website
+
+def utc(year, month, day=1, hour=0):
+    return datetime(year, month, day, hour, tzinfo=dt_timezone.utc)
+
+class PriceHistoryServiceTest(TestCase):
+    def setUp(self):
+        website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.page = Page.objects.create(web=website, url='https://shop.test/product')
+        self.service = PriceHistoryService()
+
+    def observe(self, price, observed_at):
+        scraped_data = ScrapedDataService().build_scraped_data(self.page, {'field_name': 'Kabelbinder', 'field_value': price})
+        return self.service.record([scraped_data], observed_at=observed_at)
+
+    def partitions_holding_rows(self) -> dict:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text, count(*) FROM price_observations GROUP BY 1")
+            return dict(cursor.fetchall())
+
+    def test_month_arithmetic(self):
+        self.assertEqual(month_start(datetime(2031, 3, 31, 23, 30, tzinfo=dt_timezone.utc)), utc(2031, 3))
+        self.assertEqual(add_months(utc(2031, 11), 2), utc(2032, 1))
+        self.assertEqual(add_months(utc(2031, 1), -1), utc(2030, 12))
+
+    def test_observations_land_in_their_month_partition(self):
+        self.observe('1,50 €', utc(2031, 3, 31, 23))
+        self.observe('1,40 €', utc(2031, 4, 1))
+        self.observe('1,30 €', utc(2031, 4, 15))
+
+        self.assertEqual(self.partitions_holding_rows(), {'price_observations_2031_03': 1, 'price_observations_2031_04': 2})
+
+    def test_months_without_a_partition_go_to_the_default_one(self):
+        PriceObservation.objects.create(page=self.page, observed_at=utc(2035, 6, 2), value_minor=150, currency='EUR')
+        self.assertEqual(self.partitions_holding_rows(), {'price_observations_default': 1})
+
+    def test_history_and_price_at_read_across_partitions(self):
+        self.observe('1,50 €', utc(2031, 3, 10))
+        self.observe('1,40 €', utc(2031, 4, 10))
+
+        history = self.service.history(self.page, utc(2031, 3), utc(2031, 5))
+        self.assertEqual([observation.value_minor for observation in history], [150, 140])
+        self.assertEqual(self.service.price_at(self.page, utc(2031, 4, 1)).value_minor, 150)
+        self.assertIsNone(self.service.price_at(self.page, utc(2031, 3)))
+
+    def test_drop_partitions_removes_whole_old_months(self):
+        self.service.ensure_partitions(utc(2031, 1), 3)
+        self.observe('1,50 €', utc(2031, 1, 10))
+        self.observe('1,40 €', utc(2031, 3, 10))
+        # Outside a test the rows are committed and their deferred foreign key checks done
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        self.assertEqual(self.service.drop_partitions(utc(2031, 3)), ['price_observations_2031_01', 'price_observations_2031_02'])
+        names = [name for name, _ in self.service.list_partitions()]
+        self.assertNotIn('price_observations_2031_01', names)
+        self.assertIn('price_observations_2031_03', names)
+        self.assertEqual(list(PriceObservation.objects.values_list('value_minor', flat=True)), [140])
@@ -0,0 +1,41 @@
+import importlib
+from django.test import SimpleTestCase
+from ..services.base.price_parser import ParsedPrice, parse_price
+from ..services.scraping.scraped_data_service import ScrapedDataService
+from ..pages.pages_model import Page
+
+price_migration = importlib.import_module('app.scrape.migrations.0004_scraped_data_price_minor_units')
+
+class ParsePriceTest(SimpleTestCase):
+    def test_minor_units(self):
+        self.assertEqual(parse_price('1.234,50 €*'), ParsedPrice(123450, 'EUR', 2))
+        self.assertEqual(parse_price('€1,234.50'), ParsedPrice(123450, 'EUR', 2))
+        self.assertEqual(parse_price('12,5 €'), ParsedPrice(1250, 'EUR', 2))
+
+    def test_sub_cent_prices_keep_their_precision(self):
+        price = parse_price('ab 0,045 €')
+        self.assertEqual(price, ParsedPrice(45, 'EUR', 3))
+        self.assertEqual(price.format(), '0.045 €')
+        self.assertEqual(price.scaled(4), 450)
+        # Trailing zeros past the minor unit add no precision
+        self.assertEqual(parse_price('0,0450 €'), ParsedPrice(45, 'EUR', 3))
+        self.assertEqual(parse_price('0,100 €', decimal_hint=','), ParsedPrice(10, 'EUR', 2))
+
+    def test_scraped_data_keeps_raw_text(self):
+        scraped_data = ScrapedDataService().build_scraped_data(Page(id=1), {
+            'field_name': 'Kabelbinder',
+            'field_value': 'ab 0,045 €*',
+            'field_value_meta': {'prices': ['0,05 €*', '0,045 €*']},
+        })
+        self.assertEqual(scraped_data.field_value, 'ab 0,045 €*')
+        self.assertEqual((scraped_data.value_minor, scraped_data.value_exponent), (45, 3))
+        self.assertIn('"prices_minor": [50, 45]', scraped_data.field_value_meta)
+
+class LegacyPriceTest(SimpleTestCase):
+    def test_last_point_is_decimal(self):
+        self.assertEqual(price_migration.parse_legacy_price('1.234.50 €'), (123450, 2, 'EUR'))
+        self.assertEqual(price_migration.parse_legacy_price('1.234 €'), (1234, 3, 'EUR'))
+        self.assertEqual(price_migration.parse_legacy_price('12 €'), (1200, 2, 'EUR'))
+        self.assertEqual(price_migration.parse_legacy_price('0.0450 €'), (45, 3, 'EUR'))
+        self.assertEqual(price_migration.parse_legacy_price('1.234 ¥'), (1234, 0, 'JPY'))
+        self.assertIsNone(price_migration.parse_legacy_price('Preis auf Anfrage'))
@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test import TestCase
+from ..criterias.criterias_model import Criterias
+from ..pages.pages_model import Page
+from ..scrape.scraped_data_model import ScrapedData
+from ..websites.websites_model import Website
+
+class QueryPlanTest(TestCase):
+    """
+    The crawl's hot lookups must be served by their indexes; EXPLAIN is run after ANALYZE on
+    enough rows that a sequential scan would be the planner's choice without them.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.websites = [Website.objects.create(name=f'shop-{number}', base_url=f'https://shop-{number}.test/') for number in range(4)]
+        for website in cls.websites:
+            Page.objects.bulk_create([
+                Page(web=website, url=f'{website.base_url}product-{number}', status='pending' if number % 100 == 0 else 'scraped')
+                for number in range(5000)
+            ], batch_size=5000)
+            Criterias.objects.bulk_create([
+                Criterias(html_tag='div', css_selector=f'selector-{number}', type=kind, web_id=website)
+                for kind in (Criterias.NAV, Criterias.CONTENT)
+                for number in range(300)
+            ])
+        ScrapedData.objects.bulk_create([
+            ScrapedData(page_id=page_id, field_name=field_name, field_value='1,50 €', field_value_meta='{}')
+            for page_id in Page.objects.values_list('id', flat=True)
+            for field_name in ('Kabelbinder', 'Kabelbinder schwarz')
+        ], batch_size=10000)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Page._meta.db_table}")
+            cursor.execute(f"ANALYZE {Criterias._meta.db_table}")
+            cursor.execute(f"ANALYZE {ScrapedData._meta.db_table}")
+
+    def assertUsesIndex(self, queryset, index_name: str):
+        # 'Index Scan using', 'Index Only Scan using' or 'Bitmap Index Scan on' the index
+        self.assertRegex(queryset.explain(), rf"Index (Only )?Scan (using|on) {index_name}\b")
+
+    def test_pending_pages_use_partial_index(self):
+        website = self.websites[1]
+        self.assertUsesIndex(Page.objects.filter(web=website, status='pending', deleted_at__isnull=True), 'pages_web_pending_idx')
+
+    def test_criteria_lookups_use_web_type_index(self):
+        website = self.websites[2]
+        self.assertUsesIndex(Criterias.objects.filter(web_id=website.id, type='nav').values_list('css_selector', 'meta'), 'criterias_web_type_idx')
+        self.assertUsesIndex(Criterias.objects.filter(web_id=website.id, type='content').values_list('css_selector', flat=True), 'criterias_web_type_idx')
+
+    def test_page_batch_lookup_uses_web_url_index(self):
+        # The existing-URL lookup of PageService.process_pages_batch
+        website = self.websites[3]
+        urls = [f'{website.base_url}product-{number}' for number in range(0, 5000, 50)]
+        self.assertUsesIndex(Page.objects.filter(web=website, url__in=urls).values_list('url', flat=True), 'pages_web_url_unique')
+
+    def test_stored_hash_lookup_uses_page_field_name_index(self):
+        # The change detection lookup of ScrapedDataService.upsert_scraped_data
+        page_ids = list(Page.objects.filter(web=self.websites[0]).order_by('id').values_list('id', flat=True)[:50])
+        self.assertUsesIndex(
+            ScrapedData.objects.filter(page_id__in=page_ids, deleted_at__isnull=True).values_list('page_id', 'field_name', 'content_hash'),
+            'scraped_data_page_field_name_unique',
+        )
@@ -0,0 +1,64 @@
+import asyncio
+import aiohttp
+from django.test import SimpleTestCase, override_settings
+from ..services.base.retry_policy import (
+    DeadlineExceeded, RetryableHTTPError, build_retrying, crawl_budget, is_retryable, parse_retry_after, request_timeout,
+)
+
+@override_settings(SCRAPING_RETRY_ATTEMPTS=3, SCRAPING_RETRY_BACKOFF_BASE=0.001, SCRAPING_RETRY_BACKOFF_MAX=0.01,
+                   SCRAPING_RETRY_AFTER_MAX=0.02, SCRAPING_REQUEST_TIMEOUT=30)
+class RetryPolicyTest(SimpleTestCase):
+    def attempts(self, failure) -> int:
+        calls = 0
+
+        async def run():
+            nonlocal calls
+            async for attempt in build_retrying():
+                with attempt:
+                    calls += 1
+                    raise failure
+
+        with self.assertRaises(type(failure)):
+            asyncio.run(run())
+        return calls
+
+    def test_retryable_classification(self):
+        self.assertTrue(is_retryable(RetryableHTTPError(503)))
+        self.assertTrue(is_retryable(asyncio.TimeoutError()))
+        self.assertTrue(is_retryable(aiohttp.ServerDisconnectedError()))
+        self.assertFalse(is_retryable(ValueError("bad payload")))
+        self.assertFalse(is_retryable(DeadlineExceeded()))
+
+    def test_retryable_failures_give_up_after_the_attempt_limit(self):
+        self.assertEqual(self.attempts(RetryableHTTPError(503)), 3)
+
+    def test_other_failures_are_not_retried(self):
+        self.assertEqual(self.attempts(ValueError("bad payload")), 1)
+
+    def test_retry_after_is_honored_up_to_the_cap(self):
+        waits = []
+        retrying = build_retrying()
+        retrying.sleep = lambda seconds: waits.append(seconds) or asyncio.sleep(0)
+
+        async def run():
+            async for attempt in retrying:
+                with attempt:
+                    raise RetryableHTTPError(429, retry_after=120)
+
+        with self.assertRaises(RetryableHTTPError):
+            asyncio.run(run())
+        self.assertEqual(waits, [0.02, 0.02])
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('5'), 5.0)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_request_timeout_is_capped_by_the_crawl_budget(self):
+        self.assertEqual(request_timeout(), 30)
+        with crawl_budget(5):
+            self.assertLessEqual(request_timeout(), 5)
+        with crawl_budget(-1):
+            with self.assertRaises(DeadlineExceeded):
+                request_timeout()
@@ -0,0 +1,86 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ..pages.pages_model import Page
+from ..scrape.price_observation_model import PriceObservation
+from ..scrape.scraped_data_model import ScrapedData
+from ..services.scraping.scraped_data_service import ScrapedDataService
+from ..websites.websites_model import Website
+
+def item(price, tiers=()):
+    return {'field_name': 'Kabelbinder', 'field_value': price, 'field_value_meta': {'prices': list(tiers)}}
+
+class UpsertScrapedDataTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.pages = [Page.objects.create(web=self.website, url=f'https://shop.test/product-{number}') for number in range(3)]
+        self.service = ScrapedDataService()
+
+    def stored(self):
+        return {row.page_id: row for row in ScrapedData.objects.all()}
+
+    def test_inserts_one_row_per_page_and_field(self):
+        written = self.service.upsert_scraped_data([(page, [item('1,50 €*', ['1,50 €*', '1,20 €*'])]) for page in self.pages])
+
+        self.assertEqual(written, 3)
+        rows = self.stored()
+        self.assertEqual(set(rows), {page.pk for page in self.pages})
+        self.assertEqual((rows[self.pages[0].pk].value_minor, rows[self.pages[0].pk].currency), (150, 'EUR'))
+        self.assertIn('"prices_minor": [150, 120]', rows[self.pages[0].pk].field_value_meta)
+
+    def test_conflicting_rows_are_updated_in_place(self):
+        self.service.upsert_scraped_data([(page, [item('1,50 €')]) for page in self.pages])
+        before = self.stored()
+
+        self.service.upsert_scraped_data([(self.pages[0], [item('1,40 €')])])
+
+        after = self.stored()
+        self.assertEqual(ScrapedData.objects.count(), 3)
+        self.assertEqual(after[self.pages[0].pk].id, before[self.pages[0].pk].id)
+        self.assertEqual((after[self.pages[0].pk].field_value, after[self.pages[0].pk].value_minor), ('1,40 €', 140))
+        self.assertEqual(after[self.pages[1].pk].value_minor, 150)
+
+    def test_last_value_for_a_key_wins_within_a_batch(self):
+        written = self.service.upsert_scraped_data([(self.pages[0], [item('1,50 €'), item('1,60 €')]), (self.pages[0], [item('1,70 €')])])
+
+        self.assertEqual(written, 1)
+        self.assertEqual(self.stored()[self.pages[0].pk].value_minor, 170)
+
+    def test_soft_deleted_rows_are_restored(self):
+        self.service.upsert_scraped_data([(self.pages[0], [item('1,50 €')])])
+        ScrapedData.objects.update(deleted_at=timezone.now())
+
+        self.assertEqual(self.service.upsert_scraped_data([(self.pages[0], [item('1,50 €')])]), 1)
+        self.assertIsNone(self.stored()[self.pages[0].pk].deleted_at)
+
+class ChangeDetectionTest(TestCase):
+    def setUp(self):
+        self.website = Website.objects.create(name='shop', base_url='https://shop.test/')
+        self.pages = [Page.objects.create(web=self.website, url=f'https://shop.test/product-{number}') for number in range(2)]
+        self.service = ScrapedDataService()
+        self.service.upsert_scraped_data([(page, [item('1,50 €', ['1,50 €', '1,20 €'])]) for page in self.pages])
+
+    def test_unchanged_content_is_not_rewritten(self):
+        with CaptureQueriesContext(connection) as queries:
+            written = self.service.upsert_scraped_data([(page, [item('1,50 €', ['1,50 €', '1,20 €'])]) for page in self.pages])
+
+        self.assertEqual(written, 0)
+        writes = ('INSERT INTO "scraped_data"', 'UPDATE "scraped_data"', 'INSERT INTO "price_observations"')
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith(writes)])
+        self.assertEqual(PriceObservation.objects.count(), 2)
+
+    def test_only_changed_rows_are_written(self):
+        written = self.service.upsert_scraped_data([
+            (self.pages[0], [item('1,50 €', ['1,50 €', '1,10 €'])]),
+            (self.pages[1], [item('1,50 €', ['1,50 €', '1,20 €'])]),
+        ])
+
+        self.assertEqual(written, 1)
+        self.assertEqual(list(PriceObservation.objects.filter(page=self.pages[0]).order_by('id').values_list('price_table', flat=True)),
+                         [[150, 120], [150, 110]])
+        self.assertEqual(PriceObservation.objects.filter(page=self.pages[1]).count(), 1)
+
+    def test_cleared_hash_forces_a_rewrite(self):
+        ScrapedData.objects.filter(page=self.pages[0]).update(content_hash=None)
+        self.assertEqual(self.service.upsert_scraped_data([(self.pages[0], [item('1,50 €', ['1,50 €', '1,20 €'])])]), 1)
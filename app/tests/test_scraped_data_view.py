@@ -0,0 +1,12 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from ..scrape.scraped_data_view import ScrapedDataViewSet
+from ..websites.websites_model import Website
+
+class SyncPagesTest(TestCase):
+    def test_ingest_backend_is_rejected(self):
+        website = Website.objects.create(name='kabelbinder', base_url='https://shop.test/')
+        request = APIRequestFactory().post('/api/v1/scrape/sync-pages/', {'web_id': website.id, 'ingest': 'copy'}, format='json')
+        response = ScrapedDataViewSet.as_view({'post': 'sync_pages'})(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('sync-scraped-data', response.data['message'])
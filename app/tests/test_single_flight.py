@@ -0,0 +1,83 @@
+import asyncio
+from django.test import SimpleTestCase
+from ..services.base.single_flight import SingleFlight
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        self.calls = 0
+
+    async def fetch(self, value, delay=0.01):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return value
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+
+        async def run():
+            return await asyncio.gather(*(flight.do('url', self.fetch, 'page') for _ in range(5)))
+
+        self.assertEqual(asyncio.run(run()), ['page'] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+
+        async def run():
+            return await asyncio.gather(flight.do('a', self.fetch, 'a'), flight.do('b', self.fetch, 'b'))
+
+        self.assertEqual(asyncio.run(run()), ['a', 'b'])
+        self.assertEqual(self.calls, 2)
+
+    def test_result_is_reused_within_ttl_only(self):
+        flight = SingleFlight(ttl=0.05)
+
+        async def run():
+            await flight.do('url', self.fetch, 'page', delay=0)
+            await flight.do('url', self.fetch, 'page', delay=0)
+            self.assertEqual(self.calls, 1)
+            await asyncio.sleep(0.06)
+            await flight.do('url', self.fetch, 'page', delay=0)
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, 2)
+
+    def test_without_ttl_sequential_calls_run_again(self):
+        flight = SingleFlight()
+
+        async def run():
+            await flight.do('url', self.fetch, 'page', delay=0)
+            await flight.do('url', self.fetch, 'page', delay=0)
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, 2)
+
+    def test_uncacheable_results_and_failures_are_not_kept(self):
+        flight = SingleFlight(ttl=60)
+
+        async def fail():
+            self.calls += 1
+            raise ValueError("scrape failed")
+
+        async def run():
+            for _ in range(2):
+                await flight.do('empty', self.fetch, None, delay=0, cacheable=lambda result: result is not None)
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    await flight.do('failing', fail)
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, 4)
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        flight = SingleFlight()
+
+        async def run():
+            first = asyncio.create_task(flight.do('url', self.fetch, 'page', delay=0.02))
+            second = asyncio.create_task(flight.do('url', self.fetch, 'page', delay=0.02))
+            await asyncio.sleep(0.005)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(run()), 'page')
+        self.assertEqual(self.calls, 1)
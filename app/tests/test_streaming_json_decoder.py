@@ -0,0 +1,58 @@
+import json
+from django.test import SimpleTestCase
+from ..services.base.streaming_json_decoder import StreamingScrapeDecoder
+
+BODY = {
+    'status': 200,
+    'scraped_data': [
+        {'field_name': 'title', 'field_value': 'Kabelbinder „schwarz“ 3,6 × 200 mm', 'count': 12},
+        {'field_name': 'price', 'field_value': '1.234,50 €', 'ratio': -1.5e3},
+        {'field_name': 'escaped', 'field_value': 'quote \\" and brace } ]', 'nested': [{'a': [1, 2]}]},
+    ],
+    'elapsed': 0.125,
+}
+
+class StreamingScrapeDecoderTest(SimpleTestCase):
+    def decode(self, body: bytes, chunk_size: int, node_filter=None):
+        decoder = StreamingScrapeDecoder(node_filter=node_filter)
+        streamed = []
+        for start in range(0, len(body), chunk_size):
+            streamed.extend(decoder.feed(body[start:start + chunk_size]))
+        result = decoder.close()
+        # Nodes are streamed in order, though the last ones may only be decoded by close()
+        self.assertEqual(streamed, result['scraped_data'][:len(streamed)])
+        return result
+
+    def test_every_chunk_boundary_decodes_the_same(self):
+        body = json.dumps(BODY, ensure_ascii=False, indent=1).encode()
+        # Chunk size 1 splits every string, number and multi-byte UTF-8 character
+        for chunk_size in (1, 2, 3, 7, 64, len(body)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.decode(body, chunk_size), BODY)
+
+    def test_nodes_are_returned_as_soon_as_they_complete(self):
+        body = json.dumps(BODY).encode()
+        split = body.index(b'"price"')
+        decoder = StreamingScrapeDecoder()
+        self.assertEqual(decoder.feed(body[:split]), BODY['scraped_data'][:1])
+        self.assertEqual(decoder.feed(body[split:]), BODY['scraped_data'][1:])
+
+    def test_filter_drops_nodes(self):
+        body = json.dumps(BODY).encode()
+        result = self.decode(body, 5, node_filter=lambda node: node['field_name'] != 'price')
+        kept = [node for node in BODY['scraped_data'] if node['field_name'] != 'price']
+        self.assertEqual(result['scraped_data'], kept)
+        self.assertEqual(result['elapsed'], 0.125)
+
+    def test_truncated_body_is_rejected(self):
+        body = json.dumps(BODY).encode()
+        for end in (len(body) - 1, body.index(b'"price"'), 1):
+            with self.subTest(end=end):
+                decoder = StreamingScrapeDecoder()
+                decoder.feed(body[:end])
+                with self.assertRaises(ValueError):
+                    decoder.close()
+
+    def test_non_object_body_is_rejected(self):
+        with self.assertRaises(ValueError):
+            StreamingScrapeDecoder().feed(b'[1, 2]')
@@ -0,0 +1,28 @@
+import asyncio
+import pybreaker
+from django.test import SimpleTestCase
+from ..services.base.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from ..services.base.retry_policy import RetryableHTTPError
+from ..services.base.web_scrape_micro_service import WebScrapeMicroService
+
+class IsOverloadedTest(SimpleTestCase):
+    def test_overload_signals(self):
+        self.assertTrue(WebScrapeMicroService.is_overloaded(RetryableHTTPError(503)))
+        self.assertTrue(WebScrapeMicroService.is_overloaded(pybreaker.CircuitBreakerError("open")))
+        self.assertTrue(WebScrapeMicroService.is_overloaded({'error': 'busy', 'overloaded': True}))
+
+    def test_other_outcomes(self):
+        self.assertFalse(WebScrapeMicroService.is_overloaded({'scraped_data': []}))
+        self.assertFalse(WebScrapeMicroService.is_overloaded({'error': 'Page not found'}))
+        self.assertFalse(WebScrapeMicroService.is_overloaded(ValueError("bad selector")))
+
+    def test_open_breaker_backs_off_limiter(self):
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=20, initial_limit=8)
+
+        async def open_breaker():
+            raise pybreaker.CircuitBreakerError("open")
+
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            asyncio.run(limiter.run(open_breaker, is_overloaded=WebScrapeMicroService.is_overloaded))
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websites', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='website',
+            name='crawl_burst',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='crawl_concurrency',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='crawl_rate',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
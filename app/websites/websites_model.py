@@ -7,6 +7,10 @@ class Website(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=255)
     base_url = models.URLField(max_length=2000)
+    # Per-shop politeness limits; empty values fall back to the SCRAPING_HOST_* settings
+    crawl_rate = models.FloatField(null=True, blank=True)  # requests per second
+    crawl_burst = models.PositiveIntegerField(null=True, blank=True)
+    crawl_concurrency = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
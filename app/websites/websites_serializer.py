@@ -4,7 +4,7 @@ from .websites_model import Website
 class WebsiteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Website
-        fields = ['id', 'name', 'base_url', 'created_at', 'updated_at', 'deleted_at']
+        fields = ['id', 'name', 'base_url', 'crawl_rate', 'crawl_burst', 'crawl_concurrency', 'created_at', 'updated_at', 'deleted_at']
         extra_kwargs = {
             'name': {'required': True},
             'base_url': {'required': True},